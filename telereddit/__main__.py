@@ -1,10 +1,46 @@
 """
 Main entrypoint of the application.
 
-Simply calls the main function of `telereddit`.
+Calls the main function of `telereddit`, or of `telereddit.workers` when
+started with more than one worker process.
 """
 
-from telereddit import telereddit
+import argparse
+
+from telereddit import startup
+
+PROFILED_IMPORTS = [
+    "requests",
+    "dotenv",
+    "telegram",
+    "telegram.ext",
+    "pyreddit.pyreddit.reddit",
+    "telereddit.telereddit",
+    "telereddit.workers",
+]
+"""Modules whose import time is reported by the startup profile, in order."""
 
 if __name__ == "__main__":
-    telereddit.main()
+    parser = argparse.ArgumentParser(prog="python -m telereddit")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes handling the updates (default: 1)",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="log the time taken by the imports and the initialization",
+    )
+    args = parser.parse_args()
+    if args.profile_startup:
+        startup.profile.enable()
+        startup.profile.import_modules(PROFILED_IMPORTS)
+
+    from telereddit import telereddit, workers
+
+    if args.workers > 1:
+        workers.main(args.workers)
+    else:
+        telereddit.main()
@@ -0,0 +1,303 @@
+"""Asyncio variant of the Linker class."""
+
+import asyncio
+import functools
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from weakref import WeakValueDictionary
+
+from pyreddit.pyreddit.models.post import Post
+from telegram.bot import Message  # type: ignore
+
+from telereddit import media_group
+from telereddit.config.config import MAX_FANOUT
+from telereddit.exceptions import PostSendError
+from telereddit.linker import Linker
+from telereddit.rate_limiter import RateLimitedBot
+
+
+class AsyncLinker:
+    """
+    Handle a single telereddit request from an asyncio event loop.
+
+    Exposes the same request methods of `telereddit.linker.Linker` as
+    coroutines. The blocking Reddit and Telegram calls are run in the default
+    executor of the running loop, so that many requests, even of the same
+    telereddit request, can be awaited concurrently. Requests sending messages
+    wait for the rate limiter of the bot, if any, before taking a thread of
+    the executor.
+
+    Attributes
+    ----------
+    linker : Linker
+        The underlying Linker instance for the chat.
+
+    """
+
+    _chat_locks: "WeakValueDictionary[int, asyncio.Lock]" = (
+        WeakValueDictionary()
+    )
+
+    def __init__(self, chat_id: int, notify_send_errors: bool = True) -> None:
+        self.linker: Linker = Linker(chat_id, notify_send_errors)
+
+    def chat_lock(self) -> asyncio.Lock:
+        """
+        Get the lock serializing the messages sent to the chat.
+
+        Locks live as long as someone is holding or waiting for them.
+
+        Returns
+        -------
+        asyncio.Lock
+            The lock of the chat.
+
+        """
+        lock = self._chat_locks.get(self.linker.chat_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._chat_locks[self.linker.chat_id] = lock
+        return lock
+
+    async def send_posts_from_urls(
+        self, posts_url: List[str], sent: Optional[List[str]] = None
+    ) -> None:
+        """
+        Send the reddit posts relative to the given urls to the chat.
+
+        Posts are retrieved concurrently, then sent one message at a time in
+        the given order. Consecutive photo and video posts are sent together
+        as albums, see `telereddit.media_group.group_posts`. Only the first
+        `telereddit.config.config.MAX_FANOUT` urls are considered.
+
+        Parameters
+        ----------
+        posts_url : List[str]
+            Reddit share links of the posts.
+        sent : List[str]
+            (Default value = None)
+
+            Urls already sent to the chat, which are skipped. The urls sent are
+            appended to it, so that the message can be handled again without
+            sending the same posts twice.
+
+        Raises
+        ------
+        PostSendError
+            If some of the posts couldn't be sent, once the others are sent.
+
+        """
+        sent = sent if sent is not None else []
+        posts_url = [url for url in posts_url[:MAX_FANOUT] if url not in sent]
+        posts, errors = await self._gather(self.linker.fetch_post, posts_url)
+        error: Optional[PostSendError] = None
+        async with self.chat_lock():
+            for group in media_group.group_posts(posts):
+                if len(group) > 1 and await self._send(
+                    self.linker.send_album_from_urls, [posts[i] for i in group]
+                ):
+                    sent.extend(posts_url[i] for i in group)
+                    continue
+                for i in group:
+                    try:
+                        await self._send(
+                            self.linker.send_post_from_url,
+                            posts_url[i],
+                            posts[i],
+                            errors[i],
+                        )
+                    except PostSendError as e:
+                        error = e
+                    else:
+                        sent.append(posts_url[i])
+        if error is not None:
+            raise error
+
+    async def send_random_posts(
+        self, subreddits: List[str], sent: Optional[List[str]] = None
+    ) -> None:
+        """
+        Send a random post to the chat for each of the given subreddits.
+
+        Random posts are retrieved concurrently, then sent one at a time in the
+        given order. Only the first `telereddit.config.config.MAX_FANOUT`
+        subreddits are considered.
+
+        Parameters
+        ----------
+        subreddits : List[str]
+            Valid r/ prefixed subreddit names.
+        sent : List[str]
+            (Default value = None)
+
+            Subreddits whose post has already been sent to the chat, which are
+            skipped. The subreddits sent are appended to it.
+
+        Raises
+        ------
+        PostSendError
+            If some of the posts couldn't be sent, once the others are sent.
+
+        """
+        sent = sent if sent is not None else []
+        subreddits = [sub for sub in subreddits[:MAX_FANOUT] if sub not in sent]
+        posts, errors = await self._gather(self._fetch_random_post, subreddits)
+        error: Optional[PostSendError] = None
+        async with self.chat_lock():
+            for subreddit, post, fetch_error in zip(subreddits, posts, errors):
+                try:
+                    await self._send(
+                        self.linker.send_random_post,
+                        subreddit,
+                        post,
+                        fetch_error,
+                    )
+                except PostSendError as e:
+                    error = e
+                else:
+                    sent.append(subreddit)
+        if error is not None:
+            raise error
+
+    async def send_random_post(self, subreddit: str) -> None:
+        """
+        Send a random post to the chat from the given subreddit.
+
+        See `telereddit.linker.Linker.send_random_post`.
+        """
+        await self._send(self.linker.send_random_post, subreddit)
+
+    async def send_post_from_url(self, post_url: str) -> None:
+        """
+        Try to send the reddit post relative to post_url to the chat.
+
+        See `telereddit.linker.Linker.send_post_from_url`.
+        """
+        await self._send(self.linker.send_post_from_url, post_url)
+
+    async def send_post(self, post_url: str, from_url: bool = False) -> None:
+        """
+        Send the reddit post relative to post_url to the chat.
+
+        See `telereddit.linker.Linker.send_post`.
+        """
+        await self._send(self.linker.send_post, post_url, from_url)
+
+    async def edit_result(self, message: Message) -> None:
+        """
+        Edit the given message with a new post from that subreddit.
+
+        See `telereddit.linker.Linker.edit_result`.
+        """
+        await self._send(self.linker.edit_result, message)
+
+    async def edit_random_post(self, message: Message, subreddit: str) -> None:
+        """
+        Edit the current Telegram message with another random Reddit post.
+
+        See `telereddit.linker.Linker.edit_random_post`.
+        """
+        await self._send(self.linker.edit_random_post, message, subreddit)
+
+    async def answer_inline_query(
+        self, inline_query_id: str, query: str
+    ) -> None:
+        """
+        Answer an inline query with random posts of the queried subreddit.
+
+        See `telereddit.linker.Linker.answer_inline_query`.
+        """
+        await self._run(self.linker.answer_inline_query, inline_query_id, query)
+
+    async def delete_message(
+        self, message: Message, album_ids: Sequence[int] = ()
+    ) -> None:
+        """
+        Delete a bot's message from the chat.
+
+        See `telereddit.linker.Linker.delete_message`.
+        """
+        await self._run(self.linker.delete_message, message, album_ids)
+
+    async def _send(self, func: Callable, *args: Any) -> Any:
+        """
+        Run the given blocking function sending a message to the chat.
+
+        The function is run once the rate limiter of the bot lets a message
+        be sent to the chat, so that no thread of the executor is held
+        waiting for it.
+
+        Parameters
+        ----------
+        func : Callable
+            Blocking function sending a message.
+        args : Any
+            Positional arguments of `func`.
+
+        Returns
+        -------
+        The return value of `func`.
+
+        """
+        bot = self.linker.bot
+        if not isinstance(bot, RateLimitedBot):
+            return await self._run(func, *args)
+        chat_id = self.linker.chat_id
+        await bot.rate_limiter.wait(chat_id)
+        return await self._run(bot.rate_limiter.admitted, chat_id, func, *args)
+
+    def _fetch_random_post(self, subreddit: str) -> Post:
+        """Retrieve a random post of the subreddit, retrying on failure."""
+        return self.linker.retry_policy.run(
+            functools.partial(self.linker.fetch_random_post, subreddit)
+        )
+
+    @classmethod
+    async def _gather(
+        cls, func: Callable, items: List[str]
+    ) -> Tuple[List[Optional[Post]], List[Optional[BaseException]]]:
+        """
+        Concurrently run the given blocking function on each of the items.
+
+        Parameters
+        ----------
+        func : Callable
+            Blocking function retrieving a post.
+        items : List[str]
+            Arguments on which to call `func`.
+
+        Returns
+        -------
+        Tuple[List[Post or None], List[BaseException or None]]
+            The retrieved posts and the errors retrieving them, in the order
+            of the items: None where retrieving the post failed, or didn't.
+            The errors are then handled when sending the posts, without
+            retrieving them again.
+
+        """
+        results = await asyncio.gather(
+            *(cls._run(func, item) for item in items), return_exceptions=True
+        )
+        return (
+            [r if isinstance(r, Post) else None for r in results],
+            [r if isinstance(r, BaseException) else None for r in results],
+        )
+
+    @staticmethod
+    async def _run(func: Callable, *args: Any) -> Any:
+        """
+        Run the given blocking function in the default executor of the loop.
+
+        Parameters
+        ----------
+        func : Callable
+            Blocking function to run.
+        args : Any
+            Positional arguments of `func`.
+
+        Returns
+        -------
+        The return value of `func`.
+
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args))
@@ -0,0 +1,9 @@
+"""
+Benchmarks of the telereddit request handling.
+
+The handlers are driven with synthetic streams of Telegram updates, while
+Reddit and the Telegram Bot API are replaced by in-process fakes with
+configurable latency and error rate. Run with:
+
+    python -m telereddit.benchmarks --help
+"""
@@ -0,0 +1,259 @@
+"""
+Benchmark runner.
+
+Drives the telereddit handlers with the chosen workloads, against the fake
+Reddit and Telegram, and writes throughput, latency percentiles and memory
+usage of every workload to a JSON file, so that runs can be compared.
+
+.. note:: The dispatcher event loop is started once per process: to compare
+    different numbers of workers, run the benchmark once for each of them.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from telereddit.benchmarks.fakes import FakeBot, FakeReddit
+from telereddit.benchmarks.workloads import WORKLOADS
+from telereddit.circuit_breaker import CircuitBreaker
+from telereddit.config.config import ASYNC_WORKERS
+from telereddit.dispatcher import AsyncDispatcher
+from telereddit.file_store import MemoryFileIdStore
+from telereddit.linker import Linker
+from telereddit.post_cache import PostCache
+from telereddit.post_pool import PostPool
+from telereddit.rate_limiter import RateLimitedBot, RateLimiter
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Get the given percentile of the values, by nearest rank.
+
+    Parameters
+    ----------
+    values : List[float]
+        Sorted values.
+    p : float
+        Percentile, between 0 and 100.
+
+    Returns
+    -------
+    float
+        The percentile, or 0 if there are no values.
+
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(p / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def setup(bot: FakeBot, args: argparse.Namespace) -> None:
+    """Set up the Linker services like `telereddit.telereddit.main` does."""
+    Linker.set_bot(
+        RateLimitedBot(bot, RateLimiter()) if args.rate_limit else bot
+    )
+    breaker = CircuitBreaker()
+    Linker.set_reddit_breaker(breaker)
+    if args.pool:
+        post_pool = PostPool(breaker=breaker)
+        post_pool.start()
+        Linker.set_post_pool(post_pool)
+    Linker.set_post_cache(PostCache())
+    Linker.set_file_id_store(MemoryFileIdStore())
+
+
+def run(workload: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run the given workload.
+
+    Updates are submitted at the given rate, or all at once if the rate is 0,
+    and the latency of each of them is measured from its submission to the
+    end of its handling.
+
+    Parameters
+    ----------
+    workload : str
+        Name of the workload, one of `telereddit.benchmarks.workloads.WORKLOADS`.
+    args : argparse.Namespace
+        Command line arguments.
+
+    Returns
+    -------
+    dict
+        Results of the workload.
+
+    """
+    rng = random.Random(args.seed)
+    updates = WORKLOADS[workload](args.updates, rng)
+    fake_reddit = FakeReddit(
+        args.reddit_latency, args.reddit_error_rate, args.seed
+    )
+    bot = FakeBot(
+        args.telegram_latency,
+        args.telegram_error_rate,
+        args.seed,
+        args.telegram_media_latency,
+    )
+    setup(bot, args)
+    context = SimpleNamespace(bot=Linker.bot)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    latencies: List[float] = []
+    futures = []
+    done = threading.Semaphore(0)
+
+    def on_done(submitted: float) -> None:
+        latencies.append(time.perf_counter() - submitted)
+        done.release()
+
+    with fake_reddit.install():
+        start = time.perf_counter()
+        for i, (handler, update) in enumerate(updates):
+            if args.rate:
+                time.sleep(
+                    max(0.0, start + i / args.rate - time.perf_counter())
+                )
+            submitted = time.perf_counter()
+            future = handler(update, context)
+            if future is None:
+                continue
+            future.add_done_callback(lambda _, s=submitted: on_done(s))
+            futures.append(future)
+        # waiting the callbacks rather than the futures, as waiters are
+        # notified before callbacks are run
+        for _ in futures:
+            done.acquire()
+        duration = time.perf_counter() - start
+
+    memory: Dict[str, Optional[int]] = dict(
+        max_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        traced_peak_bytes=None,
+    )
+    if args.trace_memory:
+        memory["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies.sort()
+    return dict(
+        workload=workload,
+        updates=len(futures),
+        failed=sum(1 for f in futures if f.exception() is not None),
+        duration=duration,
+        throughput=len(futures) / duration if duration else 0.0,
+        latency=dict(
+            mean=sum(latencies) / len(latencies) if latencies else 0.0,
+            p50=percentile(latencies, 50),
+            p95=percentile(latencies, 95),
+            p99=percentile(latencies, 99),
+            max=latencies[-1] if latencies else 0.0,
+        ),
+        reddit=fake_reddit.stats(),
+        telegram=bot.stats(),
+        memory=memory,
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m telereddit.benchmarks",
+        description="Benchmark the telereddit handlers against fake Reddit "
+        "and Telegram.",
+    )
+    parser.add_argument(
+        "workloads",
+        nargs="*",
+        help=f"workloads to run, among {', '.join(WORKLOADS)} (default: all)",
+    )
+    parser.add_argument("-n", "--updates", type=int, default=500)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="updates per second, 0 to submit all at once (default: 0)",
+    )
+    parser.add_argument("--workers", type=int, default=ASYNC_WORKERS)
+    parser.add_argument("--reddit-latency", type=float, default=0.3)
+    parser.add_argument("--reddit-error-rate", type=float, default=0.01)
+    parser.add_argument("--telegram-latency", type=float, default=0.1)
+    parser.add_argument("--telegram-media-latency", type=float, default=0.5)
+    parser.add_argument("--telegram-error-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--pool", action="store_true", help="enable the random posts pool"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="store_true",
+        help="enable the Telegram rate limiter",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="trace the peak of allocated memory, slowing down the run",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-o", "--output", default="benchmark.json", help="results file"
+    )
+    args = parser.parse_args(argv)
+    for workload in args.workloads:
+        if workload not in WORKLOADS:
+            parser.error(f"unknown workload: {workload}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Run the benchmark and write its results.
+
+    Parameters
+    ----------
+    argv : List[str]
+        (Default value = None)
+
+        Command line arguments. Defaults to `sys.argv`.
+
+    Returns
+    -------
+    dict
+        Arguments and results of the run, as written to the output file.
+
+    """
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)
+    os.environ.pop("SENTRY_TOKEN", None)
+    AsyncDispatcher.start(args.workers)
+
+    report = dict(
+        started_at=datetime.now().isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        args=vars(args),
+        results=[run(w, args) for w in args.workloads or WORKLOADS],
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for result in report["results"]:
+        latency = result["latency"]
+        print(
+            f"{result['workload']:<12} {result['throughput']:8.1f} upd/s  "
+            f"p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  "
+            f"p99 {latency['p99']:.3f}s  failed {result['failed']}"
+        )
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Fake Reddit and Telegram Bot API.
+
+Both fakes simulate the latency of the network with a sleep, so that they
+occupy the calling thread like the real blocking requests do, and fail a
+configurable fraction of the requests.
+"""
+
+import functools
+import itertools
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from pyreddit.pyreddit import helpers, reddit
+from pyreddit.pyreddit.exceptions import RedditError
+from pyreddit.pyreddit.models.media import ContentType, Media
+from pyreddit.pyreddit.models.post import Post
+from telegram.error import NetworkError  # type: ignore
+
+POST_TYPES = (
+    ContentType.TEXT,
+    ContentType.PHOTO,
+    ContentType.PHOTO,
+    ContentType.VIDEO,
+    ContentType.GIF,
+    ContentType.YOUTUBE,
+)
+"""Content types of the fake posts, in order of frequency."""
+
+MEDIA_METHODS = {"sendPhoto", "sendVideo", "sendDocument", "editMessageMedia"}
+
+
+class _Fake:
+    """
+    Base class of the fakes.
+
+    Parameters
+    ----------
+    latency : float
+        Mean seconds taken by a request.
+    error_rate : float
+        Fraction of the requests which fail.
+    seed : int
+        (Default value = None)
+
+        Seed of the random latencies and errors.
+
+    Attributes
+    ----------
+    calls : Counter
+        Number of requests made, by name.
+    errors : Counter
+        Number of requests failed, by name.
+
+    """
+
+    def __init__(
+        self, latency: float, error_rate: float, seed: Optional[int] = None
+    ) -> None:
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _request(self, name: str, latency: Optional[float] = None) -> bool:
+        """
+        Simulate a request, returning whether it should fail.
+
+        The request takes an exponentially distributed time around the mean
+        latency.
+        """
+        latency = self.latency if latency is None else latency
+        with self._lock:
+            self.calls[name] += 1
+            delay = self._random.expovariate(1 / latency) if latency else 0
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors[name] += 1
+        time.sleep(delay)
+        return failed
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the number of requests made and failed, by name.
+
+        Returns
+        -------
+        dict
+            `calls` and `errors`.
+
+        """
+        return dict(calls=dict(self.calls), errors=dict(self.errors))
+
+
+class FakeReddit(_Fake):
+    """
+    Fake Reddit, replacing the pyreddit functions requesting Reddit.
+
+    Every post url gives always the same post, whose content type depends on
+    the post id. Random posts are drawn from a fixed number of posts per
+    subreddit, so that caches and pools behave like with real subreddits.
+
+    Parameters
+    ----------
+    posts_per_subreddit : int
+        (Default value = 100)
+
+        Number of different posts in every subreddit.
+    media_size : int
+        (Default value = 1000000)
+
+        Size in bytes of the media of the fake posts.
+
+    """
+
+    def __init__(
+        self,
+        latency: float,
+        error_rate: float,
+        seed: Optional[int] = None,
+        posts_per_subreddit: int = 100,
+        media_size: int = 1000000,
+    ) -> None:
+        super().__init__(latency, error_rate, seed)
+        self.posts_per_subreddit: int = posts_per_subreddit
+        self.media_size: int = media_size
+
+    def get_post(self, post_url: str) -> Post:
+        """Fake `pyreddit.pyreddit.reddit.get_post`."""
+        if self._request("get_post"):
+            raise RedditError(
+                "Fake Reddit error."
+            ) from requests.ConnectionError()
+        parts = post_url.rstrip("/").split("/")
+        comments = parts.index("comments")
+        subreddit, post_id = f"r/{parts[comments - 1]}", parts[comments + 1]
+        return make_post(subreddit, post_id, self.media_size)
+
+    def get_random_post_url(self, subreddit: str) -> str:
+        """Fake `pyreddit.pyreddit.helpers.get_random_post_url`."""
+        if self._request("get_random_post_url"):
+            raise RedditError(
+                "Fake Reddit error."
+            ) from requests.ConnectionError()
+        with self._lock:
+            index = self._random.randrange(self.posts_per_subreddit)
+        prefix = zlib.crc32(subreddit.encode()) % 1000
+        return get_post_url(subreddit, f"{prefix}x{index}")
+
+    @contextmanager
+    def install(self) -> Iterator["FakeReddit"]:
+        """Replace the pyreddit functions requesting Reddit in the context."""
+        get_post, get_random_post_url = (
+            reddit.get_post,
+            helpers.get_random_post_url,
+        )
+        reddit.get_post = self.get_post
+        helpers.get_random_post_url = self.get_random_post_url
+        try:
+            yield self
+        finally:
+            reddit.get_post = get_post
+            helpers.get_random_post_url = get_random_post_url
+
+
+class FakeBot(_Fake):
+    """
+    Fake python-telegram-bot's Bot.
+
+    Every Bot method is accepted and returns a fake message, or a list of
+    them for albums. Media sent by url take `media_latency` seconds, as
+    Telegram has to download them, and the returned message carries a file_id
+    of the media.
+
+    Parameters
+    ----------
+    media_latency : float
+        (Default value = None)
+
+        Mean seconds taken by sending a media by url. Defaults to `latency`.
+
+    """
+
+    def __init__(
+        self,
+        latency: float,
+        error_rate: float,
+        seed: Optional[int] = None,
+        media_latency: Optional[float] = None,
+    ) -> None:
+        super().__init__(latency, error_rate, seed)
+        self.media_latency: float = (
+            latency if media_latency is None else media_latency
+        )
+        self._message_ids = itertools.count(1)
+
+    def __getattr__(self, name: str) -> Any:
+        """Get the fake of the Bot method with the given name."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return functools.partial(self._call, name)
+
+    def _call(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """Simulate a call to the given Bot method."""
+        if name == "sendMediaGroup":
+            return self._send_media_group(kwargs["media"])
+        media = next(
+            (kwargs[k] for k in ("photo", "video", "document") if k in kwargs),
+            getattr(kwargs.get("media"), "media", None),
+        )
+        by_url = (
+            name in MEDIA_METHODS
+            and isinstance(media, str)
+            and media.startswith("http")
+        )
+        if self._request(name, self.media_latency if by_url else None):
+            raise NetworkError("Fake Telegram error.")
+        message_id = next(self._message_ids)
+        attachment = None
+        if name in MEDIA_METHODS:
+            file_id = f"file-{zlib.crc32(media.encode())}" if by_url else media
+            attachment = SimpleNamespace(file_id=file_id)
+        return SimpleNamespace(
+            message_id=message_id, effective_attachment=attachment
+        )
+
+    def _send_media_group(self, input_media: List[Any]) -> List[Any]:
+        """Simulate a call to sendMediaGroup, as a single request."""
+        urls = [m.media for m in input_media if m.media.startswith("http")]
+        if self._request(
+            "sendMediaGroup", self.media_latency if urls else None
+        ):
+            raise NetworkError("Fake Telegram error.")
+        return [
+            SimpleNamespace(
+                message_id=next(self._message_ids),
+                effective_attachment=SimpleNamespace(
+                    file_id=(
+                        f"file-{zlib.crc32(m.media.encode())}"
+                        if m.media in urls
+                        else m.media
+                    )
+                ),
+            )
+            for m in input_media
+        ]
+
+
+def get_post_url(subreddit: str, post_id: str) -> str:
+    """
+    Get the permalink of a fake post.
+
+    Parameters
+    ----------
+    subreddit : str
+        r/ prefixed subreddit name.
+    post_id : str
+        Id of the post.
+
+    Returns
+    -------
+    str
+        The permalink of the post.
+
+    """
+    return f"https://www.reddit.com/{subreddit}/comments/{post_id}/fake_post/"
+
+
+def make_post(subreddit: str, post_id: str, media_size: int) -> Post:
+    """
+    Make the fake post of the given id.
+
+    Parameters
+    ----------
+    subreddit : str
+        r/ prefixed subreddit name.
+    post_id : str
+        Id of the post, determining its content type.
+    media_size : int
+        Size in bytes of the media of the post.
+
+    Returns
+    -------
+    `pyreddit.pyreddit.models.post.Post`
+        The fake post.
+
+    """
+    content_type = POST_TYPES[sum(map(ord, post_id)) % len(POST_TYPES)]
+    media = None
+    if content_type == ContentType.YOUTUBE:
+        media = Media(f"https://youtu.be/{post_id}", content_type)
+    elif content_type != ContentType.TEXT:
+        media = Media(
+            f"https://i.redd.it/{post_id}.media", content_type, media_size
+        )
+    return Post(
+        subreddit,
+        get_post_url(subreddit, post_id),
+        f"Fake post {post_id}",
+        "Some text of the fake post. " * 10,
+        media,
+    )
@@ -0,0 +1,167 @@
+"""
+Micro-benchmark of the extraction of the Reddit links of the chat messages.
+
+Compares `telereddit.matcher.match` with the extraction it replaced, which
+lowercased every message and searched it once for each Reddit domain before
+extracting the links or the subreddit names, over a corpus of group chatter
+with a few messages mentioning Reddit.
+
+Usage::
+
+    python -m telereddit.benchmarks.matcher --messages 100000
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from pyreddit.pyreddit import helpers
+
+from telereddit.benchmarks.fakes import get_post_url
+from telereddit.benchmarks.workloads import SUBREDDITS
+from telereddit.config.config import REDDIT_DOMAINS
+from telereddit.matcher import match
+
+_WORDS = (
+    "ok lol yes no maybe tomorrow tonight who is coming at the pub haha "
+    "that's great see you there thanks bro anyway what about the game last "
+    "night I think we should try the new place downtown did you see it wait "
+    "what really omg same here can't make it sorry running late 10 minutes"
+).split()
+_EXTRAS = [
+    "😂",
+    "👍",
+    "🔥",
+    "and/or",
+    "24/7",
+    "12/05",
+    "50/50",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://maps.app.goo.gl/xyz",
+    "@someone",
+    "#tbt",
+]
+
+
+def _chatter(rng: random.Random) -> str:
+    """Make a message unrelated to Reddit."""
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(1, 40))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(_EXTRAS))
+    return " ".join(words)
+
+
+def make_corpus(
+    count: int, rng: random.Random, reddit_ratio: float = 0.02
+) -> List[str]:
+    """
+    Make a corpus of chat messages.
+
+    Parameters
+    ----------
+    count : int
+        Number of messages.
+    rng : random.Random
+        Random generator.
+    reddit_ratio : float
+        (Default value = 0.02)
+
+        Fraction of the messages with Reddit links or subreddit names.
+
+    Returns
+    -------
+    List[str]
+        The messages.
+
+    """
+    corpus = []
+    for _ in range(count):
+        text = _chatter(rng)
+        if rng.random() < reddit_ratio:
+            if rng.random() < 0.5:
+                mention = get_post_url(
+                    rng.choice(SUBREDDITS), f"p{rng.randrange(2000)}"
+                )
+            else:
+                mention = rng.choice(SUBREDDITS)
+            text = f"{text} {mention}"
+        corpus.append(text)
+    return corpus
+
+
+def legacy_match(text: str) -> Optional[List[str]]:
+    """Extract the links as `on_chat_message` did before `telereddit.matcher`."""
+    lowered = text.lower()
+    if any(r in lowered for r in REDDIT_DOMAINS):
+        return helpers.get_urls_from_text(text)
+    elif "r/" in lowered:
+        return helpers.get_subreddit_names(lowered)
+    return None
+
+
+EXTRACTORS: Dict[str, Callable[[str], object]] = {
+    "legacy": legacy_match,
+    "matcher": match,
+}
+
+
+def run(
+    corpus: List[str], extractor: Callable[[str], object], repeat: int
+) -> float:
+    """Get the best time in seconds taken to scan the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            extractor(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Run the micro-benchmark and print its results.
+
+    Parameters
+    ----------
+    argv : List[str]
+        (Default value = None)
+
+        Command line arguments. Defaults to `sys.argv`.
+
+    Returns
+    -------
+    dict
+        Microseconds per message taken by each extractor.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m telereddit.benchmarks.matcher",
+        description="Benchmark the extraction of the Reddit links of the "
+        "chat messages.",
+    )
+    parser.add_argument("-n", "--messages", type=int, default=100000)
+    parser.add_argument(
+        "--reddit-ratio",
+        type=float,
+        default=0.02,
+        help="fraction of the messages mentioning Reddit (default: 0.02)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(
+        args.messages, random.Random(args.seed), args.reddit_ratio
+    )
+    results = {}
+    for name, extractor in EXTRACTORS.items():
+        seconds = run(corpus, extractor, args.repeat)
+        results[name] = seconds / max(len(corpus), 1) * 10**6
+        print(f"{name:<8} {results[name]:8.3f} µs/msg")
+    return results
+
+
+if __name__ == "__main__":
+    main()
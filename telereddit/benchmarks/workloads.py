@@ -0,0 +1,136 @@
+"""
+Synthetic streams of Telegram updates.
+
+Every workload is a function taking the number of updates to generate and a
+random generator, and returning the updates paired with the telereddit handler
+which receives them.
+"""
+
+import datetime
+import itertools
+import random
+from typing import Callable, Dict, List, Tuple
+
+from telegram import CallbackQuery, Chat, Message, Update, User  # type: ignore
+
+from telereddit import telereddit
+from telereddit.benchmarks.fakes import get_post_url
+
+Handler = Callable[[Update, object], object]
+Workload = Callable[[int, random.Random], List[Tuple[Handler, Update]]]
+
+SUBREDDITS = [f"r/subreddit{i}" for i in range(50)]
+CHATS = 200
+
+_USER = User(1, "Benchmark", False)
+_update_ids = itertools.count(1)
+
+
+def _message(rng: random.Random, text: str, chat_id: int = 0) -> Message:
+    """Make a message of a random chat, or of the given chat if not 0."""
+    chat_id = chat_id or -rng.randrange(1, CHATS + 1)
+    return Message(
+        rng.randrange(1, 10**6),
+        datetime.datetime.now(),
+        Chat(chat_id, "group"),
+        from_user=_USER,
+        text=text,
+    )
+
+
+def _post_url(rng: random.Random) -> str:
+    """Get the url of a random post of a random subreddit."""
+    return get_post_url(rng.choice(SUBREDDITS), f"p{rng.randrange(2000)}")
+
+
+def _chat_message(message: Message) -> Tuple[Handler, Update]:
+    return telereddit.on_chat_message, Update(
+        next(_update_ids), message=message
+    )
+
+
+def _callback_query(message: Message, data: str) -> Tuple[Handler, Update]:
+    query = CallbackQuery(
+        str(next(_update_ids)), _USER, "benchmark", message=message, data=data
+    )
+    return (
+        telereddit.on_callback_query,
+        Update(next(_update_ids), callback_query=query),
+    )
+
+
+def single_link(count: int, rng: random.Random) -> List[Tuple[Handler, Update]]:
+    """Messages sharing a single post link."""
+    return [
+        _chat_message(_message(rng, f"look at this {_post_url(rng)}"))
+        for _ in range(count)
+    ]
+
+
+def multi_link(count: int, rng: random.Random) -> List[Tuple[Handler, Update]]:
+    """Messages sharing five post links each."""
+    return [
+        _chat_message(_message(rng, " ".join(_post_url(rng) for _ in range(5))))
+        for _ in range(count)
+    ]
+
+
+def subreddit(count: int, rng: random.Random) -> List[Tuple[Handler, Update]]:
+    """Messages naming a subreddit, each requesting a random post."""
+    return [
+        _chat_message(_message(rng, f"have you seen {rng.choice(SUBREDDITS)}?"))
+        for _ in range(count)
+    ]
+
+
+def more_storm(count: int, rng: random.Random) -> List[Tuple[Handler, Update]]:
+    """
+    "More" button presses, concentrated on a few chats.
+
+    Presses in the same chat are serialized by the chat lock, which is what
+    this workload stresses.
+    """
+    return [
+        _callback_query(
+            _message(
+                rng,
+                f"Fake post\n\n{rng.choice(SUBREDDITS[:5])}",
+                chat_id=-rng.randrange(1, 6),
+            ),
+            "more",
+        )
+        for _ in range(count)
+    ]
+
+
+def edit_storm(count: int, rng: random.Random) -> List[Tuple[Handler, Update]]:
+    """Press the "Edit" button of random posts of random chats."""
+    return [
+        _callback_query(
+            _message(rng, f"Fake post\n\n{rng.choice(SUBREDDITS)}"), "edit"
+        )
+        for _ in range(count)
+    ]
+
+
+def mixed(count: int, rng: random.Random) -> List[Tuple[Handler, Update]]:
+    """Mix all the other workloads, in random order."""
+    workloads = [single_link, multi_link, subreddit, more_storm, edit_storm]
+    updates = [
+        update
+        for workload in workloads
+        for update in workload(count // len(workloads) + 1, rng)
+    ]
+    rng.shuffle(updates)
+    return updates[:count]
+
+
+WORKLOADS: Dict[str, Workload] = dict(
+    single_link=single_link,
+    multi_link=multi_link,
+    subreddit=subreddit,
+    more_storm=more_storm,
+    edit_storm=edit_storm,
+    mixed=mixed,
+)
+"""Available workloads, by name."""
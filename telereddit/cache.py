@@ -0,0 +1,173 @@
+"""
+In-process caches.
+
+Generic thread safe LRU cache with time to live, used by all the telereddit
+caches.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread safe LRU cache whose entries expire after a time to live.
+
+    The cache is bounded by number of entries and, optionally, by the
+    estimated size in bytes of its values. When either bound is exceeded, the
+    least recently used entries are evicted.
+
+    Parameters
+    ----------
+    max_entries : int
+        Max number of entries in the cache.
+    ttl : float
+        Seconds after which an entry expires.
+    max_bytes : int
+        (Default value = None)
+
+        Max estimated size in bytes of the cached values. Requires `sizeof`.
+    sizeof : Callable
+        (Default value = None)
+
+        Function estimating the size in bytes of a value.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups which found a fresh entry.
+    misses : int
+        Number of lookups which didn't find a fresh entry.
+    evictions : int
+        Number of entries evicted because of the cache bounds.
+
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self.max_bytes: Optional[int] = max_bytes
+        self.sizeof: Optional[Callable[[Any], int]] = sizeof
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._bytes: int = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of entries, expired ones included."""
+        return len(self._entries)
+
+    def get(
+        self, key: Hashable, default: Any = None, stale: bool = False
+    ) -> Any:
+        """
+        Get the value of the given key, if not expired.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the entry.
+        default : Any
+            (Default value = None)
+
+            Value returned when the key is missing or expired.
+        stale : bool
+            (Default value = False)
+
+            Whether to return the value even if expired, as long as it has not
+            been evicted yet.
+
+        Returns
+        -------
+        The cached value, or `default`.
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (not stale and entry[0] <= time.monotonic()):
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        """
+        Set the value of the given key, evicting entries if needed.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the entry.
+        value : Any
+            Value of the entry.
+        ttl : float
+            (Default value = None)
+
+            Seconds after which the entry expires. Defaults to `ttl` of the
+            cache.
+
+        """
+        size = self.sizeof(value) if self.sizeof else 0
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires, size, value)
+            self._bytes += size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Remove the given key from the cache, if present.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the entry.
+
+        """
+        with self._lock:
+            self._remove(key)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the usage counters of the cache.
+
+        Returns
+        -------
+        dict
+            Hits, misses, evictions, number of entries and estimated bytes.
+
+        """
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            bytes=self._bytes,
+        )
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove the given key. The lock must be held by the caller."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
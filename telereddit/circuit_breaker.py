@@ -0,0 +1,251 @@
+"""
+Circuit breaker of the requests to Reddit.
+
+When Reddit is degraded, waiting for every request to time out holds the
+workers for nothing. The circuit breaker tracks the outcome of the recent
+requests and, past a failure rate threshold, fails the following requests
+immediately, until a few probe requests succeed again.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import requests
+
+from telereddit import metrics
+from telereddit.config.config import (
+    BREAKER_FAILURE_RATE,
+    BREAKER_HALF_OPEN_PROBES,
+    BREAKER_MIN_CALLS,
+    BREAKER_OPEN_TIMEOUT,
+    BREAKER_WINDOW,
+)
+from telereddit.exceptions import RedditUnavailableError
+
+
+class State(Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    """Requests are allowed."""
+    OPEN = "open"
+    """Requests fail immediately."""
+    HALF_OPEN = "half_open"
+    """A few probe requests are allowed, to check whether to close again."""
+
+
+_STATE_VALUES = {State.CLOSED: 0, State.HALF_OPEN: 0.5, State.OPEN: 1}
+
+
+def is_failure(error: BaseException) -> bool:
+    """
+    Check whether the given error of a request is a failure of Reddit.
+
+    Connection errors, timeouts and 5xx responses are failures, also when
+    they caused the error raised, e.g. a `RedditError`. Other errors, like the
+    ones of the non existing subreddits or of the removed posts shared by the
+    users, are caused by the request itself.
+
+    Parameters
+    ----------
+    error : BaseException
+        Error raised by the request.
+
+    Returns
+    -------
+    bool
+        True if the error is a failure of Reddit.
+
+    """
+    cause: Optional[BaseException] = error
+    while cause is not None:
+        if isinstance(cause, requests.HTTPError):
+            response = cause.response
+            return response is not None and response.status_code >= 500
+        if isinstance(cause, (requests.ConnectionError, requests.Timeout)):
+            return True
+        cause = cause.__cause__ or cause.__context__
+    return False
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker based on the failure rate of the recent requests.
+
+    Only the failures of Reddit are counted as failures, see `is_failure`:
+    errors caused by the request itself (e.g. non existing subreddits or
+    removed posts) are counted as successes.
+
+    Parameters
+    ----------
+    failure_rate : float
+        (Default value = `telereddit.config.config.BREAKER_FAILURE_RATE`)
+
+        Rate of failed requests in the window which opens the circuit.
+    window : int
+        (Default value = `telereddit.config.config.BREAKER_WINDOW`)
+
+        Number of recent requests on which the failure rate is computed.
+    min_calls : int
+        (Default value = `telereddit.config.config.BREAKER_MIN_CALLS`)
+
+        Min number of requests in the window before the circuit can open.
+    open_timeout : float
+        (Default value = `telereddit.config.config.BREAKER_OPEN_TIMEOUT`)
+
+        Seconds after which an open circuit lets probe requests through.
+    half_open_probes : int
+        (Default value = `telereddit.config.config.BREAKER_HALF_OPEN_PROBES`)
+
+        Number of successful probe requests needed to close the circuit.
+
+    Attributes
+    ----------
+    transitions : Counter
+        Number of state transitions, keyed by (from state, to state).
+    listeners : list
+        Functions called with (from state, to state) at every transition.
+
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        open_timeout: float = BREAKER_OPEN_TIMEOUT,
+        half_open_probes: int = BREAKER_HALF_OPEN_PROBES,
+    ) -> None:
+        self.failure_rate: float = failure_rate
+        self.min_calls: int = min_calls
+        self.open_timeout: float = open_timeout
+        self.half_open_probes: int = half_open_probes
+        self.transitions: Counter = Counter()
+        self.listeners: List[Callable[[State, State], None]] = []
+        self._state: State = State.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at: float = 0
+        self._probes: int = 0
+        self._probe_successes: int = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> State:
+        """Current state of the circuit."""
+        with self._lock:
+            self._check_open_timeout()
+            return self._state
+
+    def call(self, func: Callable, *args: Any) -> Any:
+        """
+        Call the given function through the circuit breaker.
+
+        Parameters
+        ----------
+        func : Callable
+            Function making a request to Reddit.
+        args : Any
+            Positional arguments of `func`.
+
+        Returns
+        -------
+        The return value of `func`.
+
+        Raises
+        ------
+        RedditUnavailableError
+            If the circuit is open.
+
+        """
+        with self._lock:
+            self._check_open_timeout()
+            rejected = self._state == State.OPEN or (
+                self._state == State.HALF_OPEN
+                and self._probes >= self.half_open_probes
+            )
+            probe = self._state == State.HALF_OPEN and not rejected
+            if probe:
+                self._probes += 1
+        if rejected:
+            raise RedditUnavailableError()
+        try:
+            result = func(*args)
+        except Exception as e:
+            self._record(not is_failure(e), probe)
+            raise
+        self._record(True, probe)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of state transitions.
+
+        Returns
+        -------
+        dict
+            Number of transitions, keyed by "from_state->to_state".
+
+        """
+        with self._lock:
+            return {
+                f"{from_state.value}->{to_state.value}": count
+                for (from_state, to_state), count in self.transitions.items()
+            }
+
+    def _record(self, success: bool, probe: bool) -> None:
+        """Record the outcome of a request, made as probe or not."""
+        with self._lock:
+            if probe:
+                if self._state != State.HALF_OPEN:
+                    return
+                self._probes -= 1
+                if not success:
+                    self._transition(State.OPEN)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(State.CLOSED)
+                return
+
+            if self._state != State.CLOSED:
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._transition(State.OPEN)
+
+    def _check_open_timeout(self) -> None:
+        """Let probes through if the open timeout elapsed. Requires the lock."""
+        if (
+            self._state == State.OPEN
+            and time.monotonic() - self._opened_at >= self.open_timeout
+        ):
+            self._transition(State.HALF_OPEN)
+
+    def _transition(self, state: State) -> None:
+        """Move to the given state. The lock must be held by the caller."""
+        from_state, self._state = self._state, state
+        if state == State.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == State.HALF_OPEN:
+            self._probes = 0
+            self._probe_successes = 0
+        elif state == State.CLOSED:
+            self._outcomes.clear()
+        self.transitions[(from_state, state)] += 1
+        metrics.BREAKER_TRANSITIONS.inc(
+            from_state=from_state.value, to_state=state.value
+        )
+        metrics.BREAKER_STATE.set(_STATE_VALUES[state])
+        logging.warning(
+            f"Reddit circuit breaker: {from_state.value} -> {state.value}"
+        )
+        for listener in self.listeners:
+            listener(from_state, state)
@@ -15,11 +15,101 @@ _edit_failed_btn = InlineKeyboardButton(text="Retry ↻", callback_data="edit")
 _more_btn = InlineKeyboardButton(text="＋", callback_data="more")
 
 MAX_TRIES = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4
+RETRY_BUDGET = 15
 MAX_MEDIA_SIZE = 20000000
 MAX_POST_LENGTH = 500
 MAX_TITLE_LENGTH = 200
 REDDIT_DOMAINS = ["reddit.com", "redd.it", "reddit.app.link"]
 
+POOL_SIZE = 8
+POOL_LOW_WATER_MARK = 3
+POOL_TTL = 900
+POOL_MAX_SUBREDDITS = 200
+LISTING_SORT = "hot"
+LISTING_PERIOD = "day"
+LISTING_LIMIT = 100
+
+POST_CACHE_MAX_ENTRIES = 5000
+POST_CACHE_MAX_BYTES = 20000000
+POST_CACHE_TTL = 600
+
+INLINE_RESULTS = 10
+INLINE_INDEX_SIZE = 30
+INLINE_INDEX_TTL = 600
+INLINE_MAX_SUBREDDITS = 500
+INLINE_CACHE_TIME = 60
+INLINE_MISS_CACHE_TIME = 1
+INLINE_DEBOUNCE = 0.5
+INLINE_MAX_PENDING = 50
+INLINE_PENDING_TTL = 10
+
+SUBREDDIT_MAX_ENTRIES = 20000
+SUBREDDIT_VALID_TTL = 86400
+SUBREDDIT_INVALID_TTL = 3600
+
+SEEN_POSTS_PER_CHAT = 32
+SEEN_POSTS_MAX_CHATS = 10000
+SEEN_POSTS_MAX_SKIPS = 2
+
+FILE_ID_MAX_ENTRIES = 20000
+FILE_ID_TTL = 604800
+FILE_ID_DB_TIMEOUT = 5
+
+HTTP_POOL_SIZES = {
+    "www.reddit.com": 16,
+    "reddit.com": 4,
+    "redd.it": 4,
+    "i.redd.it": 16,
+    "v.redd.it": 16,
+}
+HTTP_DEFAULT_POOL_SIZE = 8
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 15
+
+MEDIA_GROUP_SIZE = 10
+
+MEDIA_PROBE_TTL = 3600
+MEDIA_PROBE_MAX_ENTRIES = 10000
+MEDIA_PROBE_TIMEOUT = 3
+MEDIA_PROBE_FAILED_TTL = 60
+
+UPLOAD_SPOOL_SIZE = 5000000
+UPLOAD_CHUNK_SIZE = 65536
+
+GLOBAL_RATE = 30
+GLOBAL_BURST = 30
+PRIVATE_CHAT_RATE = 1
+PRIVATE_CHAT_BURST = 3
+GROUP_CHAT_RATE = 20 / 60
+GROUP_CHAT_BURST = 20
+MAX_RATE_LIMITED_CHATS = 50000
+RETRY_AFTER_TRIES = 3
+
+BREAKER_FAILURE_RATE = 0.5
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 10
+BREAKER_OPEN_TIMEOUT = 30
+BREAKER_HALF_OPEN_PROBES = 3
+
+ASYNC_WORKERS = 32
+TELEGRAM_POOL_SIZE = ASYNC_WORKERS + 4
+MAX_FANOUT = 10
+UPDATE_DEDUP_WINDOW = 600
+UPDATE_DEDUP_MAX_ENTRIES = 20000
+
+QUEUE_CONSUMERS = 16
+QUEUE_VISIBILITY_TIMEOUT = 120
+QUEUE_MAX_ATTEMPTS = 3
+QUEUE_RETRY_DELAY = 5
+QUEUE_POLL_INTERVAL = 0.2
+
+REPORT_QUEUE_SIZE = 1000
+REPORT_DEDUP_WINDOW = 60
+REPORT_DEDUP_MAX_ENTRIES = 1000
+REPORT_SAMPLE_RATES = {"MediaTooBigError": 0.1}
+
 EDIT_KEYBOARD = InlineKeyboardMarkup([[_delete_btn, _edit_btn, _more_btn]])
 EDIT_FAILED_KEYBOARD = InlineKeyboardMarkup(
     [[_delete_btn, _edit_failed_btn, _more_btn]]
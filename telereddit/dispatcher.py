@@ -0,0 +1,166 @@
+"""
+Asyncio dispatcher of telereddit requests.
+
+python-telegram-bot runs every handler in one of its worker threads. Handlers
+instead schedule their coroutines on a single event loop, run by
+`AsyncDispatcher` in a background thread, so that a worker thread is never held
+while Reddit and Telegram requests are in flight.
+
+The dispatcher also makes handling idempotent: updates delivered more than once
+are dropped, and identical requests in flight at the same time are coalesced.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Hashable, Optional
+
+from telereddit import metrics
+from telereddit.cache import TTLCache
+from telereddit.config.config import (
+    ASYNC_WORKERS,
+    UPDATE_DEDUP_MAX_ENTRIES,
+    UPDATE_DEDUP_WINDOW,
+)
+
+
+class AsyncDispatcher:
+    """
+    Run telereddit coroutines on a shared background event loop.
+
+    Attributes
+    ----------
+    loop : AbstractEventLoop
+        The event loop running the coroutines: initialized by `start()`.
+    executor : ThreadPoolExecutor
+        Default executor of `loop`, running the blocking Reddit and Telegram
+        calls.
+    seen_updates : TTLCache
+        Ids of the updates received in the last
+        `telereddit.config.config.UPDATE_DEDUP_WINDOW` seconds.
+
+    """
+
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    executor: Optional[ThreadPoolExecutor] = None
+    seen_updates: TTLCache = TTLCache(
+        UPDATE_DEDUP_MAX_ENTRIES, UPDATE_DEDUP_WINDOW
+    )
+    _seen_lock = threading.Lock()
+    _in_flight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    @classmethod
+    def start(cls, workers: int = ASYNC_WORKERS) -> None:
+        """
+        Start the event loop in a background thread.
+
+        Parameters
+        ----------
+        workers : int
+            (Default value = `telereddit.config.config.ASYNC_WORKERS`)
+
+            Max number of blocking calls running at the same time.
+
+        """
+        if cls.loop is not None:
+            return
+        cls.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="linker"
+        )
+        cls.loop = asyncio.new_event_loop()
+        cls.loop.set_default_executor(cls.executor)
+        threading.Thread(
+            target=cls.loop.run_forever, name="async-dispatcher", daemon=True
+        ).start()
+
+    @classmethod
+    def submit(cls, coro: Coroutine) -> Future:
+        """
+        Schedule the given coroutine on the event loop.
+
+        The event loop is started if it wasn't already.
+
+        Parameters
+        ----------
+        coro : Coroutine
+            Coroutine to run.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future holding the result of the coroutine.
+
+        """
+        if cls.loop is None:
+            cls.start()
+        future = asyncio.run_coroutine_threadsafe(coro, cls.loop)  # type: ignore
+        future.add_done_callback(_log_exception)
+        return future
+
+    @classmethod
+    def is_duplicate(cls, update_id: int) -> bool:
+        """
+        Check whether the update has already been received, and mark it so.
+
+        Telegram delivers again the updates whose webhook request failed or
+        timed out, even if they have been handled.
+
+        Parameters
+        ----------
+        update_id : int
+            Telegram's id of the update.
+
+        Returns
+        -------
+        bool
+            True if the update has been received in the dedup window.
+
+        """
+        with cls._seen_lock:
+            if cls.seen_updates.get(update_id) is not None:
+                metrics.DUPLICATE_UPDATES.inc(reason="update_id")
+                return True
+            cls.seen_updates.set(update_id, True)
+            return False
+
+    @classmethod
+    async def single_flight(
+        cls, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Await the given coroutine function, unless an identical call is running.
+
+        If a call with the same key is in flight, its result is awaited instead
+        of starting a new one. Must be called from the event loop.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key identifying identical calls.
+        func : Callable
+            Coroutine function to call if no identical call is in flight.
+
+        Returns
+        -------
+        The result of the call in flight.
+
+        """
+        task = cls._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            cls._in_flight[key] = task
+            task.add_done_callback(lambda _: cls._in_flight.pop(key, None))
+        else:
+            metrics.DUPLICATE_UPDATES.inc(reason="coalesced")
+        # shielded, so that cancelling a caller doesn't cancel the others
+        return await asyncio.shield(task)
+
+
+def _log_exception(future: Future) -> None:
+    """Log the exception of a failed coroutine, as no one else would."""
+    if not future.cancelled() and future.exception() is not None:
+        logging.error(
+            "Unhandled exception in dispatched coroutine",
+            exc_info=future.exception(),
+        )
@@ -5,12 +5,10 @@ The application follows the try/catch pattern to return errors in the program
 flow between two functions.
 """
 
-import logging
-import os
-import traceback
 from typing import Any
 
-import sentry_sdk as sentry
+from telereddit import metrics
+from telereddit.reporting import reporter
 
 
 class TeleredditError(Exception):
@@ -33,28 +31,26 @@ class TeleredditError(Exception):
         Whether to send the exception to Sentry issue tracking service, if
         Sentry is configured.
 
+    Attributes
+    ----------
+    reported : Boolean
+        Whether the exception is logged and, if `capture` is set, sent to
+        Sentry. Reports are sent in background by
+        `telereddit.reporting.reporter`.
+
     Notes
     -----
     All children exceptions have the same parameters.
 
     """
 
+    reported: bool = True
+
     def __init__(self, msg: Any, data: Any = None, capture: bool = False):
         super().__init__(msg)
-        if (
-            os.getenv("SENTRY_TOKEN") is not None
-            and len(os.getenv("SENTRY_TOKEN")) > 0  # type: ignore
-        ):
-            if data is not None:
-                with sentry.configure_scope() as scope:
-                    for key, value in data.items():
-                        scope.set_extra(key, value)
-            if capture:
-                sentry.capture_exception()
-        traceback.print_exc()
-        logging.error(
-            f"{self.__class__.__name__}, {('data: '+ str(data)) if data else ''}"
-        )
+        metrics.EXCEPTIONS.inc(exception=self.__class__.__name__)
+        if self.reported:
+            reporter.report(self, data, capture)
 
 
 class PostError(TeleredditError):
@@ -108,9 +104,11 @@ class PostEqualsMessageError(PostError):
     -------
     This error is useful when editing a Telegram message with a different post.
     It is thus raised as a correct program flow, and therefore it **should not**
-    be captured from Sentry.
+    be captured from Sentry, nor reported at all.
     """
 
+    reported = False
+
     def __init__(self, data: Any = None, capture: bool = False):
         super().__init__(
             "The retrieved post is equal to the already sent message.",
@@ -130,3 +128,23 @@ class MediaTooBigError(MediaError):
 
     def __init__(self, data: Any = None, capture: bool = True):
         super().__init__("Media is too big to be sent.", data, capture)
+
+
+class RedditUnavailableError(TeleredditError):
+    """
+    Raised when Reddit requests are failing fast because Reddit is degraded.
+
+    Capture
+    -------
+    This error is raised by the circuit breaker as a correct program flow, and
+    therefore it **should not** be captured from Sentry, nor reported at all.
+    """
+
+    reported = False
+
+    def __init__(self, data: Any = None, capture: bool = False):
+        super().__init__(
+            "Reddit is not responding right now, please try again later.",
+            data,
+            capture,
+        )
@@ -0,0 +1,201 @@
+"""
+Stores of the Telegram file_ids of the sent media.
+
+Once Telegram downloads a media from its url, it returns a file_id which can be
+used to send the same media again without downloading it. Stores map media
+urls to their file_id.
+"""
+
+import abc
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from telereddit.cache import TTLCache
+from telereddit.config.config import (
+    FILE_ID_DB_TIMEOUT,
+    FILE_ID_MAX_ENTRIES,
+    FILE_ID_TTL,
+)
+
+
+def get_file_id(message: Any) -> Optional[str]:
+    """
+    Get the file_id of the media attached to the given Telegram message.
+
+    Parameters
+    ----------
+    message : Message
+        python-telegram-bot's instance of the sent Telegram message.
+
+    Returns
+    -------
+    str or None
+        The file_id of the attached media, or None if the message has no media.
+        For photos, the file_id of the largest size is returned.
+
+    """
+    attachment = getattr(message, "effective_attachment", None)
+    if isinstance(attachment, list):
+        attachment = attachment[-1] if attachment else None
+    file_id = getattr(attachment, "file_id", None)
+    return file_id if isinstance(file_id, str) else None
+
+
+class FileIdStore(abc.ABC):
+    """
+    Base class for all file_id stores.
+
+    Notes
+    -----
+    Stores are shared between all the Linker instances, therefore they must be
+    thread safe.
+
+    """
+
+    @abc.abstractmethod
+    def get(self, url: str) -> Optional[str]:
+        """
+        Get the file_id of the media at the given url.
+
+        Parameters
+        ----------
+        url : str
+            Url of the media.
+
+        Returns
+        -------
+        str or None
+            The stored file_id, or None if not stored.
+
+        """
+
+    @abc.abstractmethod
+    def set(self, url: str, file_id: str) -> None:
+        """
+        Store the file_id of the media at the given url.
+
+        Parameters
+        ----------
+        url : str
+            Url of the media.
+        file_id : str
+            file_id returned by Telegram for the media.
+
+        """
+
+    @abc.abstractmethod
+    def pop(self, url: str) -> None:
+        """
+        Remove the file_id of the media at the given url, if stored.
+
+        Parameters
+        ----------
+        url : str
+            Url of the media.
+
+        """
+
+
+class MemoryFileIdStore(FileIdStore):
+    """
+    In-memory LRU file_id store.
+
+    Parameters
+    ----------
+    max_entries : int
+        (Default value = `telereddit.config.config.FILE_ID_MAX_ENTRIES`)
+
+        Max number of stored file_ids.
+    ttl : int
+        (Default value = `telereddit.config.config.FILE_ID_TTL`)
+
+        Seconds after which a file_id expires.
+
+    """
+
+    def __init__(
+        self, max_entries: int = FILE_ID_MAX_ENTRIES, ttl: int = FILE_ID_TTL
+    ) -> None:
+        self.cache: TTLCache = TTLCache(max_entries, ttl)
+
+    def get(self, url: str) -> Optional[str]:
+        """See `FileIdStore.get`."""
+        return self.cache.get(url)
+
+    def set(self, url: str, file_id: str) -> None:
+        """See `FileIdStore.set`."""
+        self.cache.set(url, file_id)
+
+    def pop(self, url: str) -> None:
+        """See `FileIdStore.pop`."""
+        self.cache.pop(url)
+
+
+class SQLiteFileIdStore(FileIdStore):
+    """
+    SQLite file_id store, persisting file_ids across restarts.
+
+    The database can be shared by several processes: it is opened in WAL mode,
+    waiting for the locks of the other processes. Errors writing to it are
+    logged, not raised, since the media they are stored for have already
+    been sent: a file_id not stored only costs a download to Telegram.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite database file.
+    ttl : int
+        (Default value = `telereddit.config.config.FILE_ID_TTL`)
+
+        Seconds after which a file_id expires.
+
+    """
+
+    def __init__(self, path: str, ttl: int = FILE_ID_TTL) -> None:
+        self.ttl: int = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            path, timeout=FILE_ID_DB_TIMEOUT, check_same_thread=False
+        )
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS file_ids "
+                "(url TEXT PRIMARY KEY, file_id TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "DELETE FROM file_ids WHERE created_at <= ?",
+                (time.time() - self.ttl,),
+            )
+
+    def get(self, url: str) -> Optional[str]:
+        """See `FileIdStore.get`."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT file_id FROM file_ids WHERE url = ? AND created_at > ?",
+                (url, time.time() - self.ttl),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, url: str, file_id: str) -> None:
+        """See `FileIdStore.set`."""
+        try:
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO file_ids VALUES (?, ?, ?)",
+                    (url, file_id, time.time()),
+                )
+        except sqlite3.Error as e:
+            logging.warning(f"Error storing the file_id of {url}: {e}")
+
+    def pop(self, url: str) -> None:
+        """See `FileIdStore.pop`."""
+        try:
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM file_ids WHERE url = ?", (url,))
+        except sqlite3.Error as e:
+            logging.warning(f"Error removing the file_id of {url}: {e}")
@@ -0,0 +1,380 @@
+"""
+Index of the inline query results of each subreddit.
+
+Inline queries are sent at every keystroke, and have to be answered within a
+few seconds. They are answered only from memory: the results of every
+subreddit recently queried are rendered in advance, from its listing, and
+refreshed in background when they expire.
+
+Since every keystroke queries a new prefix of the subreddit being typed, the
+subreddits queried are indexed only once no longer one is queried for a short
+while, most recently queried first, and the ones not indexed in time for the
+query to be answered are dropped.
+"""
+
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from pyreddit.pyreddit import reddit
+from pyreddit.pyreddit.exceptions import RedditError, SubredditError
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.post import Post
+from telegram import InlineQueryResult  # type: ignore
+from telegram import (
+    InlineQueryResultArticle,
+    InlineQueryResultPhoto,
+    InputTextMessageContent,
+)
+
+from telereddit import rendering
+from telereddit.circuit_breaker import CircuitBreaker
+from telereddit.config.config import (
+    INLINE_DEBOUNCE,
+    INLINE_INDEX_SIZE,
+    INLINE_INDEX_TTL,
+    INLINE_MAX_PENDING,
+    INLINE_MAX_SUBREDDITS,
+    INLINE_PENDING_TTL,
+    MAX_MEDIA_SIZE,
+)
+from telereddit.exceptions import RedditUnavailableError
+from telereddit.linker import MEDIA_TYPES, get_media_link_msg
+from telereddit.listing import Candidate, ListingFetcher
+from telereddit.post_cache import get_post_id
+from telereddit.subreddits import SubredditRegistry
+
+_Entry = Tuple[float, List[InlineQueryResult]]
+
+
+def build_result(post: Post) -> InlineQueryResult:
+    """
+    Build the inline query result sending the given post.
+
+    Photos are sent as photos. Other media, which Telegram inline results
+    can't send by url without a thumbnail, are sent as text linking them, as
+    the Linker does with the media too big to be sent.
+
+    Parameters
+    ----------
+    post : Post
+        Post to send.
+
+    Returns
+    -------
+    InlineQueryResult
+        The inline query result.
+
+    """
+    result_id = get_post_id(post.permalink) or str(
+        zlib.crc32(post.permalink.encode())
+    )
+    content_type = post.get_type()
+    if content_type == ContentType.PHOTO:
+        return InlineQueryResultPhoto(
+            result_id,
+            photo_url=post.media.url,  # type: ignore
+            thumb_url=post.media.url,  # type: ignore
+            title=post.title,
+            caption=rendering.render(post),
+            parse_mode="MarkdownV2",
+        )
+
+    if content_type in MEDIA_TYPES:
+        msg = get_media_link_msg(post)
+    else:
+        msg = rendering.render(post)
+    preview = content_type in MEDIA_TYPES or content_type == ContentType.YOUTUBE
+    return InlineQueryResultArticle(
+        result_id,
+        title=post.title or post.subreddit,
+        description=post.subreddit,
+        input_message_content=InputTextMessageContent(
+            msg, parse_mode="MarkdownV2", disable_web_page_preview=not preview
+        ),
+    )
+
+
+class InlineIndex:
+    """
+    Per-subreddit index of rendered inline query results.
+
+    Subreddits are indexed on demand the first time they are queried, and
+    refreshed by a background thread when their results expire. Subreddits
+    whose name is the prefix of one queried later are not indexed.
+
+    Parameters
+    ----------
+    listing : ListingFetcher
+        Fetcher of the subreddit listings from which the results are built.
+    size : int
+        (Default value = `telereddit.config.config.INLINE_INDEX_SIZE`)
+
+        Number of results kept for each subreddit.
+    ttl : int
+        (Default value = `telereddit.config.config.INLINE_INDEX_TTL`)
+
+        Seconds after which the results of a subreddit are refreshed.
+    max_subreddits : int
+        (Default value = `telereddit.config.config.INLINE_MAX_SUBREDDITS`)
+
+        Max number of subreddits indexed. The least recently queried
+        subreddit is dropped when the limit is exceeded.
+    breaker : CircuitBreaker
+        (Default value = None)
+
+        Circuit breaker through which Reddit is requested, if any.
+    subreddits : SubredditRegistry
+        (Default value = None)
+
+        Registry of the subreddits known to be valid or invalid, if any.
+        Subreddits known to be invalid are indexed with no results, without
+        requesting Reddit.
+    debounce : float
+        (Default value = `telereddit.config.config.INLINE_DEBOUNCE`)
+
+        Seconds after being queried at which a subreddit is indexed, unless a
+        longer name starting with it is queried meanwhile.
+    max_pending : int
+        (Default value = `telereddit.config.config.INLINE_MAX_PENDING`)
+
+        Max number of subreddits waiting to be indexed. The least recently
+        queried one is dropped when the limit is exceeded.
+    pending_ttl : float
+        (Default value = `telereddit.config.config.INLINE_PENDING_TTL`)
+
+        Seconds after being queried at which a subreddit not indexed yet is
+        dropped, as its query can no longer be answered.
+
+    """
+
+    def __init__(
+        self,
+        listing: ListingFetcher,
+        size: int = INLINE_INDEX_SIZE,
+        ttl: int = INLINE_INDEX_TTL,
+        max_subreddits: int = INLINE_MAX_SUBREDDITS,
+        breaker: Optional[CircuitBreaker] = None,
+        subreddits: Optional[SubredditRegistry] = None,
+        debounce: float = INLINE_DEBOUNCE,
+        max_pending: int = INLINE_MAX_PENDING,
+        pending_ttl: float = INLINE_PENDING_TTL,
+    ) -> None:
+        self.listing: ListingFetcher = listing
+        self.size: int = size
+        self.ttl: int = ttl
+        self.max_subreddits: int = max_subreddits
+        self.breaker: Optional[CircuitBreaker] = breaker
+        self.subreddits: Optional[SubredditRegistry] = subreddits
+        self.debounce: float = debounce
+        self.max_pending: int = max_pending
+        self.pending_ttl: float = pending_ttl
+        self._results: "OrderedDict[str, _Entry]" = OrderedDict()
+        # subreddits waiting to be indexed, in order of last query, with the
+        # time of their first query
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background thread refreshing the results."""
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(
+            target=self._run, name="inline-index", daemon=True
+        )
+        self._worker.start()
+
+    def get(self, subreddit: str) -> Optional[List[InlineQueryResult]]:
+        """
+        Get the indexed results of the given subreddit, if any.
+
+        Querying a subreddit not indexed, or whose results expired, schedules
+        its refresh, replacing the scheduled refreshes of the subreddits whose
+        name it starts with. Expired results are still returned meanwhile.
+
+        Parameters
+        ----------
+        subreddit : str
+            Valid subreddit name.
+
+            .. note:: This should be a r/ prefixed subreddit name.
+
+        Returns
+        -------
+        List[InlineQueryResult] or None
+            The results, or None if the subreddit is not indexed yet.
+
+        """
+        key = subreddit.lower()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None:
+                self._results.move_to_end(key)
+            if (
+                entry is None or now - entry[0] >= self.ttl
+            ) and key not in self._refreshing:
+                self._schedule(key, now)
+        return entry[1] if entry is not None else None
+
+    def _schedule(self, key: str, now: float) -> None:
+        """Schedule the refresh of the key. The lock must be held."""
+        for prefix in [k for k in self._pending if key.startswith(k)]:
+            # the user typed further
+            if prefix != key:
+                del self._pending[prefix]
+        self._pending[key] = self._pending.get(key, now)
+        self._pending.move_to_end(key)
+        while len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+        self._ready.notify()
+
+    def _next(self) -> str:
+        """
+        Wait for the next subreddit to refresh.
+
+        The most recently queried subreddit queried at least `debounce`
+        seconds ago is returned, after dropping the ones queried more than
+        `pending_ttl` seconds ago.
+        """
+        with self._ready:
+            while True:
+                now = time.monotonic()
+                for key, queried in list(self._pending.items()):
+                    if now - queried >= self.pending_ttl:
+                        del self._pending[key]
+                wait: Optional[float] = None
+                for key, queried in reversed(self._pending.items()):
+                    if now - queried >= self.debounce:
+                        del self._pending[key]
+                        self._refreshing.add(key)
+                        return key
+                    delay = queried + self.debounce - now
+                    wait = delay if wait is None else min(wait, delay)
+                self._ready.wait(wait)
+
+    def _run(self) -> None:
+        """Refresh the scheduled subreddits, one at a time."""
+        while True:
+            key = self._next()
+            try:
+                self._refresh(key)
+            except Exception:
+                logging.exception(f"Error indexing the results of {key}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+    def _refresh(self, key: str) -> None:
+        """
+        Build the results of the given subreddit from its listing.
+
+        Listing candidates not holding the whole post are retrieved, up to as
+        many requests as the results to build. Subreddits which don't exist
+        are indexed with no results, so that they are not requested at every
+        keystroke.
+
+        Parameters
+        ----------
+        key : str
+            Lowercase r/ prefixed subreddit name.
+
+        """
+        try:
+            candidates = self._fetch_listing(key)
+        except (RedditError, RedditUnavailableError):
+            return
+
+        results: List[InlineQueryResult] = []
+        requests = 0
+        for candidate in candidates:
+            if len(results) >= self.size:
+                break
+            if candidate.post is None:
+                if requests >= self.size:
+                    continue
+                requests += 1
+            try:
+                post = self._get_candidate_post(candidate)
+            except RedditUnavailableError:
+                break
+            if post is not None:
+                results.append(build_result(post))
+        self._set_results(key, results)
+
+    def _set_results(self, key: str, results: List[InlineQueryResult]) -> None:
+        """Index the given results, evicting the least recently refreshed."""
+        with self._lock:
+            self._results[key] = (time.monotonic(), results)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_subreddits:
+                self._results.popitem(last=False)
+
+    def _get_candidate_post(self, candidate: Candidate) -> Optional[Post]:
+        """
+        Get the post of the given listing candidate, if suitable as a result.
+
+        The post is retrieved from Reddit if the candidate doesn't hold it.
+
+        Parameters
+        ----------
+        candidate : Candidate
+            Listing candidate.
+
+        Returns
+        -------
+        Post or None
+            The post, or None if it couldn't be retrieved or its media is too
+            big to be sent.
+
+        Raises
+        ------
+        RedditUnavailableError
+            If Reddit is failing.
+
+        """
+        post = candidate.post
+        if post is None:
+            try:
+                post = self._call_reddit(reddit.get_post, candidate.permalink)
+            except RedditError:
+                return None
+        if post is None or (
+            post.media and post.media.size and post.media.size > MAX_MEDIA_SIZE
+        ):
+            return None
+        return post
+
+    def _fetch_listing(self, key: str) -> List[Candidate]:
+        """
+        Fetch the listing candidates of the given subreddit.
+
+        Subreddits which don't exist, or known not to, have no candidates.
+        The outcome is recorded in the subreddit registry, if any.
+        """
+        if self.subreddits is not None:
+            try:
+                self.subreddits.check(key)
+            except SubredditError:
+                return []
+        try:
+            candidates = self._call_reddit(self.listing.fetch, key)
+        except SubredditError as e:
+            if self.subreddits is not None:
+                self.subreddits.set_invalid(key, e)
+            return []
+        if self.subreddits is not None:
+            self.subreddits.set_valid(key)
+        return candidates
+
+    def _call_reddit(self, func: Callable, *args: str) -> Any:
+        """Call the given Reddit function through the circuit breaker, if any."""
+        if self.breaker is None:
+            return func(*args)
+        return self.breaker.call(func, *args)
@@ -1,28 +1,104 @@
 """Linker class which handles all telereddit requests."""
 
-from typing import Optional
+import logging
+import random
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
+import requests
 from pyreddit.pyreddit import helpers, reddit
 from pyreddit.pyreddit.exceptions import RedditError, SubredditError
 from pyreddit.pyreddit.models.media import ContentType, Media
+from pyreddit.pyreddit.models.post import Post
 from telegram import InputMediaPhoto  # type: ignore
 from telegram import InputMediaDocument, InputMediaVideo
 from telegram.bot import Bot, Message  # type: ignore
+from telegram.error import BadRequest, TelegramError  # type: ignore
 
+from telereddit import media_group, metrics, rendering
+from telereddit.circuit_breaker import CircuitBreaker
 from telereddit.config.config import (
     DELETE_KEYBOARD,
     EDIT_FAILED_KEYBOARD,
     EDIT_KEYBOARD,
+    INLINE_CACHE_TIME,
+    INLINE_MISS_CACHE_TIME,
+    INLINE_RESULTS,
     MAX_MEDIA_SIZE,
-    MAX_TRIES,
+    MEDIA_GROUP_SIZE,
     NO_EDIT_KEYBOARD,
+    SEEN_POSTS_MAX_SKIPS,
 )
 from telereddit.exceptions import (
     MediaTooBigError,
     PostEqualsMessageError,
     PostSendError,
+    RedditUnavailableError,
     TeleredditError,
 )
+from telereddit.file_store import FileIdStore, get_file_id
+from telereddit.media_group import GalleryFetcher
+from telereddit.media_probe import MediaProbe
+from telereddit.media_upload import MediaDownloader, is_url_fetch_error
+from telereddit.post_cache import PostCache
+from telereddit.post_pool import PostPool
+from telereddit.rate_limiter import RateLimitedBot
+from telereddit.retry import RetryPolicy
+from telereddit.seen_posts import SeenPosts
+from telereddit.subreddits import SubredditRegistry
+
+if TYPE_CHECKING:
+    from telereddit.inline import InlineIndex
+
+MEDIA_TYPES: Dict[
+    ContentType,
+    Tuple[
+        str,
+        str,
+        Type[Union[InputMediaDocument, InputMediaVideo, InputMediaPhoto]],
+    ],
+] = {
+    ContentType.GIF: ("sendDocument", "document", InputMediaDocument),
+    ContentType.VIDEO: ("sendVideo", "video", InputMediaVideo),
+    ContentType.PHOTO: ("sendPhoto", "photo", InputMediaPhoto),
+}
+"""
+Telegram representation of each media type.
+
+Maps each media `ContentType` to the name of the Bot method sending it, the
+name of the media argument of that method and the InputMedia class wrapping it.
+"""
+
+_PROBED_ATTR = "_telereddit_probed"
+
+
+def _is_media_too_big(post: Post) -> bool:
+    """Whether the media of the given post is known to be too big to be sent."""
+    return bool(
+        post.media and post.media.size and post.media.size > MAX_MEDIA_SIZE
+    )
+
+
+def get_media_link_msg(post: Post) -> str:
+    """Get the message of the given post, with a link to its media on top."""
+    url = post.media.url.replace("\\", "\\\\").replace(")", "\\)")  # type: ignore
+    return f"[Media]({url})\n{rendering.render(post)}"
+
+
+def _get_content_type_label(post: Post) -> str:
+    """Get the metrics label of the content type of the given post."""
+    content_type = post.get_type()
+    return content_type.name.lower() if content_type else "none"
 
 
 class Linker:
@@ -34,19 +110,74 @@ class Linker:
 
     Attributes
     ----------
-    bot : Bot
-        python-telegram-bot's Bot instance: initialized by `set_bot()`.
+    bot : Bot or RateLimitedBot
+        python-telegram-bot's Bot instance, possibly wrapped by the rate
+        limiter: initialized by `set_bot()`.
     chat_id : Int
         Telegram's chat id to which to send the message.
+    notify_send_errors : bool
+        Whether to notify the user of the errors sending the posts, which are
+        raised anyway. Disabled when the request is going to be retried.
     args : dict
         Args to construct the Telegram message.
+    post_pool : PostPool
+        Pool of prefetched random posts: initialized by `set_post_pool()`.
+        When not set, random posts are always retrieved from Reddit.
+    post_cache : PostCache
+        Cache of the posts retrieved from share links: initialized by
+        `set_post_cache()`. When not set, posts are always retrieved from
+        Reddit.
+    file_id_store : FileIdStore
+        Store of the Telegram file_ids of the sent media: initialized by
+        `set_file_id_store()`. When not set, media are always sent by url.
+    retry_policy : RetryPolicy
+        Policy retrying the random post requests.
+    reddit_breaker : CircuitBreaker
+        Circuit breaker of the Reddit requests: initialized by
+        `set_reddit_breaker()`. When Reddit is failing, requests are served
+        with the last known posts, if any.
+    media_probe : MediaProbe
+        Probe of the media whose size is not known: initialized by
+        `set_media_probe()`. When not set, media of unknown size are sent
+        anyway.
+    seen_posts : SeenPosts
+        History of the posts recently sent to each chat: initialized by
+        `set_seen_posts()`. When set, random posts already seen by the chat
+        are skipped while other candidates are available.
+    media_downloader : MediaDownloader
+        Downloader of the media Telegram fails to download by url:
+        initialized by `set_media_downloader()`. When not set, those media are
+        not sent.
+    inline_index : InlineIndex
+        Index of the inline query results of the subreddits: initialized by
+        `set_inline_index()`. When not set, inline queries get no results.
+    gallery_fetcher : GalleryFetcher
+        Fetcher of the media of the gallery posts: initialized by
+        `set_gallery_fetcher()`. When not set, gallery posts shared by the
+        chat are sent as returned by pyreddit, instead of as albums.
+    subreddits : SubredditRegistry
+        Registry of the subreddits known to be valid or invalid: initialized
+        by `set_subreddits()`. When set, random posts of subreddits known to
+        be invalid are answered with the last error, without requesting
+        Reddit.
 
     """
 
-    bot: Bot = None
+    bot: Union[Bot, RateLimitedBot] = None
+    post_pool: Optional[PostPool] = None
+    post_cache: Optional[PostCache] = None
+    file_id_store: Optional[FileIdStore] = None
+    retry_policy: RetryPolicy = RetryPolicy()
+    reddit_breaker: Optional[CircuitBreaker] = None
+    media_probe: Optional[MediaProbe] = None
+    seen_posts: Optional[SeenPosts] = None
+    media_downloader: Optional[MediaDownloader] = None
+    inline_index: Optional["InlineIndex"] = None
+    subreddits: Optional[SubredditRegistry] = None
+    gallery_fetcher: Optional[GalleryFetcher] = None
 
     @classmethod
-    def set_bot(cls, bot: Bot) -> None:
+    def set_bot(cls, bot: Union[Bot, RateLimitedBot]) -> None:
         """
         Set the python-telegram-bot's Bot instance for the Linker object.
 
@@ -56,14 +187,146 @@ class Linker:
 
         Parameters
         ----------
-        bot : Bot
-            The bot instance provided by python-telegram-bot
+        bot : Bot or RateLimitedBot
+            The bot instance provided by python-telegram-bot, possibly wrapped
+            by the rate limiter.
 
         """
         cls.bot = bot
 
-    def __init__(self, chat_id: int) -> None:
+    @classmethod
+    def set_post_pool(cls, post_pool: PostPool) -> None:
+        """
+        Set the prefetched random posts pool for the Linker object.
+
+        Parameters
+        ----------
+        post_pool : PostPool
+            Already started pool of prefetched posts.
+
+        """
+        cls.post_pool = post_pool
+
+    @classmethod
+    def set_post_cache(cls, post_cache: PostCache) -> None:
+        """
+        Set the retrieved posts cache for the Linker object.
+
+        Parameters
+        ----------
+        post_cache : PostCache
+            Cache of the posts retrieved from share links.
+
+        """
+        cls.post_cache = post_cache
+
+    @classmethod
+    def set_file_id_store(cls, file_id_store: FileIdStore) -> None:
+        """
+        Set the store of the Telegram file_ids for the Linker object.
+
+        Parameters
+        ----------
+        file_id_store : FileIdStore
+            Store of the file_ids of the already sent media.
+
+        """
+        cls.file_id_store = file_id_store
+
+    @classmethod
+    def set_reddit_breaker(cls, reddit_breaker: CircuitBreaker) -> None:
+        """
+        Set the circuit breaker of the Reddit requests for the Linker object.
+
+        Parameters
+        ----------
+        reddit_breaker : CircuitBreaker
+            Circuit breaker through which Reddit is requested.
+
+        """
+        cls.reddit_breaker = reddit_breaker
+
+    @classmethod
+    def set_media_probe(cls, media_probe: MediaProbe) -> None:
+        """
+        Set the probe of the media size for the Linker object.
+
+        Parameters
+        ----------
+        media_probe : MediaProbe
+            Probe of the size of the media, before sending them.
+
+        """
+        cls.media_probe = media_probe
+
+    @classmethod
+    def set_seen_posts(cls, seen_posts: SeenPosts) -> None:
+        """
+        Set the history of the posts seen by the chats for the Linker object.
+
+        Parameters
+        ----------
+        seen_posts : SeenPosts
+            History of the posts recently sent to each chat.
+
+        """
+        cls.seen_posts = seen_posts
+
+    @classmethod
+    def set_media_downloader(cls, media_downloader: MediaDownloader) -> None:
+        """
+        Set the downloader of the media to upload for the Linker object.
+
+        Parameters
+        ----------
+        media_downloader : MediaDownloader
+            Downloader of the media Telegram fails to download by url.
+
+        """
+        cls.media_downloader = media_downloader
+
+    @classmethod
+    def set_inline_index(cls, inline_index: "InlineIndex") -> None:
+        """
+        Set the index of the inline query results for the Linker object.
+
+        Parameters
+        ----------
+        inline_index : InlineIndex
+            Already started index of the inline query results.
+
+        """
+        cls.inline_index = inline_index
+
+    @classmethod
+    def set_subreddits(cls, subreddits: SubredditRegistry) -> None:
+        """
+        Set the registry of the valid and invalid subreddits for the Linker.
+
+        Parameters
+        ----------
+        subreddits : SubredditRegistry
+            Registry of the subreddits known to be valid or invalid.
+
+        """
+        cls.subreddits = subreddits
+
+    @classmethod
+    def set_gallery_fetcher(cls, gallery_fetcher: GalleryFetcher) -> None:
+        """
+        Set the fetcher of the media of the gallery posts for the Linker.
+
+        Parameters
+        ----------
+        gallery_fetcher : GalleryFetcher
+            Fetcher of the media of the gallery posts.
+
+        """
+        cls.gallery_fetcher = gallery_fetcher
+
+    def __init__(self, chat_id: int, notify_send_errors: bool = True) -> None:
         self.chat_id: int = chat_id
+        self.notify_send_errors: bool = notify_send_errors
         self.args: dict = dict(
             chat_id=chat_id,
             parse_mode="MarkdownV2",
@@ -93,11 +356,22 @@ class Linker:
             args.update(override_dict)
         return args
 
-    def send_random_post(self, subreddit: str) -> None:
+    def send_random_post(
+        self,
+        subreddit: str,
+        post: Optional[Post] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
         """
         Send a random post to the chat from the given subreddit.
 
-        Potentially catch Telereddit exceptions.
+        Potentially catch Telereddit exceptions. The user is notified of the
+        errors, then the ones sending the post are raised again, so that the
+        caller knows the post was not sent: the user is not notified of those
+        if `notify_send_errors` is disabled.
+
+        The post is taken from the prefetched posts pool, if available,
+        otherwise it is retrieved from Reddit.
 
         Parameters
         ----------
@@ -106,32 +380,80 @@ class Linker:
 
             .. note:: This should be a r/ prefixed subreddit name.
 
+        post : Post
+            (Default value = None)
+
+            Random post of the subreddit already retrieved, to be tried first.
+        error : BaseException
+            (Default value = None)
+
+            Error retrieving the random post already, with its retries: it is
+            handled as the error of the request, without retrieving a post.
+
         """
-        for _ in range(MAX_TRIES):
+        prefetched_posts = [post] if post is not None else []
+
+        def attempt() -> None:
+            if prefetched_posts:
+                return self.send_fetched_post(prefetched_posts.pop())
+            self._check_subreddit(subreddit)
+            pooled_post = self._get_pooled_post(subreddit)
+            if pooled_post is not None:
+                return self.send_fetched_post(pooled_post)
             try:
-                return self.send_post(helpers.get_random_post_url(subreddit))
-            except (RedditError, TeleredditError) as e:
-                err = e
-                if isinstance(e, SubredditError):
-                    break
-        return self._send_exception_message(err)
+                post_url = self._get_random_post_url(subreddit)
+            except RedditUnavailableError as e:
+                return self.send_fetched_post(
+                    self._get_stale_post(subreddit, e)
+                )
+            return self.send_post(post_url)
+
+        try:
+            if error is not None:
+                raise error
+            return self.retry_policy.run(attempt)
+        except (RedditError, TeleredditError) as e:
+            self._handle_request_error(e)
 
-    def send_post_from_url(self, post_url: str) -> None:
+    def send_post_from_url(
+        self,
+        post_url: str,
+        post: Optional[Post] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
         """
         Try to send the reddit post relative to post_url to the chat.
 
-        Potentially catch Telereddit exceptions.
+        Potentially catch Telereddit exceptions. The user is notified of the
+        errors, then the ones sending the post are raised again, so that the
+        caller knows the post was not sent: the user is not notified of those
+        if `notify_send_errors` is disabled.
 
         Parameters
         ----------
         post_url : str
             Reddit share link of the post.
 
+        post : Post
+            (Default value = None)
+
+            The post relative to post_url, if already retrieved.
+        error : BaseException
+            (Default value = None)
+
+            Error retrieving the post already: it is handled as the error of
+            the request, without retrieving the post again.
+
         """
         try:
-            self.send_post(post_url, from_url=True)
+            if error is not None:
+                raise error
+            if post is not None:
+                self.send_fetched_post(post, from_url=True)
+            else:
+                self.send_post(post_url, from_url=True)
         except (RedditError, TeleredditError) as e:
-            self._send_exception_message(e, keyboard=False)
+            self._handle_request_error(e, keyboard=False)
 
     def send_post(self, post_url: str, from_url: bool = False) -> None:
         """
@@ -151,10 +473,110 @@ class Linker:
             from the random post.
 
         """
-        post = reddit.get_post(post_url)
+        self.send_fetched_post(self.fetch_post(post_url), from_url)
+
+    def fetch_post(self, post_url: str) -> Post:
+        """
+        Retrieve the reddit post relative to post_url.
+
+        The post is taken from the posts cache, if present. If Reddit is not
+        available, the last known version of the post is returned, if any.
+
+        Parameters
+        ----------
+        post_url : str
+            Reddit share link of the post.
+
+        Returns
+        -------
+        `pyreddit.pyreddit.models.post.Post`
+            The retrieved post.
+
+        """
+        if self.post_cache is not None:
+            cached_post = self.post_cache.get(post_url)
+            if cached_post is not None:
+                return cached_post
+
+        try:
+            post = self._call_reddit(reddit.get_post, post_url)
+        except RedditUnavailableError:
+            if self.post_cache is None:
+                raise
+            stale_post = self.post_cache.get(post_url, stale=True)
+            if stale_post is None:
+                raise
+            return stale_post
         assert post is not None
-        if post.media and post.media.size and post.media.size > MAX_MEDIA_SIZE:
+        self._probe_media(post)
+        self._fetch_gallery(post)
+        rendering.render(post)
+        if self.post_cache is not None:
+            self.post_cache.set(post_url, post)
+        return post
+
+    def fetch_random_post(
+        self, subreddit: str, media_only: bool = False
+    ) -> Post:
+        """
+        Retrieve a random post from the given subreddit.
+
+        The post is taken from the prefetched posts pool, if available,
+        otherwise it is retrieved from Reddit. If Reddit is not available, one
+        of the last prefetched posts is returned, if any.
+
+        Parameters
+        ----------
+        subreddit : str
+            Valid subreddit name.
+        media_only : Boolean
+            (Default value = False)
+
+            Whether to prefer the posts which can be sent as media, among the
+            prefetched ones.
+
+        Returns
+        -------
+        `pyreddit.pyreddit.models.post.Post`
+            The retrieved post.
+
+        """
+        self._check_subreddit(subreddit)
+        post = self._get_pooled_post(subreddit, media_only)
+        if post is not None:
+            return post
+        try:
+            post_url = self._get_random_post_url(subreddit)
+        except RedditUnavailableError as e:
+            return self._get_stale_post(subreddit, e)
+        return self.fetch_post(post_url)
+
+    def send_fetched_post(self, post: Post, from_url: bool = False) -> None:
+        """
+        Send the given, already retrieved, reddit post to the chat.
+
+        Parameters
+        ----------
+        post : Post
+            Reddit post to send.
+
+        from_url : Boolean
+            (Default value = False)
+
+            Indicates whether the post url has been received from the chat or
+            from the random post.
+
+            Posts received from the chat whose media is too big are sent as
+            text, linking the media, while random ones are rejected. Gallery
+            posts received from the chat are sent as albums.
+
+        """
+        self._probe_media(post)
+        media_too_big = _is_media_too_big(post)
+        if media_too_big and not from_url:
             raise MediaTooBigError()
+        if from_url and self._send_gallery(post):
+            return
 
         args = self.get_args()
         if from_url:
@@ -162,30 +584,63 @@ class Linker:
             # edit custom keyboard
             args["reply_markup"] = NO_EDIT_KEYBOARD
 
-        try:
-            if post.get_type() == ContentType.TEXT:
-                return self.bot.sendMessage(text=post.get_msg(), **args)
-            elif post.get_type() == ContentType.YOUTUBE:
-                args["disable_web_page_preview"] = False
-                return self.bot.sendMessage(text=post.get_msg(), **args)
+        with metrics.TELEGRAM_LATENCY.time(
+            operation="send", content_type=_get_content_type_label(post)
+        ):
+            try:
+                self._send_post_message(post, args, media_too_big)
+            except Exception as e:
+                raise PostSendError(
+                    {
+                        "post_url": post.permalink,
+                        "media_url": post.media.url if post.media else "",
+                    }
+                ) from e
+        self._mark_seen(post)
 
-            assert post.media is not None
-            args["caption"] = post.get_msg()
+    def send_album_from_urls(self, posts: List[Post]) -> bool:
+        """
+        Send the given reddit posts shared by the chat as a single album.
+
+        Each media is captioned with its post. The keyboard of the posts is
+        sent in a message replying to the album.
 
-            if post.get_type() == ContentType.GIF:
-                self.bot.sendDocument(document=post.media.url, **args)
-            elif post.get_type() == ContentType.VIDEO:
-                self.bot.sendVideo(video=post.media.url, **args)
-            elif post.get_type() == ContentType.PHOTO:
-                self.bot.sendPhoto(photo=post.media.url, **args)
+        Parameters
+        ----------
+        posts : List[Post]
+            The posts retrieved from the shared links, up to
+            `telereddit.config.config.MEDIA_GROUP_SIZE`, all of them
+            `telereddit.media_group.is_groupable`.
 
-        except Exception as e:
+        Returns
+        -------
+        bool
+            True if the album has been sent, False if Telegram rejected it and
+            the posts have to be sent one at a time instead.
+
+        Raises
+        ------
+        PostSendError
+            If the album couldn't be sent for other reasons.
+
+        """
+        try:
+            with metrics.TELEGRAM_LATENCY.time(
+                operation="send", content_type="album"
+            ):
+                messages = self._send_media_group(
+                    [(post.media, rendering.render(post)) for post in posts]
+                )
+        except BadRequest:
+            return False
+        except TelegramError as e:
             raise PostSendError(
-                {
-                    "post_url": post.permalink,
-                    "media_url": post.media.url if post.media else "",
-                }
+                {"post_url": posts[0].permalink, "media_url": posts[0].media.url}  # type: ignore
             ) from e
+        for post in posts:
+            self._mark_seen(post)
+        self._send_album_keyboard(messages, posts)
+        return True
 
     def edit_result(self, message: Message) -> None:
         """
@@ -206,11 +661,12 @@ class Linker:
         if subreddit is None:
             return
 
-        for _ in range(MAX_TRIES):
-            try:
-                return self.edit_random_post(message, subreddit)
-            except (RedditError, TeleredditError):
-                pass
+        try:
+            return self.retry_policy.run(
+                lambda: self.edit_random_post(message, subreddit)
+            )
+        except (RedditError, TeleredditError):
+            pass
         if str(message.reply_markup) != str(EDIT_FAILED_KEYBOARD):
             self.bot.editMessageReplyMarkup(
                 self.chat_id,
@@ -232,46 +688,88 @@ class Linker:
 
         """
         msg_is_text = message.caption is None
-        post = reddit.get_post(helpers.get_random_post_url(subreddit))
-        assert post is not None
-        if (
-            (msg_is_text and message.text_markdown_v2 == post.get_msg())
-            or message.caption_markdown_v2 == post.get_msg()
-            or (
-                not msg_is_text
-                and post.get_type() in [ContentType.TEXT, ContentType.YOUTUBE]
+        post = self.fetch_random_post(subreddit, media_only=not msg_is_text)
+        self._probe_media(post)
+        if _is_media_too_big(post):
+            raise MediaTooBigError()
+        if msg_is_text:
+            post_equals_message = rendering.is_rendered(
+                message.text_markdown_v2, post
             )
+        else:
+            post_equals_message = rendering.is_rendered(
+                message.caption_markdown_v2, post
+            )
+        if post_equals_message or (
+            not msg_is_text and post.get_type() not in MEDIA_TYPES
         ):
             # if post is the same or message is not text and post is: retry
             raise PostEqualsMessageError()
 
         args = self.get_args({"message_id": message.message_id})
-        try:
-            if msg_is_text:
-                if post.get_type() == ContentType.YOUTUBE:
-                    args["disable_web_page_preview"] = False
-                self.bot.editMessageText(post.get_msg(), **args)
-            else:
-                media: Optional[Media] = None
-                media_args = dict(
-                    media=post.media.url,  # type: ignore
-                    caption=post.get_msg(),
-                    parse_mode="MarkdownV2",
-                )
-                if post.get_type() == ContentType.GIF:
-                    media = InputMediaDocument(**media_args)
-                elif post.get_type() == ContentType.VIDEO:
-                    media = InputMediaVideo(**media_args)
-                elif post.get_type() == ContentType.PHOTO:
-                    media = InputMediaPhoto(**media_args)
-                self.bot.editMessageMedia(media=media, **args)
-            return
-        except Exception as e:
-            raise PostSendError(
-                {"post_url": post.permalink, "media_url": post.media.url}  # type: ignore
-            ) from e
+        with metrics.TELEGRAM_LATENCY.time(
+            operation="edit", content_type=_get_content_type_label(post)
+        ):
+            try:
+                if msg_is_text:
+                    if post.get_type() == ContentType.YOUTUBE:
+                        args["disable_web_page_preview"] = False
+                    self.bot.editMessageText(rendering.render(post), **args)
+                else:
+                    input_media = MEDIA_TYPES[post.get_type()][2]
+                    self._call_with_media(
+                        post.media.url,  # type: ignore
+                        lambda media: self.bot.editMessageMedia(
+                            media=input_media(
+                                media=media,
+                                caption=rendering.render(post),
+                                parse_mode="MarkdownV2",
+                            ),
+                            **args,
+                        ),
+                    )
+                self._mark_seen(post)
+                return
+            except Exception as e:
+                raise PostSendError(
+                    {"post_url": post.permalink, "media_url": post.media.url}  # type: ignore
+                ) from e
+
+    def answer_inline_query(self, inline_query_id: str, query: str) -> None:
+        """
+        Answer an inline query with random posts of the queried subreddit.
+
+        Results are taken from the inline index only: subreddits not indexed
+        yet get no results, with a short cache time so that the query is
+        repeated once they are.
+
+        Parameters
+        ----------
+        inline_query_id : str
+            Telegram's id of the inline query.
+        query : str
+            Text of the inline query.
 
-    def delete_message(self, message: Message):
+        """
+        subreddit = helpers.get_subreddit_name(query)
+        results = None
+        if subreddit and self.inline_index is not None:
+            results = self.inline_index.get(subreddit)
+
+        if results is None:
+            self.bot.answerInlineQuery(
+                inline_query_id, [], cache_time=INLINE_MISS_CACHE_TIME
+            )
+        else:
+            self.bot.answerInlineQuery(
+                inline_query_id,
+                random.sample(results, min(len(results), INLINE_RESULTS)),
+                cache_time=INLINE_CACHE_TIME,
+            )
+
+    def delete_message(
+        self, message: Message, album_ids: Sequence[int] = ()
+    ) -> None:
         """
         Delete a bot's message from the chat.
 
@@ -279,10 +777,467 @@ class Linker:
         ----------
         message : Message
             python-telegram-bot's instance of the message object.
+        album_ids : Sequence[int]
+            (Default value = ())
+
+            Ids of the album messages to delete together with the message,
+            see `telereddit.media_group.get_album_message_ids`.
 
         """
+        for album_id in album_ids:
+            try:
+                self.bot.deleteMessage(message.chat_id, album_id)
+            except BadRequest:
+                # already deleted
+                pass
         self.bot.deleteMessage(message.chat_id, message.message_id)
 
+    def _send_post_message(
+        self, post: Post, args: dict, media_too_big: bool
+    ) -> None:
+        """
+        Call the Telegram method sending the given post.
+
+        Parameters
+        ----------
+        post : Post
+            Reddit post to send.
+        args : dict
+            Args of the Telegram message.
+        media_too_big : Boolean
+            Whether to send the post as text, linking its media.
+
+        """
+        if media_too_big:
+            args["disable_web_page_preview"] = False
+            self.bot.sendMessage(text=get_media_link_msg(post), **args)
+        elif post.get_type() == ContentType.TEXT:
+            self.bot.sendMessage(text=rendering.render(post), **args)
+        elif post.get_type() == ContentType.YOUTUBE:
+            args["disable_web_page_preview"] = False
+            self.bot.sendMessage(text=rendering.render(post), **args)
+        elif post.get_type() in MEDIA_TYPES:
+            assert post.media is not None
+            args["caption"] = rendering.render(post)
+            method, field, _ = MEDIA_TYPES[post.get_type()]
+            send = getattr(self.bot, method)
+            self._call_with_media(
+                post.media.url,
+                lambda media: send(**{field: media}, **args),
+            )
+
+    def _send_gallery(self, post: Post) -> bool:
+        """
+        Send the given gallery post as albums of its media.
+
+        The caption of the post is set on the first media. Galleries bigger
+        than an album are split evenly into more albums, since an album needs
+        at least two media.
+
+        Parameters
+        ----------
+        post : Post
+            Reddit post to send.
+
+        Returns
+        -------
+        bool
+            True if the post was sent, False if it is not a gallery or the
+            albums couldn't be sent.
+
+        """
+        gallery = media_group.get_gallery(post)
+        if not gallery or len(gallery) < 2:
+            return False
+        items: List[Tuple[Media, str]] = [(media, "") for media in gallery]
+        # the caption of the first media is shown as caption of the album
+        items[0] = (gallery[0], rendering.render(post))
+        albums = -(-len(items) // MEDIA_GROUP_SIZE)
+        size = -(-len(items) // albums)
+        messages: List[Message] = []
+        try:
+            with metrics.TELEGRAM_LATENCY.time(
+                operation="send", content_type="album"
+            ):
+                for start in range(0, len(items), size):
+                    messages += self._send_media_group(
+                        items[start : start + size]
+                    )
+        except TelegramError as e:
+            if not messages and isinstance(e, BadRequest):
+                return False
+            raise PostSendError(
+                {"post_url": post.permalink, "media_url": post.media.url}  # type: ignore
+            ) from e
+        self._mark_seen(post)
+        self._send_album_keyboard(messages, [post])
+        return True
+
+    def _send_album_keyboard(
+        self, messages: List[Message], posts: List[Post]
+    ) -> None:
+        """
+        Send the keyboard of the given albums, replying to them.
+
+        The text of the message lists the subreddits of the posts, for the
+        more button. The albums are already sent, so errors are only logged.
+
+        Parameters
+        ----------
+        messages : List[Message]
+            The sent album messages, in order.
+        posts : List[Post]
+            The posts sent in the albums.
+
+        """
+        subreddits = list(dict.fromkeys(post.subreddit for post in posts))
+        try:
+            self.bot.sendMessage(
+                chat_id=self.chat_id,
+                text=" ".join(subreddits),
+                reply_to_message_id=messages[0].message_id,
+                reply_markup=media_group.get_album_keyboard(messages),
+                disable_notification=True,
+            )
+        except TelegramError:
+            logging.warning(
+                "Error sending the keyboard of an album", exc_info=True
+            )
+
+    def _send_media_group(
+        self, items: List[Tuple[Media, str]]
+    ) -> List[Message]:
+        """
+        Send the given media as an album.
+
+        Media already stored by Telegram are sent by file_id. If that fails,
+        the album is sent again by url.
+
+        Parameters
+        ----------
+        items : List[Tuple[Media, str]]
+            Photos and videos to send, with their caption, empty if none.
+
+        Returns
+        -------
+        List[Message]
+            The sent messages, one per media.
+
+        """
+
+        def send(by_file_id: bool) -> List[Message]:
+            input_media = []
+            for media, caption in items:
+                file_id = None
+                if by_file_id and self.file_id_store is not None:
+                    file_id = self.file_id_store.get(media.url)
+                input_media.append(
+                    MEDIA_TYPES[media.type][2](
+                        media=file_id or media.url,
+                        caption=caption,
+                        parse_mode="MarkdownV2",
+                    )
+                )
+            return self.bot.sendMediaGroup(
+                chat_id=self.chat_id, media=input_media
+            )
+
+        if self.file_id_store is None:
+            return send(by_file_id=False)
+        try:
+            messages = send(by_file_id=True)
+        except BadRequest:
+            messages = send(by_file_id=False)
+        for (media, _), message in zip(items, messages):
+            file_id = get_file_id(message)
+            if file_id is not None:
+                self.file_id_store.set(media.url, file_id)
+        return messages
+
+    def _fetch_gallery(self, post: Post) -> None:
+        """Retrieve the media of the given post, if it is a gallery."""
+        if self.gallery_fetcher is None:
+            return
+        gallery_id = media_group.get_gallery_id(post)
+        if gallery_id is None:
+            return
+        try:
+            gallery = self._call_reddit(self.gallery_fetcher.fetch, gallery_id)
+        except (RedditError, RedditUnavailableError):
+            return
+        media_group.set_gallery(post, gallery)
+
+    def _call_with_media(self, url: str, call: Callable[[Any], Any]) -> Any:
+        """
+        Call a Telegram method sending the media at the given url.
+
+        If Telegram already stored the media, its file_id is sent instead of
+        the url, so that Telegram doesn't have to download the media again. If
+        sending by file_id fails, the media is sent again by url. If Telegram
+        fails to download the url, the media is downloaded and uploaded.
+
+        Parameters
+        ----------
+        url : str
+            Url of the media.
+        call : Callable
+            Function calling the Telegram method with the given media, either
+            as file_id, as url or as file.
+
+        Returns
+        -------
+        The return value of `call`.
+
+        """
+        if self.file_id_store is not None:
+            file_id = self.file_id_store.get(url)
+            if file_id is not None:
+                try:
+                    return call(file_id)
+                except BadRequest:
+                    self.file_id_store.pop(url)
+
+        try:
+            message = call(url)
+        except BadRequest as e:
+            if self.media_downloader is None or not is_url_fetch_error(e):
+                raise
+            message = self._upload_media(url, call, e)
+        if self.file_id_store is not None:
+            file_id = get_file_id(message)
+            if file_id is not None:
+                self.file_id_store.set(url, file_id)
+        return message
+
+    def _upload_media(
+        self, url: str, call: Callable[[Any], Any], error: BadRequest
+    ) -> Any:
+        """
+        Call a Telegram method uploading the media at the given url.
+
+        Parameters
+        ----------
+        url : str
+            Url of the media.
+        call : Callable
+            Function calling the Telegram method with the given media.
+        error : BadRequest
+            Error of the Telegram method called with the url, raised if the
+            media can't be downloaded.
+
+        Returns
+        -------
+        The return value of `call`.
+
+        """
+        assert self.media_downloader is not None
+        try:
+            with self.media_downloader.download(url) as media:
+                message = call(media)
+        except requests.RequestException:
+            metrics.MEDIA_UPLOADS.inc(result="download_failed")
+            raise error
+        except MediaTooBigError:
+            metrics.MEDIA_UPLOADS.inc(result="too_big")
+            raise
+        metrics.MEDIA_UPLOADS.inc(result="uploaded")
+        return message
+
+    def _probe_media(self, post: Post) -> None:
+        """
+        Probe the size of the media of the given post, if not known.
+
+        Each post is probed once, even if the probe fails, since it is tried
+        again for each step of the request retrieving, sending or editing it.
+
+        Parameters
+        ----------
+        post : Post
+            Post whose media size is filled in, if the probe succeeds.
+
+        """
+        if (
+            self.media_probe is None
+            or post.media is None
+            or post.media.size
+            or post.get_type() not in MEDIA_TYPES
+            or post.__dict__.get(_PROBED_ATTR)
+        ):
+            return
+        post.__dict__[_PROBED_ATTR] = True
+        post.media.size = self.media_probe.probe(post.media.url).size
+
+    def _call_reddit(self, func: Callable, *args: str) -> Any:
+        """
+        Call the given Reddit function through the circuit breaker, if set.
+
+        Parameters
+        ----------
+        func : Callable
+            pyreddit function making a request to Reddit.
+        args : str
+            Positional arguments of `func`.
+
+        Returns
+        -------
+        The return value of `func`.
+
+        """
+        with metrics.REDDIT_LATENCY.time(
+            operation=getattr(func, "__name__", "request")
+        ):
+            if self.reddit_breaker is None:
+                return func(*args)
+            return self.reddit_breaker.call(func, *args)
+
+    def _get_stale_post(
+        self, subreddit: str, error: RedditUnavailableError
+    ) -> Post:
+        """
+        Get one of the last prefetched posts of the given subreddit.
+
+        Parameters
+        ----------
+        subreddit : str
+            Valid subreddit name.
+        error : RedditUnavailableError
+            Error to raise if there's no prefetched post.
+
+        Returns
+        -------
+        `pyreddit.pyreddit.models.post.Post`
+            The stale post.
+
+        """
+        post = self.post_pool.get_stale(subreddit) if self.post_pool else None
+        if post is None:
+            raise error
+        return post
+
+    def _get_pooled_post(
+        self, subreddit: str, media_only: bool = False
+    ) -> Optional[Post]:
+        """
+        Get a prefetched random post of the given subreddit, if any.
+
+        Parameters
+        ----------
+        subreddit : str
+            Valid subreddit name.
+        media_only : Boolean
+            (Default value = False)
+
+            Whether to skip the posts which can't be sent as media.
+
+        Returns
+        -------
+        `pyreddit.pyreddit.models.post.Post` or None
+            The prefetched post, or None if the pool is not set or empty.
+
+        """
+        if self.post_pool is None:
+            return None
+        if self.seen_posts is None and not media_only:
+            post = self.post_pool.get(subreddit)
+        else:
+            post = self.post_pool.get(
+                subreddit,
+                skip=lambda post: self._skip_pooled(post, media_only),
+            )
+        if post is not None and self.subreddits is not None:
+            self.subreddits.set_valid(subreddit)
+        return post
+
+    def _get_random_post_url(self, subreddit: str) -> str:
+        """
+        Get the url of a random post of the given subreddit from Reddit.
+
+        Random posts are requested again while recently seen by the chat, up
+        to `telereddit.config.config.SEEN_POSTS_MAX_SKIPS` requests in all:
+        the last one is returned anyway. The outcome is recorded in the
+        subreddit registry, if set.
+
+        Parameters
+        ----------
+        subreddit : str
+            Valid subreddit name.
+
+        Returns
+        -------
+        str
+            The url of the random post.
+
+        """
+        requests = max(SEEN_POSTS_MAX_SKIPS, 1)
+        try:
+            for i in range(requests):
+                post_url = self._call_reddit(
+                    helpers.get_random_post_url, subreddit
+                )
+                if i == requests - 1 or not self._is_seen(post_url):
+                    break
+                metrics.SEEN_POSTS_SKIPPED.inc(source="reddit")
+        except SubredditError as e:
+            if self.subreddits is not None:
+                self.subreddits.set_invalid(subreddit, e)
+            raise
+        if self.subreddits is not None:
+            self.subreddits.set_valid(subreddit)
+        return post_url
+
+    def _check_subreddit(self, subreddit: str) -> None:
+        """Raise the last error of the given subreddit, if known invalid."""
+        if self.subreddits is not None:
+            self.subreddits.check(subreddit)
+
+    def _is_seen(self, post_url: str) -> bool:
+        """Whether the post of the given url was recently seen by the chat."""
+        return self.seen_posts is not None and self.seen_posts.is_seen(
+            self.chat_id, post_url
+        )
+
+    def _skip_pooled(self, post: Post, media_only: bool) -> bool:
+        """Whether to skip the given pooled post, as unsuitable or seen."""
+        if media_only and post.get_type() not in MEDIA_TYPES:
+            return True
+        if not self._is_seen(post.permalink):
+            return False
+        metrics.SEEN_POSTS_SKIPPED.inc(source="pool")
+        return True
+
+    def _mark_seen(self, post: Post) -> None:
+        """Remember that the chat saw the given post."""
+        if self.seen_posts is not None:
+            self.seen_posts.add(self.chat_id, post.permalink)
+
+    def _handle_request_error(
+        self, e: Exception, keyboard: bool = True
+    ) -> None:
+        """
+        Notify the user of the error of a request, raising the send errors.
+
+        Parameters
+        ----------
+        e : Exception
+            Error of the request.
+        keyboard : Boolean
+            (Default value = True)
+            Whether to add the delete button as a keyboard to the message.
+
+        Raises
+        ------
+        PostSendError
+            If the error is one sending the post, so that the caller knows the
+            post was not sent. The user is notified of it only if
+            `notify_send_errors` is enabled.
+
+        """
+        if isinstance(e, PostSendError):
+            if self.notify_send_errors:
+                self._send_exception_message(e, keyboard)
+            raise e
+        self._send_exception_message(e, keyboard)
+
     def _send_exception_message(
         self, e: Exception, keyboard: bool = True
     ) -> None:
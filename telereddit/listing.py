@@ -0,0 +1,203 @@
+"""
+Batched retrieval of random post candidates from the subreddit listings.
+
+Retrieving a random post costs a request for its url and one for the post.
+A single listing request instead returns up to a hundred posts of the
+subreddit, among which the random posts are picked.
+
+Posts whose listing entry holds all their content (text posts and images
+hosted by Reddit) are built straight from it, while the others are only
+pre-filtered on their listing entry and retrieved one by one when picked.
+"""
+
+import random
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import requests
+from pyreddit.pyreddit.exceptions import RedditError, SubredditError
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.media import Media
+from pyreddit.pyreddit.models.post import Post
+
+from telereddit.config.config import (
+    HTTP_READ_TIMEOUT,
+    LISTING_LIMIT,
+    LISTING_PERIOD,
+    LISTING_SORT,
+    MAX_MEDIA_SIZE,
+)
+from telereddit.transport import Transport
+
+_REDDIT_URL = "https://www.reddit.com"
+_PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+class Candidate(NamedTuple):
+    """
+    A random post candidate of a listing.
+
+    `post` is set when the listing entry holds all the post, otherwise the
+    post has to be retrieved from its permalink.
+    """
+
+    permalink: str
+    post: Optional[Post]
+
+
+def _estimate_video_size(data: Dict[str, Any]) -> Optional[int]:
+    """Estimate the size in bytes of the Reddit hosted video of a post."""
+    media = data.get("secure_media") or data.get("media") or {}
+    video = media.get("reddit_video") if isinstance(media, dict) else None
+    if not video or not video.get("bitrate_kbps") or not video.get("duration"):
+        return None
+    return int(video["bitrate_kbps"] * 1000 / 8 * video["duration"])
+
+
+def parse_candidate(data: Dict[str, Any]) -> Optional[Candidate]:
+    """
+    Parse the entry of a post in a listing.
+
+    Parameters
+    ----------
+    data : dict
+        The `data` of a listing child.
+
+    Returns
+    -------
+    Candidate or None
+        The candidate, or None if the post is not suitable to be sent.
+
+    """
+    if data.get("stickied") or not data.get("permalink"):
+        return None
+    permalink = _REDDIT_URL + data["permalink"]
+    subreddit = data.get("subreddit_name_prefixed", "")
+    title = data.get("title", "")
+
+    if data.get("is_self"):
+        post = Post(
+            subreddit,
+            permalink,
+            title,
+            data.get("selftext", ""),
+            Media("", ContentType.TEXT),
+        )
+        return Candidate(permalink, post)
+
+    url = data.get("url_overridden_by_dest") or data.get("url") or ""
+    parsed_url = urlparse(url)
+    if parsed_url.netloc == "i.redd.it" and parsed_url.path.lower().endswith(
+        _PHOTO_EXTENSIONS
+    ):
+        post = Post(
+            subreddit, permalink, title, "", Media(url, ContentType.PHOTO)
+        )
+        return Candidate(permalink, post)
+
+    video_size = _estimate_video_size(data)
+    if video_size is not None and video_size > MAX_MEDIA_SIZE:
+        return None
+    return Candidate(permalink, None)
+
+
+class ListingFetcher:
+    """
+    Fetch random post candidates from the subreddit listings.
+
+    Parameters
+    ----------
+    sort : str
+        (Default value = `telereddit.config.config.LISTING_SORT`)
+
+        Listing to fetch: `hot`, `top` or `new`.
+    limit : int
+        (Default value = `telereddit.config.config.LISTING_LIMIT`)
+
+        Number of posts requested for each listing, up to 100.
+    period : str
+        (Default value = `telereddit.config.config.LISTING_PERIOD`)
+
+        Period of the `top` listing: `hour`, `day`, `week`, `month`, `year` or
+        `all`.
+    session : requests.Session
+        (Default value = None)
+
+        Session making the requests, setting their User-Agent. Defaults to
+        the session of a new `telereddit.transport.Transport`.
+
+    """
+
+    def __init__(
+        self,
+        sort: str = LISTING_SORT,
+        limit: int = LISTING_LIMIT,
+        period: str = LISTING_PERIOD,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        if sort not in ("hot", "top", "new"):
+            raise ValueError(f"Invalid listing sort: {sort}")
+        self.sort: str = sort
+        self.limit: int = limit
+        self.period: str = period
+        self.session: requests.Session = session or Transport().session
+
+    def fetch(self, subreddit: str) -> List[Candidate]:
+        """
+        Fetch the suitable posts of the listing of the given subreddit.
+
+        Parameters
+        ----------
+        subreddit : str
+            Valid subreddit name.
+
+            .. note:: This should be a r/ prefixed subreddit name.
+
+        Returns
+        -------
+        List[Candidate]
+            The candidates, in random order.
+
+        Raises
+        ------
+        SubredditError
+            If the subreddit doesn't exist or is not accessible.
+        RedditError
+            If the listing couldn't be retrieved.
+
+        """
+        params: Dict[str, Any] = {"limit": self.limit, "raw_json": 1}
+        if self.sort == "top":
+            params["t"] = self.period
+        try:
+            response = self.session.get(
+                f"{_REDDIT_URL}/{subreddit}/{self.sort}.json",
+                params=params,
+                allow_redirects=False,
+                timeout=HTTP_READ_TIMEOUT,
+            )
+        except requests.RequestException as e:
+            raise RedditError("Error retrieving the subreddit listing.") from e
+        # nonexistent subreddits redirect to the search page
+        if response.status_code in (301, 302, 403, 404):
+            raise SubredditError("The subreddit doesn't exist or is private.")
+        try:
+            response.raise_for_status()
+            children = response.json()["data"]["children"]
+        except (
+            requests.RequestException,
+            ValueError,
+            KeyError,
+            TypeError,
+        ) as e:
+            raise RedditError("Error retrieving the subreddit listing.") from e
+
+        candidates = [
+            candidate
+            for candidate in (
+                parse_candidate(child.get("data", {})) for child in children
+            )
+            if candidate is not None
+        ]
+        random.shuffle(candidates)
+        return candidates
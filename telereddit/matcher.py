@@ -0,0 +1,102 @@
+"""
+Extraction of the Reddit links and subreddit names of the chat messages.
+
+The bot reads every message of the groups it is in, and almost all of them
+are unrelated to Reddit. Every link to a post (`reddit.com/...`, `redd.it/...`,
+`reddit.app.link/...`) and every subreddit name (`r/...`) contains a slash, so
+a single precompiled pattern anchored on the slashes scans each message once,
+skipping straight from a slash to the next, and matches both the links and
+the subreddit names in place, without lowercasing or copying the message.
+"""
+
+import re
+from typing import List, NamedTuple, Set
+
+from telereddit.config.config import REDDIT_DOMAINS
+from telereddit.post_cache import get_post_id
+
+_PATTERN = re.compile(
+    # the pattern starts with a literal, so that the regex engine searches
+    # the slashes instead of trying every position of the message
+    r"/(?:"
+    # path of a link, after a reddit domain, without the punctuation
+    # following it
+    + "(?:"
+    + "|".join(rf"(?<={re.escape(domain)}/)" for domain in REDDIT_DOMAINS)
+    + r""")(?P<path>\S*?)(?=[.,;:!?)\]}>"']*(?:\s|$))"""
+    # subreddit name, not part of a path
+    r"|(?<=r/)(?<!\wr/)(?<![\w/]/r/)(?P<subreddit>\w{2,21})/?(?!\w))",
+    re.IGNORECASE | re.ASCII,
+)
+_URL_START = re.compile(
+    r"""[(\[{<"']*(?P<url>(?:https?://)?(?:[a-z0-9-]+\.)*(?:"""
+    + "|".join(re.escape(domain) for domain in REDDIT_DOMAINS)
+    + "))",
+    re.IGNORECASE,
+)
+
+
+def _get_url_start(text: str, end: int) -> int:
+    """
+    Get the start of the link whose domain ends at the given position.
+
+    The link starts at the start of its word, or is -1 if the word is not a
+    link with the domain as host.
+    """
+    start = end
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    m = _URL_START.fullmatch(text, start, end)
+    return m.start("url") if m else -1
+
+
+class Matches(NamedTuple):
+    """Reddit links and subreddit names of a message, in order of appearance."""
+
+    urls: List[str]
+    subreddits: List[str]
+
+    def __bool__(self) -> bool:
+        """Whether the message has any link or subreddit name."""
+        return bool(self.urls or self.subreddits)
+
+
+def match(text: str) -> Matches:
+    """
+    Extract the Reddit links and subreddit names of the given text.
+
+    Links to the same post and repeated subreddit names are returned once.
+    Subreddit names in Reddit links are not returned.
+
+    Parameters
+    ----------
+    text : str
+        Text of the message.
+
+    Returns
+    -------
+    Matches
+        The links, and the r/ prefixed lowercase subreddit names.
+
+    """
+    if "/" not in text:
+        return Matches([], [])
+
+    urls: List[str] = []
+    subreddits: List[str] = []
+    posts: Set[str] = set()
+    for m in _PATTERN.finditer(text):
+        if m.group("path") is not None:
+            start = _get_url_start(text, m.start())
+            if start < 0:
+                continue
+            url = text[start : m.end()]
+            post = get_post_id(url) or url.lower()
+            if post not in posts:
+                posts.add(post)
+                urls.append(url)
+            continue
+        subreddit = "r/" + m.group("subreddit").lower()
+        if subreddit not in subreddits:
+            subreddits.append(subreddit)
+    return Matches(urls, subreddits)
@@ -0,0 +1,320 @@
+"""
+Albums of the posts shared by the chats, sent with `sendMediaGroup`.
+
+Messages sharing many links make one Telegram request per post. Consecutive
+photo and video posts are instead sent together as albums of up to
+`telereddit.config.config.MEDIA_GROUP_SIZE` items, each captioned with its
+post. Reddit gallery posts are sent as albums of their images.
+
+.. note:: Telegram albums can't have a keyboard: only the posts shared as
+    links, whose keyboard has no edit button, are sent as albums, and their
+    keyboard is sent in a message replying to the album. Its delete button
+    deletes the album too.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+from pyreddit.pyreddit.exceptions import RedditError
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.media import Media
+from pyreddit.pyreddit.models.post import Post
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup  # type: ignore
+from telegram.bot import Message  # type: ignore
+
+from telereddit.config.config import (
+    HTTP_READ_TIMEOUT,
+    MAX_MEDIA_SIZE,
+    MEDIA_GROUP_SIZE,
+    NO_EDIT_KEYBOARD,
+)
+from telereddit.transport import Transport
+
+GROUP_TYPES = (ContentType.PHOTO, ContentType.VIDEO)
+"""Content types which can be sent together in an album."""
+
+_GALLERY_REGEX = re.compile(
+    r"reddit\.com/gallery/([a-z0-9]+)", re.IGNORECASE | re.ASCII
+)
+_GALLERY_ATTR = "_telereddit_gallery"
+_DELETE_ALBUM = "delete:"
+_MAX_CALLBACK_DATA = 64
+
+
+def get_gallery(post: Post) -> Optional[List[Media]]:
+    """
+    Get the media of the given gallery post.
+
+    Parameters
+    ----------
+    post : Post
+        Reddit post.
+
+    Returns
+    -------
+    List[Media] or None
+        The media of the gallery, or None if the post is not a gallery or its
+        media have not been retrieved.
+
+    """
+    return post.__dict__.get(_GALLERY_ATTR)
+
+
+def set_gallery(post: Post, media: List[Media]) -> None:
+    """
+    Store the media of the given gallery post on the post itself.
+
+    Parameters
+    ----------
+    post : Post
+        Reddit gallery post.
+    media : List[Media]
+        Media of the gallery, in order.
+
+    """
+    post.__dict__[_GALLERY_ATTR] = media
+
+
+def get_gallery_id(post: Post) -> Optional[str]:
+    """
+    Get the id of the given post, if it is a gallery.
+
+    Parameters
+    ----------
+    post : Post
+        Reddit post.
+
+    Returns
+    -------
+    str or None
+        The post id, or None if the post doesn't link a gallery.
+
+    """
+    match = _GALLERY_REGEX.search(post.media.url if post.media else "")
+    return match.group(1).lower() if match else None
+
+
+def parse_gallery(data: Dict[str, Any]) -> List[Media]:
+    """
+    Parse the media of a gallery post.
+
+    Images are sent as photos and animated images as videos. Items not yet
+    processed by Reddit, or of other types, are skipped.
+
+    Parameters
+    ----------
+    data : dict
+        The `data` of the post, as returned by Reddit with `raw_json=1`.
+
+    Returns
+    -------
+    List[Media]
+        The media of the gallery, in order.
+
+    """
+    items = (data.get("gallery_data") or {}).get("items") or []
+    metadata = data.get("media_metadata") or {}
+    media = []
+    for item in items:
+        meta = metadata.get(item.get("media_id")) or {}
+        source = meta.get("s") or {}
+        if meta.get("status") != "valid":
+            continue
+        if meta.get("e") == "Image" and source.get("u"):
+            media.append(Media(source["u"], ContentType.PHOTO))
+        elif meta.get("e") == "AnimatedImage" and source.get("mp4"):
+            media.append(Media(source["mp4"], ContentType.VIDEO))
+    return media
+
+
+def is_groupable(post: Optional[Post]) -> bool:
+    """
+    Check whether the given post can be sent in an album with other posts.
+
+    Parameters
+    ----------
+    post : Post
+        Reddit post, or None if it couldn't be retrieved.
+
+    Returns
+    -------
+    bool
+        True if the post is a photo or a video not too big to be sent.
+
+    """
+    return (
+        post is not None
+        and post.media is not None
+        and post.get_type() in GROUP_TYPES
+        and not (post.media.size and post.media.size > MAX_MEDIA_SIZE)
+        and get_gallery(post) is None
+    )
+
+
+def group_posts(
+    posts: Sequence[Optional[Post]], size: int = MEDIA_GROUP_SIZE
+) -> List[List[int]]:
+    """
+    Split the given posts into the albums and single messages sending them.
+
+    Runs of consecutive groupable posts are split into albums of up to `size`
+    posts, so that the posts are still sent in order.
+
+    Parameters
+    ----------
+    posts : Sequence[Post]
+        Posts to send, None for the ones which couldn't be retrieved.
+    size : int
+        (Default value = `telereddit.config.config.MEDIA_GROUP_SIZE`)
+
+        Max number of posts in an album.
+
+    Returns
+    -------
+    List[List[int]]
+        Indexes of the posts of each message, in order. Lists of more than
+        one index are albums.
+
+    """
+    groups: List[List[int]] = []
+    for i, post in enumerate(posts):
+        if (
+            is_groupable(post)
+            and groups
+            and len(groups[-1]) < size
+            and is_groupable(posts[groups[-1][-1]])
+        ):
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+    return groups
+
+
+def get_album_keyboard(messages: Sequence[Message]) -> InlineKeyboardMarkup:
+    """
+    Get the keyboard of the message replying to the given albums.
+
+    The delete button lists the ids of the album messages, as ranges of ids
+    relative to the first one, so that they can be deleted with it.
+
+    Parameters
+    ----------
+    messages : Sequence[Message]
+        The sent album messages, in order.
+
+    Returns
+    -------
+    InlineKeyboardMarkup
+        The keyboard of the posts shared as links, deleting the albums too.
+
+    """
+    first = messages[0].message_id
+    ranges: List[List[int]] = []
+    for message in messages:
+        offset = message.message_id - first
+        if ranges and offset == ranges[-1][1] + 1:
+            ranges[-1][1] = offset
+        else:
+            ranges.append([offset, offset])
+    data = _DELETE_ALBUM + ",".join(f"{start}-{end}" for start, end in ranges)
+    while len(data.encode()) > _MAX_CALLBACK_DATA:
+        # albums left out don't fit in the callback data
+        data = data.rsplit(",", 1)[0]
+    delete_btn, more_btn = NO_EDIT_KEYBOARD.inline_keyboard[0]
+    return InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(text=delete_btn.text, callback_data=data),
+                more_btn,
+            ]
+        ]
+    )
+
+
+def get_album_message_ids(message: Message, data: str) -> List[int]:
+    """
+    Get the ids of the album messages deleted with the given message.
+
+    Parameters
+    ----------
+    message : Message
+        Message whose delete button has been pressed.
+    data : str
+        Callback data of the delete button.
+
+    Returns
+    -------
+    List[int]
+        Ids of the album messages listed by a keyboard of
+        `get_album_keyboard`, empty for the other keyboards.
+
+    """
+    album = message.reply_to_message
+    if album is None or not data.startswith(_DELETE_ALBUM):
+        return []
+    ids: List[int] = []
+    for offsets in data[len(_DELETE_ALBUM) :].split(","):
+        start, _, end = offsets.partition("-")
+        ids.extend(
+            range(
+                album.message_id + int(start), album.message_id + int(end) + 1
+            )
+        )
+    return ids
+
+
+class GalleryFetcher:
+    """
+    Fetch the media of the gallery posts.
+
+    Parameters
+    ----------
+    session : requests.Session
+        (Default value = None)
+
+        Session making the requests, setting their User-Agent. Defaults to
+        the session of a new `telereddit.transport.Transport`.
+
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None) -> None:
+        self.session: requests.Session = session or Transport().session
+
+    def fetch(self, post_id: str) -> List[Media]:
+        """
+        Fetch the media of the gallery post of the given id.
+
+        Parameters
+        ----------
+        post_id : str
+            Id of the gallery post.
+
+        Returns
+        -------
+        List[Media]
+            The media of the gallery, in order.
+
+        Raises
+        ------
+        RedditError
+            If the post couldn't be retrieved.
+
+        """
+        try:
+            response = self.session.get(
+                f"https://www.reddit.com/comments/{post_id}.json",
+                params={"raw_json": 1, "limit": 1},
+                timeout=HTTP_READ_TIMEOUT,
+            )
+            response.raise_for_status()
+            data = response.json()[0]["data"]["children"][0]["data"]
+        except (
+            requests.RequestException,
+            ValueError,
+            KeyError,
+            IndexError,
+            TypeError,
+        ) as e:
+            raise RedditError("Error retrieving the gallery.") from e
+        return parse_gallery(data)
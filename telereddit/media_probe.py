@@ -0,0 +1,151 @@
+"""
+Probe of the size and type of the media, without downloading them.
+
+Telegram downloads the media sent by url by itself, and fails only after
+downloading too big ones. Probing the media first lets the Linker skip them.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from telereddit.cache import TTLCache
+from telereddit.config.config import (
+    ASYNC_WORKERS,
+    MEDIA_PROBE_FAILED_TTL,
+    MEDIA_PROBE_MAX_ENTRIES,
+    MEDIA_PROBE_TIMEOUT,
+    MEDIA_PROBE_TTL,
+)
+
+_CONTENT_RANGE_REGEX = re.compile(r"bytes \d+-\d+/(\d+)")
+
+
+class MediaInfo(NamedTuple):
+    """Size in bytes and content type of a media, if known."""
+
+    size: Optional[int]
+    content_type: Optional[str]
+
+
+class MediaProbe:
+    """
+    Probe media with HEAD requests, caching the results.
+
+    Media servers not answering HEAD requests, or not sending the size in the
+    response, are probed with a GET request of the first byte, whose response
+    reports the full size without sending the body.
+
+    Parameters
+    ----------
+    ttl : int
+        (Default value = `telereddit.config.config.MEDIA_PROBE_TTL`)
+
+        Seconds after which a probe result expires.
+    failed_ttl : int
+        (Default value = `telereddit.config.config.MEDIA_PROBE_FAILED_TTL`)
+
+        Seconds after which a failed probe expires.
+    max_entries : int
+        (Default value = `telereddit.config.config.MEDIA_PROBE_MAX_ENTRIES`)
+
+        Max number of cached probe results.
+    timeout : float
+        (Default value = `telereddit.config.config.MEDIA_PROBE_TIMEOUT`)
+
+        Seconds after which a probe request is abandoned.
+    session : requests.Session
+        (Default value = None)
+
+        Session making the probe requests. Defaults to a new session, keeping
+        alive a connection for each worker.
+
+    Attributes
+    ----------
+    cache : TTLCache
+        Probe results, keyed by media url. Failed probes are cached for
+        `failed_ttl` seconds, so that unreachable media are not probed again
+        for each post linking them.
+
+    """
+
+    def __init__(
+        self,
+        ttl: int = MEDIA_PROBE_TTL,
+        failed_ttl: int = MEDIA_PROBE_FAILED_TTL,
+        max_entries: int = MEDIA_PROBE_MAX_ENTRIES,
+        timeout: float = MEDIA_PROBE_TIMEOUT,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=ASYNC_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session: requests.Session = session
+        self.timeout: float = timeout
+        self.failed_ttl: int = failed_ttl
+        self.cache: TTLCache = TTLCache(max_entries, ttl)
+
+    def probe(self, url: str) -> MediaInfo:
+        """
+        Get the size and content type of the media at the given url.
+
+        Parameters
+        ----------
+        url : str
+            Url of the media.
+
+        Returns
+        -------
+        MediaInfo
+            Size and content type of the media. Both are None if the probe
+            failed.
+
+        """
+        info = self.cache.get(url)
+        if info is not None:
+            return info
+        try:
+            info = self._head(url)
+            if info.size is None:
+                info = self._get_first_byte(url)
+        except requests.RequestException:
+            info = MediaInfo(None, None)
+            self.cache.set(url, info, self.failed_ttl)
+            return info
+        self.cache.set(url, info)
+        return info
+
+    def _head(self, url: str) -> MediaInfo:
+        """Probe the media with a HEAD request."""
+        response = self.session.head(
+            url, allow_redirects=True, timeout=self.timeout
+        )
+        length = response.headers.get("Content-Length")
+        if not response.ok or length is None or not length.isdigit():
+            return MediaInfo(None, response.headers.get("Content-Type"))
+        return MediaInfo(int(length), response.headers.get("Content-Type"))
+
+    def _get_first_byte(self, url: str) -> MediaInfo:
+        """Probe the media with a GET request of the first byte only."""
+        with self.session.get(
+            url,
+            headers={"Range": "bytes=0-0"},
+            stream=True,
+            timeout=self.timeout,
+        ) as response:
+            content_type = response.headers.get("Content-Type")
+            if response.status_code == 206:
+                match = _CONTENT_RANGE_REGEX.match(
+                    response.headers.get("Content-Range", "")
+                )
+                size = int(match.group(1)) if match else None
+            elif response.ok:
+                length = response.headers.get("Content-Length", "")
+                size = int(length) if length.isdigit() else None
+            else:
+                size = None
+            return MediaInfo(size, content_type)
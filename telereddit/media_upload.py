@@ -0,0 +1,173 @@
+"""
+Download of the media to be uploaded to Telegram.
+
+Media are sent to Telegram by url, and Telegram downloads them by itself.
+Some media can't be downloaded by Telegram (e.g. hosts with hotlink
+protection): those are downloaded by telereddit instead, and uploaded.
+
+Media are streamed in chunks into a spooled temporary file, which is kept in
+memory up to a size and rolled over to disk past it, and the download is
+aborted as soon as the media exceeds the max size allowed by Telegram.
+"""
+
+import mimetypes
+import os
+from contextlib import contextmanager
+from tempfile import SpooledTemporaryFile
+from typing import IO, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+from telegram.error import BadRequest  # type: ignore
+
+from telereddit.config.config import (
+    HTTP_READ_TIMEOUT,
+    MAX_MEDIA_SIZE,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_SPOOL_SIZE,
+)
+from telereddit.exceptions import MediaTooBigError
+
+_URL_FETCH_ERRORS = ("http url", "web page content")
+
+
+def is_url_fetch_error(error: Exception) -> bool:
+    """
+    Check whether the given error is Telegram failing to download a media.
+
+    Parameters
+    ----------
+    error : Exception
+        Error raised by a Telegram method sending a media by url.
+
+    Returns
+    -------
+    bool
+        True if uploading the media could succeed where the url failed.
+
+    """
+    return isinstance(error, BadRequest) and any(
+        e in str(error).lower() for e in _URL_FETCH_ERRORS
+    )
+
+
+class MediaFile:
+    """
+    Downloaded media, readable by python-telegram-bot as a file to upload.
+
+    Parameters
+    ----------
+    file : IO
+        Binary file holding the media, positioned at its start.
+    name : str
+        File name of the media, from which Telegram infers its type.
+
+    """
+
+    def __init__(self, file: IO[bytes], name: str) -> None:
+        self.file: IO[bytes] = file
+        self.name: str = name
+
+    def read(self) -> bytes:
+        """Read the content of the media."""
+        return self.file.read()
+
+
+class MediaDownloader:
+    """
+    Download media in chunks, bounding their size and the memory used.
+
+    Parameters
+    ----------
+    max_size : int
+        (Default value = `telereddit.config.config.MAX_MEDIA_SIZE`)
+
+        Max size in bytes of a media.
+    spool_size : int
+        (Default value = `telereddit.config.config.UPLOAD_SPOOL_SIZE`)
+
+        Size in bytes past which a media is written to disk.
+    chunk_size : int
+        (Default value = `telereddit.config.config.UPLOAD_CHUNK_SIZE`)
+
+        Size in bytes of the chunks read from the network.
+    timeout : float
+        (Default value = `telereddit.config.config.HTTP_READ_TIMEOUT`)
+
+        Seconds after which a stalled download is abandoned.
+    session : requests.Session
+        (Default value = None)
+
+        Session making the requests. Defaults to a new session.
+
+    """
+
+    def __init__(
+        self,
+        max_size: int = MAX_MEDIA_SIZE,
+        spool_size: int = UPLOAD_SPOOL_SIZE,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        timeout: float = HTTP_READ_TIMEOUT,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.max_size: int = max_size
+        self.spool_size: int = spool_size
+        self.chunk_size: int = chunk_size
+        self.timeout: float = timeout
+        self.session: requests.Session = session or requests.Session()
+
+    @contextmanager
+    def download(self, url: str) -> Iterator[MediaFile]:
+        """
+        Download the media at the given url.
+
+        The downloaded media is deleted when the context exits.
+
+        Parameters
+        ----------
+        url : str
+            Url of the media.
+
+        Returns
+        -------
+        MediaFile
+            The downloaded media.
+
+        Raises
+        ------
+        MediaTooBigError
+            If the media exceeds the max size.
+        requests.RequestException
+            If the media couldn't be downloaded.
+
+        """
+        with self.session.get(
+            url, stream=True, timeout=self.timeout
+        ) as response, SpooledTemporaryFile(max_size=self.spool_size) as file:
+            response.raise_for_status()
+            length = response.headers.get("Content-Length")
+            if length is not None and length.isdigit():
+                self._check_size(int(length), url)
+
+            size = 0
+            for chunk in response.iter_content(self.chunk_size):
+                size += len(chunk)
+                self._check_size(size, url)
+                file.write(chunk)
+            file.seek(0)
+            yield MediaFile(
+                file, _get_file_name(url, response.headers.get("Content-Type"))
+            )
+
+    def _check_size(self, size: int, url: str) -> None:
+        """Raise if the given size of the media exceeds the max size."""
+        if size > self.max_size:
+            raise MediaTooBigError({"media_url": url, "size": size})
+
+
+def _get_file_name(url: str, content_type: Optional[str]) -> str:
+    """Get the file name of the media at the given url."""
+    name = os.path.basename(urlparse(url).path) or "media"
+    if "." not in name and content_type:
+        name += mimetypes.guess_extension(content_type.split(";")[0]) or ""
+    return name
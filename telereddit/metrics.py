@@ -0,0 +1,373 @@
+"""
+Metrics of the application, in the Prometheus text exposition format.
+
+Metrics are module-level singletons, updated by the modules they measure and
+served on the `/metrics` path of the webhook server by `add_metrics_route()`.
+Worker processes, which have their own metrics and no webhook server, serve
+them with `start_metrics_server()` instead.
+
+.. seealso::
+    Prometheus text exposition format:
+    https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from tornado.web import Application, RequestHandler
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format the given labels as a Prometheus label set."""
+    if not names:
+        return ""
+    labels = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + labels + "}"
+
+
+class _Metric:
+    """
+    Base class for all metrics.
+
+    Parameters
+    ----------
+    name : str
+        Name of the metric.
+    documentation : str
+        Help text of the metric.
+    labelnames : Sequence[str]
+        (Default value = ())
+
+        Names of the labels of the metric.
+
+    """
+
+    type: str = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        """Get the label values of a sample, in the order of `labelnames`."""
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def expose(self) -> str:
+        """
+        Get the metric in the Prometheus text exposition format.
+
+        Returns
+        -------
+        str
+            Help, type and samples of the metric.
+
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines) + "\n"
+
+    def _samples(self) -> Iterator[str]:
+        """Get the samples of the metric. The lock is held by the caller."""
+        for key, value in self._values.items():
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {value}"
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """
+        Increment the counter of the given labels.
+
+        Parameters
+        ----------
+        amount : float
+            (Default value = 1)
+
+            Amount to add to the counter.
+        labels : Any
+            Values of the labels of the sample.
+
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value which can go up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        """
+        Set the gauge of the given labels.
+
+        Parameters
+        ----------
+        value : float
+            Value of the gauge.
+        labels : Any
+            Values of the labels of the sample.
+
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values, counted in cumulative buckets.
+
+    Parameters
+    ----------
+    buckets : Sequence[float]
+        (Default value = `DEFAULT_BUCKETS`)
+
+        Upper bounds of the buckets.
+
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """
+        Observe a value for the given labels.
+
+        Parameters
+        ----------
+        value : float
+            Observed value.
+        labels : Any
+            Values of the labels of the sample.
+
+        """
+        key = self._key(labels)
+        with self._lock:
+            sample = self._values.setdefault(
+                key, [[0] * len(self.buckets), 0.0, 0]
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample[0][i] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """
+        Observe the seconds spent in the context.
+
+        Parameters
+        ----------
+        labels : Any
+            Values of the labels of the sample.
+
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        """Get the bucket, sum and count samples of every label set."""
+        bucket_names = self.labelnames + ("le",)
+        for key, (counts, total, count) in self._values.items():
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(bucket_names, key + (str(bound),))
+                yield f"{self.name}_bucket{labels} {bucket_count}"
+            labels = _format_labels(bucket_names, key + ("+Inf",))
+            yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+HANDLER_LATENCY = Histogram(
+    "telereddit_handler_seconds",
+    "Time spent handling an update.",
+    ["handler"],
+)
+REDDIT_LATENCY = Histogram(
+    "telereddit_reddit_request_seconds",
+    "Time spent waiting for Reddit.",
+    ["operation"],
+)
+TELEGRAM_LATENCY = Histogram(
+    "telereddit_telegram_request_seconds",
+    "Time spent sending or editing a post on Telegram.",
+    ["operation", "content_type"],
+)
+RATE_LIMIT_WAIT = Histogram(
+    "telereddit_rate_limit_wait_seconds",
+    "Time spent waiting for the Telegram rate limiter.",
+)
+DUPLICATE_UPDATES = Counter(
+    "telereddit_duplicate_updates_total",
+    "Updates dropped as already received, or joined to an identical request "
+    "in flight.",
+    ["reason"],
+)
+SEEN_POSTS_SKIPPED = Counter(
+    "telereddit_seen_posts_skipped_total",
+    "Random posts skipped as recently seen by the chat, by source.",
+    ["source"],
+)
+SUBREDDIT_LOOKUPS = Counter(
+    "telereddit_subreddit_lookups_total",
+    "Lookups of the subreddit registry before requesting Reddit, by result.",
+    ["result"],
+)
+MEDIA_UPLOADS = Counter(
+    "telereddit_media_uploads_total",
+    "Media uploaded after Telegram failed to download their url, by result.",
+    ["result"],
+)
+EXCEPTIONS = Counter(
+    "telereddit_exceptions_total",
+    "Telereddit exceptions raised.",
+    ["exception"],
+)
+REPORTS_SKIPPED = Counter(
+    "telereddit_error_reports_skipped_total",
+    "Error reports not sent, by reason.",
+    ["reason"],
+)
+REQUEST_ATTEMPTS = Counter(
+    "telereddit_request_attempts_total",
+    "Retried requests, by number of attempts made.",
+    ["attempts"],
+)
+RETRIES = Counter(
+    "telereddit_retries_total",
+    "Retries of failed attempts, by kind of retry.",
+    ["retry"],
+)
+BREAKER_TRANSITIONS = Counter(
+    "telereddit_reddit_breaker_transitions_total",
+    "State transitions of the Reddit circuit breaker.",
+    ["from_state", "to_state"],
+)
+BREAKER_STATE = Gauge(
+    "telereddit_reddit_breaker_open",
+    "Whether the Reddit circuit breaker is open (1), half open (0.5) or "
+    "closed (0).",
+)
+
+
+def expose() -> str:
+    """
+    Get all the metrics in the Prometheus text exposition format.
+
+    Returns
+    -------
+    str
+        The exposition of all the registered metrics.
+
+    """
+    return "".join(metric.expose() for metric in _REGISTRY)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """HTTP handler serving the metrics on the `/metrics` path."""
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serve the metrics."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = expose().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Don't log every scrape."""
+
+
+class _MetricsRequestHandler(RequestHandler):
+    """Tornado handler serving the metrics on the `/metrics` path."""
+
+    def get(self) -> None:
+        """Serve the metrics."""
+        self.set_header("Content-Type", "text/plain; version=0.0.4")
+        self.write(expose())
+
+
+def add_metrics_route(app: Application) -> None:
+    """
+    Serve the metrics on the `/metrics` path of the given web application.
+
+    Used to serve the metrics from the port of the webhook server, the only
+    one routed to the process by the deployment.
+
+    Parameters
+    ----------
+    app : Application
+        Tornado application of the webhook server.
+
+    """
+    app.add_handlers(r".*", [(r"/metrics", _MetricsRequestHandler)])
+
+
+def start_metrics_server(port: int) -> ThreadingHTTPServer:
+    """
+    Serve the metrics on the `/metrics` path of the given port.
+
+    The server runs in a background thread.
+
+    Parameters
+    ----------
+    port : int
+        Port on which to listen.
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        The started server.
+
+    """
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever, name="metrics", daemon=True
+    ).start()
+    return server
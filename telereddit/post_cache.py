@@ -0,0 +1,149 @@
+"""
+Cache of the retrieved Reddit posts.
+
+Posts are cached by their canonical Reddit id. Share links which don't contain
+the post id (e.g. `reddit.app.link` short links) are mapped to it by an alias
+cache, so that every link of the same post hits the same entry.
+"""
+
+import re
+import sys
+from typing import Dict, Optional
+
+from pyreddit.pyreddit.models.post import Post
+
+from telereddit.cache import TTLCache
+from telereddit.config.config import (
+    POST_CACHE_MAX_BYTES,
+    POST_CACHE_MAX_ENTRIES,
+    POST_CACHE_TTL,
+)
+
+_POST_ID_REGEX = re.compile(
+    r"(?:/comments/|redd\.it/)([a-z0-9]+)(?:[/?#]|$)", re.IGNORECASE
+)
+
+
+def get_post_id(url: str) -> Optional[str]:
+    """
+    Get the canonical Reddit post id contained in the given url.
+
+    Parameters
+    ----------
+    url : str
+        Permalink or share link of a Reddit post.
+
+    Returns
+    -------
+    str or None
+        The lowercase post id, or None if the url doesn't contain it.
+
+    """
+    match = _POST_ID_REGEX.search(url)
+    return match.group(1).lower() if match else None
+
+
+def _sizeof_post(post: Post) -> int:
+    """Estimate the size in bytes of the given post."""
+    size = sys.getsizeof(post)
+    for value in list(vars(post).values()) + list(
+        vars(post.media).values() if post.media else []
+    ):
+        size += sys.getsizeof(value)
+    return size
+
+
+class PostCache:
+    """
+    LRU cache with time to live of the retrieved Reddit posts.
+
+    Parameters
+    ----------
+    max_entries : int
+        (Default value = `telereddit.config.config.POST_CACHE_MAX_ENTRIES`)
+
+        Max number of cached posts.
+    max_bytes : int
+        (Default value = `telereddit.config.config.POST_CACHE_MAX_BYTES`)
+
+        Max estimated size in bytes of the cached posts.
+    ttl : int
+        (Default value = `telereddit.config.config.POST_CACHE_TTL`)
+
+        Seconds after which a cached post expires.
+
+    Attributes
+    ----------
+    posts : TTLCache
+        Cached posts, keyed by post id.
+    aliases : TTLCache
+        Post ids, keyed by the share links not containing them.
+
+    """
+
+    def __init__(
+        self,
+        max_entries: int = POST_CACHE_MAX_ENTRIES,
+        max_bytes: int = POST_CACHE_MAX_BYTES,
+        ttl: int = POST_CACHE_TTL,
+    ) -> None:
+        self.posts: TTLCache = TTLCache(
+            max_entries, ttl, max_bytes, _sizeof_post
+        )
+        self.aliases: TTLCache = TTLCache(max_entries, ttl)
+
+    def get(self, url: str, stale: bool = False) -> Optional[Post]:
+        """
+        Get the cached post relative to the given url.
+
+        Parameters
+        ----------
+        url : str
+            Permalink or share link of the post.
+        stale : bool
+            (Default value = False)
+
+            Whether to return the post even if expired, as long as it has not
+            been evicted yet.
+
+        Returns
+        -------
+        `pyreddit.pyreddit.models.post.Post` or None
+            The cached post, or None if not cached.
+
+        """
+        post_id = get_post_id(url) or self.aliases.get(url, stale=stale)
+        if post_id is None:
+            return None
+        return self.posts.get(post_id, stale=stale)
+
+    def set(self, url: str, post: Post) -> None:
+        """
+        Cache the post relative to the given url.
+
+        Parameters
+        ----------
+        url : str
+            The url from which the post has been retrieved.
+        post : Post
+            The retrieved post.
+
+        """
+        post_id = get_post_id(post.permalink)
+        if post_id is None:
+            return
+        self.posts.set(post_id, post)
+        if get_post_id(url) != post_id:
+            self.aliases.set(url, post_id)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the usage counters of the posts and aliases caches.
+
+        Returns
+        -------
+        dict
+            `telereddit.cache.TTLCache.stats` of `posts` and `aliases`.
+
+        """
+        return dict(posts=self.posts.stats(), aliases=self.aliases.stats())
@@ -0,0 +1,317 @@
+"""
+Prefetched random posts pool.
+
+Keeps, for every subreddit recently requested, a small amount of already
+retrieved random posts, so that random post requests can be served from memory
+instead of waiting for Reddit.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from queue import Queue
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+from pyreddit.pyreddit import helpers, reddit
+from pyreddit.pyreddit.exceptions import RedditError, SubredditError
+from pyreddit.pyreddit.models.post import Post
+
+from telereddit import rendering
+from telereddit.circuit_breaker import CircuitBreaker
+from telereddit.config.config import (
+    MAX_MEDIA_SIZE,
+    POOL_LOW_WATER_MARK,
+    POOL_MAX_SUBREDDITS,
+    POOL_SIZE,
+    POOL_TTL,
+)
+from telereddit.exceptions import RedditUnavailableError
+from telereddit.listing import Candidate, ListingFetcher
+
+
+class PostPool:
+    """
+    Per-subreddit pool of prefetched random posts.
+
+    Pools are created on demand the first time a subreddit is requested, and
+    refilled by a background thread every time they go below the low water mark.
+
+    Parameters
+    ----------
+    size : int
+        (Default value = `telereddit.config.config.POOL_SIZE`)
+
+        Number of posts to keep for each subreddit.
+    low_water_mark : int
+        (Default value = `telereddit.config.config.POOL_LOW_WATER_MARK`)
+
+        Number of remaining posts under which a refill is scheduled.
+    ttl : int
+        (Default value = `telereddit.config.config.POOL_TTL`)
+
+        Seconds after which a prefetched post is considered stale and discarded.
+    max_subreddits : int
+        (Default value = `telereddit.config.config.POOL_MAX_SUBREDDITS`)
+
+        Max number of subreddits for which a pool is kept. The least recently
+        requested subreddit is dropped when the limit is exceeded.
+    breaker : CircuitBreaker
+        (Default value = None)
+
+        Circuit breaker through which Reddit is requested, if any.
+    listing : ListingFetcher
+        (Default value = None)
+
+        Fetcher of the subreddit listings from which the pools are refilled,
+        if any. When not set, each post is retrieved with two requests.
+
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        low_water_mark: int = POOL_LOW_WATER_MARK,
+        ttl: int = POOL_TTL,
+        max_subreddits: int = POOL_MAX_SUBREDDITS,
+        breaker: Optional[CircuitBreaker] = None,
+        listing: Optional[ListingFetcher] = None,
+    ) -> None:
+        self.size: int = size
+        self.low_water_mark: int = low_water_mark
+        self.ttl: int = ttl
+        self.max_subreddits: int = max_subreddits
+        self.breaker: Optional[CircuitBreaker] = breaker
+        self.listing: Optional[ListingFetcher] = listing
+        self._pools: "OrderedDict[str, Deque[Tuple[float, Post]]]" = (
+            OrderedDict()
+        )
+        self._recent: Dict[str, Deque[Post]] = {}
+        self._candidates: Dict[str, Tuple[float, Deque[Candidate]]] = {}
+        self._scheduled: Set[str] = set()
+        self._lock = threading.Lock()
+        self._queue: Queue = Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background thread refilling the pools."""
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(
+            target=self._run, name="post-pool", daemon=True
+        )
+        self._worker.start()
+
+    def get(
+        self, subreddit: str, skip: Optional[Callable[[Post], bool]] = None
+    ) -> Optional[Post]:
+        """
+        Pop a prefetched post of the given subreddit, if any.
+
+        Requesting a subreddit marks it as hot: its pool gets created and
+        refilled in background if needed.
+
+        Parameters
+        ----------
+        subreddit : str
+            Valid subreddit name.
+
+            .. note:: This should be a r/ prefixed subreddit name.
+        skip : Callable
+            (Default value = None)
+
+            Predicate of the posts not to return. Skipped posts are kept in the
+            pool for the next requests.
+
+        Returns
+        -------
+        `pyreddit.pyreddit.models.post.Post` or None
+            A fresh prefetched post, or None if the pool is empty.
+
+        """
+        key = subreddit.lower()
+        post: Optional[Post] = None
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = deque()
+                self._recent[key] = deque(maxlen=self.size)
+                while len(self._pools) > self.max_subreddits:
+                    evicted, _ = self._pools.popitem(last=False)
+                    self._recent.pop(evicted, None)
+                    self._candidates.pop(evicted, None)
+            else:
+                self._pools.move_to_end(key)
+
+            now = time.monotonic()
+            kept: Deque[Tuple[float, Post]] = deque()
+            while pool and post is None:
+                fetched_at, candidate = pool.popleft()
+                if now - fetched_at >= self.ttl:
+                    continue
+                if skip is not None and skip(candidate):
+                    kept.append((fetched_at, candidate))
+                else:
+                    post = candidate
+            pool.extendleft(reversed(kept))
+
+            if (
+                post is None or len(pool) <= self.low_water_mark
+            ) and key not in self._scheduled:
+                self._scheduled.add(key)
+                self._queue.put(key)
+        return post
+
+    def get_stale(self, subreddit: str) -> Optional[Post]:
+        """
+        Get one of the last posts prefetched for the given subreddit, if any.
+
+        Stale posts may have been already sent: they should be used only when
+        Reddit can't be reached.
+
+        Parameters
+        ----------
+        subreddit : str
+            Valid subreddit name.
+
+        Returns
+        -------
+        `pyreddit.pyreddit.models.post.Post` or None
+            A random post among the last prefetched ones, or None.
+
+        """
+        with self._lock:
+            recent = self._recent.get(subreddit.lower())
+            return random.choice(recent) if recent else None
+
+    def _run(self) -> None:
+        """Refill the scheduled pools, one at a time."""
+        while True:
+            key = self._queue.get()
+            try:
+                self._refill(key)
+            except Exception:
+                logging.exception(f"Error refilling the pool of {key}")
+            finally:
+                with self._lock:
+                    self._scheduled.discard(key)
+
+    def _refill(self, key: str) -> None:
+        """
+        Fetch random posts until the pool of the given subreddit is full.
+
+        The number of requests is bounded to twice the pool size, so that
+        subreddits with few suitable posts don't keep the worker busy. When
+        the listing fetcher is set, the posts are picked among the candidates
+        of the last listing, fetched again at most once per refill when they
+        run out.
+
+        Parameters
+        ----------
+        key : str
+            Lowercase r/ prefixed subreddit name.
+
+        """
+        listing_fetched = False
+        for _ in range(self.size * 2):
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None or len(pool) >= self.size:
+                    return
+            try:
+                if self.listing is not None and not self._has_candidates(key):
+                    if listing_fetched:
+                        return
+                    listing_fetched = True
+                    self._fetch_candidates(key)
+                post = self._fetch_post(key)
+            except SubredditError:
+                with self._lock:
+                    self._pools.pop(key, None)
+                    self._recent.pop(key, None)
+                    self._candidates.pop(key, None)
+                return
+            except RedditUnavailableError:
+                return
+            except RedditError:
+                continue
+
+            if post is not None:
+                self._add_post(key, post)
+
+    def _add_post(self, key: str, post: Post) -> None:
+        """Add the given post to the pool of the subreddit, if not pooled."""
+        rendering.render(post)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None and all(
+                p.permalink != post.permalink for _, p in pool
+            ):
+                pool.append((time.monotonic(), post))
+                self._recent[key].append(post)
+
+    def _fetch_post(self, key: str) -> Optional[Post]:
+        """
+        Fetch a random post of the subreddit, to add to its pool.
+
+        The post is the next listing candidate, when the listing fetcher is
+        set, otherwise a random post requested to Reddit.
+
+        Parameters
+        ----------
+        key : str
+            Lowercase r/ prefixed subreddit name.
+
+        Returns
+        -------
+        Post or None
+            The post, or None if there are no candidates left or its media
+            is too big to be sent.
+
+        """
+        if self.listing is not None:
+            candidate = self._pop_candidate(key)
+            if candidate is None:
+                return None
+            post = candidate.post or self._call_reddit(
+                reddit.get_post, candidate.permalink
+            )
+        else:
+            post = self._call_reddit(
+                reddit.get_post,
+                self._call_reddit(helpers.get_random_post_url, key),
+            )
+        if post is None or (
+            post.media and post.media.size and post.media.size > MAX_MEDIA_SIZE
+        ):
+            return None
+        return post
+
+    def _has_candidates(self, key: str) -> bool:
+        """Whether the subreddit has fresh listing candidates left."""
+        with self._lock:
+            fetched_at, candidates = self._candidates.get(key, (0.0, deque()))
+            return bool(candidates) and time.monotonic() - fetched_at < self.ttl
+
+    def _pop_candidate(self, key: str) -> Optional[Candidate]:
+        """Pop the next fresh listing candidate of the subreddit, if any."""
+        with self._lock:
+            fetched_at, candidates = self._candidates.get(key, (0.0, deque()))
+            if not candidates or time.monotonic() - fetched_at >= self.ttl:
+                return None
+            return candidates.popleft()
+
+    def _fetch_candidates(self, key: str) -> None:
+        """Fetch the listing of the subreddit, replacing its candidates."""
+        assert self.listing is not None
+        candidates = deque(self._call_reddit(self.listing.fetch, key))
+        with self._lock:
+            if key in self._pools:
+                self._candidates[key] = (time.monotonic(), candidates)
+
+    def _call_reddit(self, func: Callable, *args: str) -> Any:
+        """Call the given Reddit function through the circuit breaker, if any."""
+        if self.breaker is None:
+            return func(*args)
+        return self.breaker.call(func, *args)
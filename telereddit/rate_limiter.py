@@ -0,0 +1,353 @@
+"""
+Rate limiter of the requests sent to Telegram.
+
+Telegram limits the messages a bot can send, both globally and per chat.
+Messages exceeding the limits are held by `RateLimiter` instead of failing
+with a RetryAfter error. A message takes the global token only once its chat
+is allowed to send, so that a busy chat only delays its own messages.
+
+Requests handled by `telereddit.async_linker.AsyncLinker` wait for their turn
+on the event loop (`RateLimiter.wait`), before a thread of the executor is
+taken to send them.
+
+.. seealso::
+    Telegram Bot FAQ on broadcasting to users:
+    https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from telegram import Bot  # type: ignore
+from telegram.error import RetryAfter  # type: ignore
+
+from telereddit import metrics
+from telereddit.cache import TTLCache
+from telereddit.config.config import (
+    GLOBAL_BURST,
+    GLOBAL_RATE,
+    GROUP_CHAT_BURST,
+    GROUP_CHAT_RATE,
+    MAX_RATE_LIMITED_CHATS,
+    PRIVATE_CHAT_BURST,
+    PRIVATE_CHAT_RATE,
+    RETRY_AFTER_TRIES,
+)
+
+RATE_LIMITED_METHODS = {
+    "sendMessage",
+    "sendPhoto",
+    "sendVideo",
+    "sendDocument",
+    "sendMediaGroup",
+    "editMessageText",
+    "editMessageMedia",
+    "editMessageReplyMarkup",
+}
+"""Names of the Bot methods counting towards the Telegram limits."""
+
+
+class TokenBucket:
+    """
+    Token bucket, implemented as a generic cell rate algorithm.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens per second.
+    burst : int
+        Max number of tokens which can be consumed at once.
+
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.interval: float = 1 / rate
+        self.tolerance: float = (burst - 1) * self.interval
+        self._tat: float = 0
+
+    def delay(self, now: float) -> float:
+        """
+        Get the time until a token is available, without consuming it.
+
+        Parameters
+        ----------
+        now : float
+            Current monotonic time.
+
+        Returns
+        -------
+        float
+            Seconds until a token can be consumed, 0 if it can be now.
+
+        """
+        return max(self._tat - self.tolerance - now, 0)
+
+    def consume(self, now: float) -> None:
+        """
+        Consume a token, which must be available.
+
+        The bucket is not thread safe: callers must serialize the calls.
+
+        Parameters
+        ----------
+        now : float
+            Current monotonic time.
+
+        """
+        self._tat = max(self._tat, now) + self.interval
+
+
+class RateLimiter:
+    """
+    Global and per chat rate limiter of the messages sent to Telegram.
+
+    Private chats and group chats (negative chat ids) have different limits.
+
+    Parameters
+    ----------
+    global_rate : float
+        (Default value = `telereddit.config.config.GLOBAL_RATE`)
+
+        Messages per second across all chats.
+    private_chat_rate : float
+        (Default value = `telereddit.config.config.PRIVATE_CHAT_RATE`)
+
+        Messages per second in a private chat.
+    group_chat_rate : float
+        (Default value = `telereddit.config.config.GROUP_CHAT_RATE`)
+
+        Messages per second in a group chat.
+
+    """
+
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        private_chat_rate: float = PRIVATE_CHAT_RATE,
+        group_chat_rate: float = GROUP_CHAT_RATE,
+    ) -> None:
+        self.private_chat_rate: float = private_chat_rate
+        self.group_chat_rate: float = group_chat_rate
+        self._global = TokenBucket(global_rate, GLOBAL_BURST)
+        # idle buckets are full again after burst / rate seconds
+        self._chats = TTLCache(
+            MAX_RATE_LIMITED_CHATS,
+            max(GROUP_CHAT_BURST / group_chat_rate, 60),
+        )
+        self._paused_until: float = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def try_acquire(self, chat_id: Optional[int]) -> float:
+        """
+        Take the tokens to send a message to the given chat, if available.
+
+        The global token is taken only together with the token of the chat,
+        so that no token is ever booked in advance.
+
+        Parameters
+        ----------
+        chat_id : int
+            Telegram's chat id to which the message is sent. If None, only the
+            global limit is applied.
+
+        Returns
+        -------
+        float
+            0 if the tokens were taken, otherwise the seconds after which to
+            try again.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._get_bucket(chat_id) if chat_id is not None else None
+            delay = max(
+                self._paused_until - now,
+                bucket.delay(now) if bucket else 0,
+                self._global.delay(now),
+            )
+            if delay > 0:
+                return delay
+            if bucket:
+                bucket.consume(now)
+            self._global.consume(now)
+            return 0
+
+    async def wait(self, chat_id: int) -> float:
+        """
+        Wait on the running event loop until a message can be sent.
+
+        The tokens taken are handed to the next rate limited request of the
+        same chat made by the thread running `admitted`.
+
+        Parameters
+        ----------
+        chat_id : int
+            Telegram's chat id to which the message is sent.
+
+        Returns
+        -------
+        float
+            Seconds waited.
+
+        """
+        start = time.monotonic()
+        delay = self.try_acquire(chat_id)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.try_acquire(chat_id)
+        wait = time.monotonic() - start
+        metrics.RATE_LIMIT_WAIT.observe(wait)
+        return wait
+
+    def admitted(self, chat_id: int, func: Callable, *args: Any) -> Any:
+        """
+        Call the given function, after `wait` took the tokens for the chat.
+
+        The first request the function sends to the chat doesn't wait for the
+        rate limiter again.
+
+        Parameters
+        ----------
+        chat_id : int
+            Telegram's chat id for which `wait` took the tokens.
+        func : Callable
+            Blocking function sending the message.
+        args : Any
+            Positional arguments of `func`.
+
+        Returns
+        -------
+        The return value of `func`.
+
+        """
+        self._local.admitted = chat_id
+        try:
+            return func(*args)
+        finally:
+            self._local.admitted = None
+
+    def acquire(self, chat_id: Optional[int]) -> float:
+        """
+        Wait until a message can be sent to the given chat.
+
+        Blocks the calling thread: used by the requests which were not
+        admitted by `wait`, like the follow-ups of an already sent message.
+
+        Parameters
+        ----------
+        chat_id : int
+            Telegram's chat id to which the message is sent. If None, only the
+            global limit is applied.
+
+        Returns
+        -------
+        float
+            Seconds waited.
+
+        """
+        admitted = getattr(self._local, "admitted", None)
+        if admitted is not None and admitted == chat_id:
+            self._local.admitted = None
+            return 0
+        start = time.monotonic()
+        delay = self.try_acquire(chat_id)
+        while delay > 0:
+            time.sleep(delay)
+            delay = self.try_acquire(chat_id)
+        wait = time.monotonic() - start
+        metrics.RATE_LIMIT_WAIT.observe(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold all the messages for the given amount of time.
+
+        Parameters
+        ----------
+        seconds : float
+            Seconds for which no message is sent.
+
+        """
+        with self._lock:
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + seconds
+            )
+
+    def _get_bucket(self, chat_id: int) -> TokenBucket:
+        """Get the bucket of the chat. The lock must be held by the caller."""
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if chat_id < 0:
+                bucket = TokenBucket(self.group_chat_rate, GROUP_CHAT_BURST)
+            else:
+                bucket = TokenBucket(self.private_chat_rate, PRIVATE_CHAT_BURST)
+        # refresh the bucket expiration
+        self._chats.set(chat_id, bucket)
+        return bucket
+
+
+class RateLimitedBot:
+    """
+    Proxy of a python-telegram-bot's Bot, rate limiting its requests.
+
+    The methods in `RATE_LIMITED_METHODS` wait for the rate limiter before
+    sending the request. If Telegram still replies with a RetryAfter error, all
+    the requests are held for the time requested by Telegram, and the request
+    is sent again.
+
+    Parameters
+    ----------
+    bot : Bot
+        The bot instance provided by python-telegram-bot
+    rate_limiter : RateLimiter
+        The rate limiter of the requests.
+
+    """
+
+    def __init__(self, bot: Bot, rate_limiter: RateLimiter) -> None:
+        self.bot: Bot = bot
+        self.rate_limiter: RateLimiter = rate_limiter
+
+    def __getattr__(self, name: str) -> Any:
+        """Get the Bot attribute, rate limiting the methods sending messages."""
+        attr = getattr(self.bot, name)
+        if name in RATE_LIMITED_METHODS:
+            return functools.partial(self._call, attr)
+        return attr
+
+    def _call(self, method: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call the given Bot method, respecting the rate limits.
+
+        Parameters
+        ----------
+        method : Callable
+            Bot method to call.
+        args : Any
+            Positional arguments of the method. The first one, if any, is the
+            chat id.
+        kwargs : Any
+            Keyword arguments of the method.
+
+        Returns
+        -------
+        The return value of the method.
+
+        """
+        chat_id = kwargs.get("chat_id", args[0] if args else None)
+        for tries in range(1, RETRY_AFTER_TRIES + 1):
+            self.rate_limiter.acquire(chat_id)
+            try:
+                return method(*args, **kwargs)
+            except RetryAfter as e:
+                if tries == RETRY_AFTER_TRIES:
+                    raise
+                logging.warning(
+                    f"Flood limit hit, retrying in {e.retry_after}s"
+                )
+                self.rate_limiter.pause(e.retry_after)
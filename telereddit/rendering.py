@@ -0,0 +1,60 @@
+"""
+Memoized rendering of the Telegram messages of the posts.
+
+Rendering a post escapes its text to MarkdownV2 and truncates it, which is
+repeated for every send, edit and comparison of the same post. The rendered
+message is instead computed once per post and stored on the post itself, so
+that it lives and expires together with the cached post.
+
+The same message is used as the text of a Telegram message and as the caption
+of a Telegram media: pyreddit truncates the posts within the Telegram caption
+limit already.
+"""
+
+from typing import Optional
+
+from pyreddit.pyreddit.models.post import Post
+
+_RENDERED_ATTR = "_telereddit_rendered"
+
+
+def render(post: Post) -> str:
+    """
+    Get the rendered message of the given post, rendering it if needed.
+
+    Parameters
+    ----------
+    post : Post
+        Post to render.
+
+    Returns
+    -------
+    str
+        The message of the post.
+
+    """
+    msg: Optional[str] = post.__dict__.get(_RENDERED_ATTR)
+    if msg is None:
+        msg = post.get_msg()
+        post.__dict__[_RENDERED_ATTR] = msg
+    return msg
+
+
+def is_rendered(msg: Optional[str], post: Post) -> bool:
+    """
+    Check whether the given message is the rendered message of the post.
+
+    Parameters
+    ----------
+    msg : str or None
+        Markdown of a Telegram message.
+    post : Post
+        Post to compare.
+
+    Returns
+    -------
+    bool
+        True if the message shows the post.
+
+    """
+    return msg == render(post)
@@ -0,0 +1,166 @@
+"""
+Asynchronous error reporting.
+
+Telereddit errors are logged and sent to Sentry by a background worker, so
+that raising an error never waits for traceback formatting or Sentry requests.
+Repeated errors are reported once per deduplication window, and errors of
+noisy classes can be sampled.
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+from queue import Full, Queue
+from typing import Any, Dict, Optional
+
+from telereddit import metrics
+from telereddit.cache import TTLCache
+from telereddit.config.config import (
+    REPORT_DEDUP_MAX_ENTRIES,
+    REPORT_DEDUP_WINDOW,
+    REPORT_QUEUE_SIZE,
+    REPORT_SAMPLE_RATES,
+)
+
+sentry: Any = None
+"""The sentry_sdk module, imported on the first capture."""
+
+
+def _get_sentry() -> Any:
+    """Get the sentry_sdk module, importing it if needed."""
+    global sentry
+    if sentry is None:
+        import sentry_sdk
+
+        sentry = sentry_sdk
+    return sentry
+
+
+class ErrorReporter:
+    """
+    Report errors from a background worker.
+
+    The worker is started on the first report.
+
+    Parameters
+    ----------
+    max_queued : int
+        (Default value = `telereddit.config.config.REPORT_QUEUE_SIZE`)
+
+        Max number of reports waiting for the worker. Further reports are
+        dropped until the worker catches up.
+    dedup_window : float
+        (Default value = `telereddit.config.config.REPORT_DEDUP_WINDOW`)
+
+        Seconds during which the same error, with the same data, is reported
+        only once.
+    sample_rates : dict
+        (Default value = `telereddit.config.config.REPORT_SAMPLE_RATES`)
+
+        Fraction of the errors reported, by exception class name. Classes not
+        present are always reported.
+
+    """
+
+    def __init__(
+        self,
+        max_queued: int = REPORT_QUEUE_SIZE,
+        dedup_window: float = REPORT_DEDUP_WINDOW,
+        sample_rates: Dict[str, float] = REPORT_SAMPLE_RATES,
+    ) -> None:
+        self.sample_rates: Dict[str, float] = sample_rates
+        self._recent: TTLCache = TTLCache(
+            REPORT_DEDUP_MAX_ENTRIES, dedup_window
+        )
+        self._queue: Queue = Queue(max_queued)
+        self._sentry: Optional[bool] = None
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def sentry_enabled(self) -> bool:
+        """Whether Sentry is configured. Read from the environment only once."""
+        if self._sentry is None:
+            self._sentry = bool(os.getenv("SENTRY_TOKEN"))
+        return self._sentry
+
+    def report(
+        self, error: Exception, data: Any = None, capture: bool = False
+    ) -> None:
+        """
+        Schedule the report of the given error.
+
+        The exception being handled, if any, is reported as the cause of the
+        error.
+
+        Parameters
+        ----------
+        error : Exception
+            Error to report.
+        data : dict
+            (Default value = None)
+
+            Extra data to be sent to Sentry.
+        capture : Boolean
+            (Default value = False)
+
+            Whether to send the error to Sentry, if Sentry is configured.
+
+        """
+        name = error.__class__.__name__
+        if random.random() >= self.sample_rates.get(name, 1):
+            metrics.REPORTS_SKIPPED.inc(reason="sampled")
+            return
+        key = (name, str(error), repr(data))
+        with self._lock:
+            if self._recent.get(key) is not None:
+                metrics.REPORTS_SKIPPED.inc(reason="duplicate")
+                return
+            self._recent.set(key, True)
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="error-reporter", daemon=True
+                )
+                self._worker.start()
+        try:
+            self._queue.put_nowait((error, data, capture, sys.exc_info()))
+        except Full:
+            metrics.REPORTS_SKIPPED.inc(reason="queue_full")
+
+    def flush(self) -> None:
+        """Wait until all the scheduled reports have been sent."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        """Send the scheduled reports, one at a time."""
+        while True:
+            report = self._queue.get()
+            try:
+                self._send(*report)
+            except Exception:
+                logging.exception("Error reporting an error")
+            finally:
+                self._queue.task_done()
+
+    def _send(
+        self, error: Exception, data: Any, capture: bool, exc_info: Any
+    ) -> None:
+        """Log the given error and send it to Sentry if needed."""
+        logging.error(
+            f"{error.__class__.__name__}, {('data: '+ str(data)) if data else ''}",
+            exc_info=exc_info if exc_info[0] is not None else None,
+        )
+        if capture and self.sentry_enabled:
+            sentry = _get_sentry()
+            with sentry.push_scope() as scope:
+                for key, value in (data or {}).items():
+                    scope.set_extra(key, value)
+                sentry.capture_exception(
+                    exc_info if exc_info[0] is not None else error
+                )
+
+
+reporter = ErrorReporter()
+"""Error reporter shared by all the telereddit errors."""
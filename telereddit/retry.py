@@ -0,0 +1,197 @@
+"""
+Retry policy of the telereddit requests.
+
+Requests which can be satisfied by a different random post (e.g. the post
+couldn't be sent, or is equal to the message being edited) are retried
+immediately, while requests failing because of an upstream error are retried
+with exponential backoff. All the retries of a request are bounded by a
+wall-clock budget.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from enum import Enum
+from typing import Callable, Dict, TypeVar
+
+from pyreddit.pyreddit.exceptions import RedditError, SubredditError
+from telegram.error import NetworkError  # type: ignore
+
+from telereddit import metrics
+from telereddit.config.config import (
+    MAX_TRIES,
+    RETRY_BASE_DELAY,
+    RETRY_BUDGET,
+    RETRY_MAX_DELAY,
+)
+from telereddit.exceptions import (
+    PostSendError,
+    RedditUnavailableError,
+    TeleredditError,
+)
+
+T = TypeVar("T")
+
+
+class Retry(Enum):
+    """How a failed attempt should be retried."""
+
+    FATAL = "fatal"
+    """The request can't succeed: don't retry."""
+    NOW = "now"
+    """The attempt failed because of the post: retry immediately."""
+    BACKOFF = "backoff"
+    """The attempt failed because of an upstream error: retry with backoff."""
+
+
+def classify(error: Exception) -> Retry:
+    """
+    Classify the given error of a failed attempt.
+
+    Parameters
+    ----------
+    error : Exception
+        The `RedditError` or `telereddit.exceptions.TeleredditError` raised by
+        the attempt.
+
+    Returns
+    -------
+    Retry
+        How the attempt should be retried.
+
+    """
+    if isinstance(error, (SubredditError, RedditUnavailableError)):
+        return Retry.FATAL
+    if isinstance(error, RedditError):
+        return Retry.BACKOFF
+    if isinstance(error, PostSendError) and isinstance(
+        error.__cause__, NetworkError
+    ):
+        return Retry.BACKOFF
+    return Retry.NOW
+
+
+class RetryPolicy:
+    """
+    Bounded retries with exponential backoff, jitter and a latency budget.
+
+    Parameters
+    ----------
+    max_tries : int
+        (Default value = `telereddit.config.config.MAX_TRIES`)
+
+        Max number of attempts of a request.
+    base_delay : float
+        (Default value = `telereddit.config.config.RETRY_BASE_DELAY`)
+
+        Seconds of delay before the first retry with backoff. The delay
+        doubles at every retry, and a random jitter of up to half the delay is
+        subtracted from it.
+    max_delay : float
+        (Default value = `telereddit.config.config.RETRY_MAX_DELAY`)
+
+        Max seconds of delay between two attempts.
+    budget : float
+        (Default value = `telereddit.config.config.RETRY_BUDGET`)
+
+        Seconds after the first attempt past which no other attempt is made.
+
+    Attributes
+    ----------
+    attempts : Counter
+        Number of requests, by number of attempts made.
+
+    """
+
+    def __init__(
+        self,
+        max_tries: int = MAX_TRIES,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        budget: float = RETRY_BUDGET,
+    ) -> None:
+        self.max_tries: int = max_tries
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.budget: float = budget
+        self.attempts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def run(self, attempt: Callable[[], T]) -> T:
+        """
+        Run the given attempt, retrying it according to the policy.
+
+        Parameters
+        ----------
+        attempt : Callable
+            Function making an attempt of the request.
+
+        Returns
+        -------
+        The return value of the first successful attempt.
+
+        Raises
+        ------
+        RedditError or TeleredditError
+            The error of the last attempt, if no attempt succeeded.
+
+        """
+        deadline = time.monotonic() + self.budget
+        tries = 0
+        while True:
+            tries += 1
+            try:
+                result = attempt()
+            except (RedditError, TeleredditError) as e:
+                retry = classify(e)
+                delay = self.get_delay(tries) if retry == Retry.BACKOFF else 0
+                if (
+                    retry == Retry.FATAL
+                    or tries >= self.max_tries
+                    or time.monotonic() + delay >= deadline
+                ):
+                    self._record(tries)
+                    raise
+                metrics.RETRIES.inc(retry=retry.value)
+                time.sleep(delay)
+            else:
+                self._record(tries)
+                return result
+
+    def get_delay(self, tries: int) -> float:
+        """
+        Get the delay before retrying with backoff.
+
+        Parameters
+        ----------
+        tries : int
+            Number of attempts already made.
+
+        Returns
+        -------
+        float
+            Seconds to wait before the next attempt.
+
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (tries - 1))
+        return random.uniform(delay / 2, delay)
+
+    def stats(self) -> Dict[int, int]:
+        """
+        Get the number of requests by number of attempts made.
+
+        Returns
+        -------
+        dict
+            Number of requests, keyed by number of attempts.
+
+        """
+        with self._lock:
+            return dict(self.attempts)
+
+    def _record(self, tries: int) -> None:
+        """Record the number of attempts of a finished request."""
+        with self._lock:
+            self.attempts[tries] += 1
+        metrics.REQUEST_ATTEMPTS.inc(attempts=tries)
@@ -0,0 +1,108 @@
+"""
+History of the posts recently seen by each chat.
+
+Random posts requests often return posts the chat saw a few moments earlier.
+Keeping the ids of the last posts sent to each chat lets the Linker skip them
+before spending a Reddit request and a Telegram message on them.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Set, Tuple
+
+from telereddit.config.config import SEEN_POSTS_MAX_CHATS, SEEN_POSTS_PER_CHAT
+from telereddit.post_cache import get_post_id
+
+
+def _get_key(url: str) -> str:
+    """Get the key identifying the post of the given url."""
+    return get_post_id(url) or url.lower()
+
+
+class SeenPosts:
+    """
+    Fixed-size rings of the ids of the last posts seen by each chat.
+
+    Memory is bounded to `max_chats` times `per_chat` post ids: the least
+    recently active chat is dropped when the limit is exceeded.
+
+    Parameters
+    ----------
+    per_chat : int
+        (Default value = `telereddit.config.config.SEEN_POSTS_PER_CHAT`)
+
+        Number of posts remembered for each chat.
+    max_chats : int
+        (Default value = `telereddit.config.config.SEEN_POSTS_MAX_CHATS`)
+
+        Max number of chats whose history is kept.
+
+    """
+
+    def __init__(
+        self,
+        per_chat: int = SEEN_POSTS_PER_CHAT,
+        max_chats: int = SEEN_POSTS_MAX_CHATS,
+    ) -> None:
+        self.per_chat: int = per_chat
+        self.max_chats: int = max_chats
+        self._chats: "OrderedDict[int, Tuple[Deque[str], Set[str]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of chats with a history."""
+        with self._lock:
+            return len(self._chats)
+
+    def add(self, chat_id: int, url: str) -> None:
+        """
+        Remember that the given chat saw the post of the given url.
+
+        Parameters
+        ----------
+        chat_id : int
+            Telegram's chat id.
+        url : str
+            Permalink or share link of the post.
+
+        """
+        key = _get_key(url)
+        with self._lock:
+            history = self._chats.get(chat_id)
+            if history is None:
+                history = self._chats[chat_id] = (deque(), set())
+                while len(self._chats) > self.max_chats:
+                    self._chats.popitem(last=False)
+            else:
+                self._chats.move_to_end(chat_id)
+            ring, keys = history
+            if key in keys:
+                return
+            if len(ring) >= self.per_chat:
+                keys.discard(ring.popleft())
+            ring.append(key)
+            keys.add(key)
+
+    def is_seen(self, chat_id: int, url: str) -> bool:
+        """
+        Check whether the given chat recently saw the post of the given url.
+
+        Parameters
+        ----------
+        chat_id : int
+            Telegram's chat id.
+        url : str
+            Permalink or share link of the post.
+
+        Returns
+        -------
+        bool
+            True if the post is among the last ones seen by the chat.
+
+        """
+        key = _get_key(url)
+        with self._lock:
+            history = self._chats.get(chat_id)
+            return history is not None and key in history[1]
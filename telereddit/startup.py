@@ -0,0 +1,112 @@
+"""
+Startup of the webhook process.
+
+The webhook starts listening before the services are initialized, so that a
+restarted or new process accepts updates right away. The services are then
+initialized in background, and the handlers wait for them to be ready: updates
+received in the meantime are queued, not dropped.
+
+Only the standard library is imported here, so that the startup profile can
+time the imports of all the other modules.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Tuple
+
+ready = threading.Event()
+"""Set once the services are initialized. Cleared while they are starting."""
+ready.set()
+
+
+class StartupProfile:
+    """
+    Durations of the startup phases of the process.
+
+    Phases are timed only when the profile is enabled.
+
+    Attributes
+    ----------
+    phases : List[Tuple[str, float]]
+        Name and seconds taken by each phase, in order.
+
+    """
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.phases: List[Tuple[str, float]] = []
+        self._start: float = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start timing the startup phases."""
+        self.enabled = True
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time the startup phase run inside the context.
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase.
+
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.perf_counter() - start))
+
+    def import_modules(self, names: Iterable[str]) -> None:
+        """
+        Import the given modules, timing each import as a phase.
+
+        Modules already imported by a previous one are not timed again, so
+        the time of each phase only counts the modules it imports first.
+
+        Parameters
+        ----------
+        names : Iterable[str]
+            Names of the modules to import.
+
+        """
+        for name in names:
+            with self.phase(f"import {name}"):
+                importlib.import_module(name)
+
+    def report(self) -> str:
+        """
+        Get the durations of the startup phases.
+
+        Returns
+        -------
+        str
+            One line per phase, and the total time since the profile started.
+
+        """
+        with self._lock:
+            phases = list(self.phases)
+        width = max([len(name) for name, _ in phases] + [5])
+        lines = [f"{name:<{width}} {d * 1000:8.1f} ms" for name, d in phases]
+        total = time.perf_counter() - self._start
+        lines.append(f"{'total':<{width}} {total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def log_report(self) -> None:
+        """Log the durations of the startup phases, if enabled."""
+        if self.enabled:
+            logging.info("Startup profile:\n" + self.report())
+
+
+profile = StartupProfile()
+"""Startup profile of the process."""
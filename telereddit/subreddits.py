@@ -0,0 +1,142 @@
+"""
+Registry of the subreddits known to be valid or invalid.
+
+Subreddit names are often mistyped, and every mention of a subreddit which
+doesn't exist, is private or is banned costs the same failing Reddit requests
+to end up in the same error message. The registry remembers the outcome of
+the last requests for each subreddit, so that known invalid subreddits are
+answered without requesting Reddit.
+"""
+
+from typing import Dict
+
+from pyreddit.pyreddit.exceptions import SubredditError
+
+from telereddit import metrics
+from telereddit.cache import TTLCache
+from telereddit.config.config import (
+    SUBREDDIT_INVALID_TTL,
+    SUBREDDIT_MAX_ENTRIES,
+    SUBREDDIT_VALID_TTL,
+)
+
+
+def _get_key(subreddit: str) -> str:
+    """Get the key identifying the given subreddit."""
+    return subreddit.lower().lstrip("/")
+
+
+class SubredditRegistry:
+    """
+    Positive and negative caches with time to live of the subreddits.
+
+    Invalid subreddits are cached with the error message Reddit answered,
+    for a shorter time than the valid ones, since a subreddit can be created
+    or become public at any time.
+
+    Parameters
+    ----------
+    max_entries : int
+        (Default value = `telereddit.config.config.SUBREDDIT_MAX_ENTRIES`)
+
+        Max number of valid, and of invalid, subreddits cached.
+    valid_ttl : int
+        (Default value = `telereddit.config.config.SUBREDDIT_VALID_TTL`)
+
+        Seconds after which a valid subreddit expires.
+    invalid_ttl : int
+        (Default value = `telereddit.config.config.SUBREDDIT_INVALID_TTL`)
+
+        Seconds after which an invalid subreddit expires.
+
+    Attributes
+    ----------
+    valid : TTLCache
+        Valid subreddits, keyed by lowercase name.
+    invalid : TTLCache
+        Error messages of the invalid subreddits, keyed by lowercase name.
+
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SUBREDDIT_MAX_ENTRIES,
+        valid_ttl: int = SUBREDDIT_VALID_TTL,
+        invalid_ttl: int = SUBREDDIT_INVALID_TTL,
+    ) -> None:
+        self.valid: TTLCache = TTLCache(max_entries, valid_ttl)
+        self.invalid: TTLCache = TTLCache(max_entries, invalid_ttl)
+
+    def check(self, subreddit: str) -> None:
+        """
+        Check that the given subreddit is not known to be invalid.
+
+        Parameters
+        ----------
+        subreddit : str
+            Subreddit name.
+
+            .. note:: This should be a r/ prefixed subreddit name.
+
+        Raises
+        ------
+        SubredditError
+            If the subreddit is known to be invalid.
+
+        """
+        key = _get_key(subreddit)
+        if self.valid.get(key) is not None:
+            metrics.SUBREDDIT_LOOKUPS.inc(result="valid")
+            return
+        error = self.invalid.get(key)
+        if error is None:
+            metrics.SUBREDDIT_LOOKUPS.inc(result="unknown")
+            return
+        metrics.SUBREDDIT_LOOKUPS.inc(result="invalid")
+        raise SubredditError(error)
+
+    def set_valid(self, subreddit: str) -> None:
+        """
+        Remember that the given subreddit is valid.
+
+        Parameters
+        ----------
+        subreddit : str
+            Subreddit name.
+
+            .. note:: This should be a r/ prefixed subreddit name.
+
+        """
+        key = _get_key(subreddit)
+        self.invalid.pop(key)
+        self.valid.set(key, True)
+
+    def set_invalid(self, subreddit: str, error: SubredditError) -> None:
+        """
+        Remember that the given subreddit is invalid.
+
+        Parameters
+        ----------
+        subreddit : str
+            Subreddit name.
+
+            .. note:: This should be a r/ prefixed subreddit name.
+        error : SubredditError
+            Error raised by Reddit for the subreddit.
+
+        """
+        key = _get_key(subreddit)
+        self.valid.pop(key)
+        self.invalid.set(key, str(error))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the usage counters of the valid and invalid caches.
+
+        Returns
+        -------
+        dict
+            `telereddit.cache.TTLCache.stats` of `valid` and `invalid`.
+
+        """
+        return dict(valid=self.valid.stats(), invalid=self.invalid.stats())
@@ -7,26 +7,62 @@ Handles configuration, setup and starting of the bot, as well as receive
 messages and dispatch actions to the other modules.
 """
 
+import asyncio
+import functools
 import logging
 import os
-from typing import List
+import signal
+import threading
+from concurrent.futures import Future
+from typing import List, Optional
 
-import sentry_sdk
 from dotenv import load_dotenv
 from pyreddit.pyreddit import helpers
-from pyreddit.pyreddit.services.services_wrapper import ServicesWrapper
-from telegram import Message, Update  # type: ignore
+from telegram import Bot, InlineQuery, Message, Update  # type: ignore
 from telegram.ext import CallbackContext  # type: ignore
-from telegram.ext import CallbackQueryHandler, Filters, MessageHandler, Updater
+from telegram.error import BadRequest, TelegramError  # type: ignore
+from telegram.ext import (
+    CallbackQueryHandler,
+    Filters,
+    InlineQueryHandler,
+    MessageHandler,
+    TypeHandler,
+    Updater,
+)
 
-import telereddit.config.config as config
+from telereddit import matcher, media_group, metrics, startup
+from telereddit.async_linker import AsyncLinker
+from telereddit.circuit_breaker import CircuitBreaker
+from telereddit.dispatcher import AsyncDispatcher
+from telereddit.file_store import MemoryFileIdStore, SQLiteFileIdStore
+from telereddit.inline import InlineIndex
 from telereddit.linker import Linker
+from telereddit.listing import ListingFetcher
+from telereddit.media_group import GalleryFetcher
+from telereddit.media_probe import MediaProbe
+from telereddit.media_upload import MediaDownloader
+from telereddit.post_cache import PostCache
+from telereddit.post_pool import PostPool
+from telereddit.rate_limiter import RateLimitedBot, RateLimiter
+from telereddit.seen_posts import SeenPosts
+from telereddit.subreddits import SubredditRegistry
+from telereddit.transport import Transport
+from telereddit.work_queue import QueueConsumers, WorkQueue
 
+SENT_KEY = "telereddit_sent"
+"""Key of the queued updates listing the links or subreddits already sent."""
 
-def on_chat_message(update: Update, context: CallbackContext) -> None:
+
+def on_chat_message(
+    update: Update, context: CallbackContext
+) -> Optional[Future]:
     """
     Entrypoint of the bot's logic. Handles a single update message.
 
+    Messages without Reddit links or subreddit names are ignored right away.
+    The others are handled by `handle_chat_message`, scheduled on the
+    `telereddit.dispatcher.AsyncDispatcher` event loop.
+
     Parameters
     ----------
     update : Update
@@ -34,29 +70,63 @@ def on_chat_message(update: Update, context: CallbackContext) -> None:
     context : CallbackContext
         The Context object provided by python-telegram-bot
 
+    Returns
+    -------
+    concurrent.futures.Future or None
+        Future of the scheduled handling, if any.
+
     """
     msg: Message = update.message
     if not msg or not msg.text:
-        return
-
-    linker: Linker = Linker(msg.chat_id)
-    text: str = msg.text.lower()
-    if any(r in text for r in config.REDDIT_DOMAINS):
-        posts_url: List[str] = helpers.get_urls_from_text(msg.text)
-        for url in posts_url:
-            linker.send_post_from_url(url)
-    elif "r/" in text:
-        subreddits: List[str] = helpers.get_subreddit_names(text)
-        for subreddit in subreddits:
-            linker.send_random_post(subreddit)
+        return None
+    matches = matcher.match(msg.text)
+    if not matches or AsyncDispatcher.is_duplicate(update.update_id):
+        return None
+    startup.ready.wait()
+    return AsyncDispatcher.submit(handle_chat_message(msg, matches))
 
 
-def on_callback_query(update: Update, context: CallbackContext) -> None:
+def on_callback_query(
+    update: Update, context: CallbackContext
+) -> Optional[Future]:
     """
     Handle all the several types of callback queries.
 
     (actions initiated from a keyboard).
 
+    The query is handled by `handle_callback_query`, scheduled on the
+    `telereddit.dispatcher.AsyncDispatcher` event loop. Updates already
+    received are ignored.
+
+    Parameters
+    ----------
+    update : Update
+        The Update object provided by python-telegram-bot
+    context : CallbackContext
+        The Context object provided by python-telegram-bot
+
+    Returns
+    -------
+    concurrent.futures.Future or None
+        Future of the scheduled handling, if any.
+
+    """
+    if AsyncDispatcher.is_duplicate(update.update_id):
+        return None
+    startup.ready.wait()
+    return AsyncDispatcher.submit(handle_callback_query(update, context.bot))
+
+
+def on_inline_query(
+    update: Update, context: CallbackContext
+) -> Optional[Future]:
+    """
+    Handle an inline query.
+
+    The query is handled by `handle_inline_query`, scheduled on the
+    `telereddit.dispatcher.AsyncDispatcher` event loop. Inline queries are
+    never queued, as they expire within seconds.
+
     Parameters
     ----------
     update : Update
@@ -64,26 +134,304 @@ def on_callback_query(update: Update, context: CallbackContext) -> None:
     context : CallbackContext
         The Context object provided by python-telegram-bot
 
+    Returns
+    -------
+    concurrent.futures.Future or None
+        Future of the scheduled handling, if any.
+
+    """
+    if AsyncDispatcher.is_duplicate(update.update_id):
+        return None
+    startup.ready.wait()
+    return AsyncDispatcher.submit(handle_inline_query(update.inline_query))
+
+
+def enqueue_update(
+    work_queue: WorkQueue, update: Update, context: CallbackContext
+) -> None:
+    """
+    Persist a single update to the work queue.
+
+    Used in place of `on_chat_message` and `on_callback_query` when the work
+    queue is enabled: the update is handled later by `handle_queued_update`.
+
+    Parameters
+    ----------
+    work_queue : WorkQueue
+        Queue of the updates to handle.
+    update : Update
+        The Update object provided by python-telegram-bot
+    context : CallbackContext
+        The Context object provided by python-telegram-bot
+
+    """
+    if is_handled(update):
+        work_queue.put(update.to_dict())
+
+
+def is_handled(update: Update) -> bool:
+    """
+    Check whether the update has to be handled by telereddit.
+
+    Parameters
+    ----------
+    update : Update
+        The Update object provided by python-telegram-bot
+
+    Returns
+    -------
+    bool
+        True if the update is a text message with Reddit links or subreddit
+        names, a callback query or an inline query, not already received.
+
+    """
+    if (
+        update.callback_query is None
+        and update.inline_query is None
+        and not (update.message and matcher.match(update.message.text or ""))
+    ):
+        return False
+    return not AsyncDispatcher.is_duplicate(update.update_id)
+
+
+def handle_queued_update(
+    bot: Bot, payload: dict, last_attempt: bool = True
+) -> None:
+    """
+    Handle a single update taken from the work queue.
+
+    Waits for the end of the handling, so that the update is acknowledged
+    only once handled, and released if some posts couldn't be sent. The
+    posts already sent are recorded in the payload, so that they are not
+    sent again when the update is handled again. The user is notified of the
+    posts which couldn't be sent only at the last attempt.
+
+    Parameters
+    ----------
+    bot : Bot
+        The bot instance provided by python-telegram-bot
+    payload : dict
+        The update, as queued by `enqueue_update`.
+    last_attempt : bool
+        (Default value = True)
+
+        Whether the update is not going to be handled again if this fails.
+
+    """
+    sent = payload.setdefault(SENT_KEY, [])
+    update = Update.de_json(
+        {key: value for key, value in payload.items() if key != SENT_KEY}, bot
+    )
+    future = dispatch_update(update, bot, sent, notify_send_errors=last_attempt)
+    if future is not None:
+        future.result()
+
+
+def dispatch_update(
+    update: Update,
+    bot: Bot,
+    sent: Optional[List[str]] = None,
+    notify_send_errors: bool = True,
+) -> Optional[Future]:
+    """
+    Schedule the handling of an update received from a queue.
+
+    Parameters
+    ----------
+    update : Update
+        Chat message or callback query update.
+    bot : Bot
+        The bot instance provided by python-telegram-bot
+    sent : List[str]
+        (Default value = None)
+
+        Links or subreddits of the chat message already sent, see
+        `handle_chat_message`.
+    notify_send_errors : bool
+        (Default value = True)
+
+        Whether to notify the user of the posts of the chat message which
+        couldn't be sent, see `handle_chat_message`.
+
+    Returns
+    -------
+    concurrent.futures.Future or None
+        Future of the scheduled handling, if any.
+
+    """
+    if update.callback_query is not None:
+        return AsyncDispatcher.submit(handle_callback_query(update, bot))
+    if update.inline_query is not None:
+        return AsyncDispatcher.submit(handle_inline_query(update.inline_query))
+    if update.message is not None and update.message.text:
+        return AsyncDispatcher.submit(
+            handle_chat_message(
+                update.message,
+                sent=sent,
+                notify_send_errors=notify_send_errors,
+            )
+        )
+    return None
+
+
+async def handle_chat_message(
+    msg: Message,
+    matches: Optional[matcher.Matches] = None,
+    sent: Optional[List[str]] = None,
+    notify_send_errors: bool = True,
+) -> None:
+    """
+    Handle a single chat message.
+
+    All the posts or subreddits in the message are retrieved concurrently,
+    and sent in the order in which they appear in the message. Subreddits
+    are ignored in messages with links to posts.
+
+    Parameters
+    ----------
+    msg : Message
+        The message to handle, containing text.
+    matches : matcher.Matches
+        (Default value = None)
+
+        Links and subreddit names of the message, if already extracted.
+    sent : List[str]
+        (Default value = None)
+
+        Links or subreddits of the message already sent, which are skipped.
+        The ones sent are appended to it.
+    notify_send_errors : bool
+        (Default value = True)
+
+        Whether to notify the user of the posts which couldn't be sent, e.g.
+        disabled when the message is going to be handled again.
+
+    Raises
+    ------
+    PostSendError
+        If some of the posts couldn't be sent.
+
+    """
+    with metrics.HANDLER_LATENCY.time(handler="on_chat_message"):
+        linker: AsyncLinker = AsyncLinker(msg.chat_id, notify_send_errors)
+        if matches is None:
+            matches = matcher.match(msg.text)
+        if matches.urls:
+            await linker.send_posts_from_urls(matches.urls, sent)
+        elif matches.subreddits:
+            await linker.send_random_posts(matches.subreddits, sent)
+
+
+async def handle_callback_query(update: Update, bot: Bot) -> None:
+    """
+    Handle a single callback query.
+
+    Repeated taps of the same button of the same message, while the first one
+    is still being handled, join the first one instead of repeating the action.
+    Every query is answered anyway.
+
+    The query is done once its action has run: errors of the action and of
+    the answer are logged, not raised, so that a queued query is not handled
+    again, repeating the action.
+
+    Parameters
+    ----------
+    update : Update
+        The Update object containing the callback query.
+    bot : Bot
+        The bot instance provided by python-telegram-bot
+
     """
-    query_data = update.callback_query.data
-    message = update.effective_message
-    text = (message.caption or message.text) + "\n"
+    with metrics.HANDLER_LATENCY.time(handler="on_callback_query"):
+        query_data = update.callback_query.data
+        message = update.effective_message
+        text = (message.caption or message.text) + "\n"
 
-    linker = Linker(message.chat_id)
-    if query_data == "more":
-        subreddit = helpers.get_subreddit_name(text, reverse=True)
-        if subreddit:
-            linker.send_random_post(subreddit)
-    elif query_data == "edit":
-        linker.edit_result(message)
-    elif query_data == "delete":
-        linker.delete_message(message)
+        linker = AsyncLinker(message.chat_id)
 
-    context.bot.answerCallbackQuery(update.callback_query.id)
+        async def handle() -> None:
+            action = query_data.partition(":")[0]
+            if action == "more":
+                subreddit = helpers.get_subreddit_name(text, reverse=True)
+                if subreddit:
+                    async with linker.chat_lock():
+                        await linker.send_random_post(subreddit)
+            elif action == "edit":
+                await linker.edit_result(message)
+            elif action == "delete":
+                await linker.delete_message(
+                    message,
+                    media_group.get_album_message_ids(message, query_data),
+                )
+
+        try:
+            await AsyncDispatcher.single_flight(
+                (message.chat_id, message.message_id, query_data), handle
+            )
+        except Exception:
+            logging.exception("Error handling the callback query")
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, bot.answerCallbackQuery, update.callback_query.id
+            )
+        except TelegramError as e:
+            # the query expired, or was already answered
+            logging.warning(f"Callback query not answered: {e}")
+
+
+async def handle_inline_query(inline_query: InlineQuery) -> None:
+    """
+    Answer a single inline query with posts of the queried subreddit.
+
+    Parameters
+    ----------
+    inline_query : InlineQuery
+        The inline query provided by python-telegram-bot
+
+    """
+    with metrics.HANDLER_LATENCY.time(handler="on_inline_query"):
+        linker = AsyncLinker(inline_query.from_user.id)
+        try:
+            await linker.answer_inline_query(
+                inline_query.id, inline_query.query
+            )
+        except BadRequest as e:
+            # the query expired, or the user typed further
+            logging.info(f"Inline query not answered: {e}")
 
 
-def init() -> str:
-    """Init environment variables and services."""
+def init(transport: Optional[Transport] = None) -> str:
+    """
+    Init environment variables and services.
+
+    Parameters
+    ----------
+    transport : Transport
+        (Default value = None)
+
+        HTTP transport through which the services make their requests, if any.
+
+    Returns
+    -------
+    str
+        The name of the environment.
+
+    """
+    env = load_env()
+    init_services(transport)
+    return env
+
+
+def load_env() -> str:
+    """
+    Load the environment variables of the environment.
+
+    Returns
+    -------
+    str
+        The name of the environment.
+
+    """
     env = os.getenv("REDDIT_BOTS_MACHINE")
     if env is None or len(env) == 0:
         raise Exception("No REDDIT_BOTS_MACHINE env variable found.")
@@ -96,34 +444,213 @@ def init() -> str:
         )
     except Exception as e:
         print(e)
+    return env
+
+
+def init_services(transport: Optional[Transport] = None) -> None:
+    """
+    Init the pyreddit services.
+
+    Parameters
+    ----------
+    transport : Transport
+        (Default value = None)
+
+        HTTP transport through which the services make their requests, if any.
 
+    """
+    # imported here, as the services are slow to import and only needed once
+    # the webhook is listening
+    from pyreddit.pyreddit.services.services_wrapper import ServicesWrapper
+
+    if transport is not None:
+        transport.install()
     ServicesWrapper.init_services()
-    return env
+
+
+def init_sentry(env: str) -> None:
+    """
+    Init Sentry, if its token is set.
+
+    Parameters
+    ----------
+    env : str
+        The name of the environment.
+
+    """
+    if os.getenv("SENTRY_TOKEN"):
+        import sentry_sdk
+
+        sentry_sdk.init(os.getenv("SENTRY_TOKEN"), environment=env)
+
+
+def setup_linker(
+    bot: Bot, transport: Transport, rate_limiter: Optional[RateLimiter] = None
+) -> None:
+    """
+    Set up the services of the Linker and start the dispatcher event loop.
+
+    Parameters
+    ----------
+    bot : Bot
+        The bot instance provided by python-telegram-bot
+    transport : Transport
+        HTTP transport of the process.
+    rate_limiter : RateLimiter
+        (Default value = None)
+
+        Rate limiter of the messages sent by the process. Defaults to the
+        Telegram limits.
+
+    """
+    Linker.set_bot(RateLimitedBot(bot, rate_limiter or RateLimiter()))
+
+    reddit_breaker = CircuitBreaker()
+    Linker.set_reddit_breaker(reddit_breaker)
+    post_pool = PostPool(
+        breaker=reddit_breaker,
+        listing=ListingFetcher(session=transport.session),
+    )
+    post_pool.start()
+    Linker.set_post_pool(post_pool)
+    Linker.set_post_cache(PostCache())
+    Linker.set_media_probe(MediaProbe(session=transport.session))
+    Linker.set_seen_posts(SeenPosts())
+    subreddits = SubredditRegistry()
+    Linker.set_subreddits(subreddits)
+    Linker.set_media_downloader(MediaDownloader(session=transport.session))
+    Linker.set_gallery_fetcher(GalleryFetcher(session=transport.session))
+    inline_index = InlineIndex(
+        ListingFetcher(session=transport.session),
+        breaker=reddit_breaker,
+        subreddits=subreddits,
+    )
+    inline_index.start()
+    Linker.set_inline_index(inline_index)
+    file_id_db = os.getenv("FILE_ID_DB")
+    Linker.set_file_id_store(
+        SQLiteFileIdStore(file_id_db) if file_id_db else MemoryFileIdStore()
+    )
+    AsyncDispatcher.start()
 
 
 def main() -> None:
-    """Entrypoint of telereddit. Handles configuration, setup and start of the bot."""
+    """
+    Entrypoint of telereddit. Handles configuration, setup and start of the bot.
+
+    The webhook starts listening first, and the services are initialized in
+    background by `start_services`: updates received in the meantime are
+    handled once the services are ready.
+    """
     logging.basicConfig(
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         level=logging.INFO,
     )
 
-    env = init()
-    if os.getenv("SENTRY_TOKEN"):
-        sentry_sdk.init(os.getenv("SENTRY_TOKEN"), environment=env)
+    with startup.profile.phase("load env"):
+        env = load_env()
+        transport = Transport()
 
-    updater = Updater(token=os.getenv("TELEGRAM_TOKEN"), use_context=True)
-    Linker.set_bot(updater.bot)
+    with startup.profile.phase("start webhook"):
+        startup.ready.clear()
+        updater = Updater(
+            token=os.getenv("TELEGRAM_TOKEN"),
+            use_context=True,
+            request_kwargs=transport.get_telegram_request_kwargs(),
+        )
+        dispatcher = updater.dispatcher
 
+        work_queue_path = os.getenv("WORK_QUEUE_PATH")
+        work_queue = WorkQueue(work_queue_path) if work_queue_path else None
+        dispatcher.add_handler(InlineQueryHandler(on_inline_query))
+        if work_queue is not None:
+            dispatcher.add_handler(
+                TypeHandler(
+                    Update, functools.partial(enqueue_update, work_queue)
+                )
+            )
+        else:
+            dispatcher.add_handler(MessageHandler(Filters.all, on_chat_message))
+            dispatcher.add_handler(CallbackQueryHandler(on_callback_query))
+        start_webhook(updater)
     print("Listening...")
-    dispatcher = updater.dispatcher
 
-    dispatcher.add_handler(MessageHandler(Filters.all, on_chat_message))
-    dispatcher.add_handler(CallbackQueryHandler(on_callback_query))
+    threading.Thread(
+        target=start_services,
+        args=(updater, transport, env, work_queue),
+        name="startup",
+        daemon=True,
+    ).start()
+    updater.idle()
+
+
+def start_services(
+    updater: Updater,
+    transport: Transport,
+    env: str,
+    work_queue: Optional[WorkQueue] = None,
+) -> None:
+    """
+    Initialize the services and mark the process as ready.
+
+    If the initialization fails, the process is stopped, so that it can be
+    restarted.
+
+    Parameters
+    ----------
+    updater : Updater
+        The updater provided by python-telegram-bot
+    transport : Transport
+        HTTP transport of the process.
+    env : str
+        The name of the environment.
+    work_queue : WorkQueue
+        (Default value = None)
+
+        Queue of the updates to consume, if enabled.
+
+    """
+    try:
+        with startup.profile.phase("init services"):
+            init_services(transport)
+        with startup.profile.phase("init sentry"):
+            init_sentry(env)
+        with startup.profile.phase("setup linker"):
+            setup_linker(updater.bot, transport)
+
+        if work_queue is not None:
+            QueueConsumers(
+                work_queue, functools.partial(handle_queued_update, updater.bot)
+            ).start()
+    except Exception:
+        logging.exception("Error starting the services, stopping")
+        os.kill(os.getpid(), signal.SIGTERM)
+        return
+    startup.ready.set()
+    logging.info("Services ready")
+    startup.profile.log_report()
+
+
+def start_webhook(updater: Updater) -> None:
+    """
+    Start receiving the updates from the Telegram webhook.
+
+    The metrics are served on the `/metrics` path of the webhook server, so
+    that they are reachable from the only port routed to the process.
+
+    Parameters
+    ----------
+    updater : Updater
+        The updater provided by python-telegram-bot
+
+    """
     updater.start_webhook(
         listen="0.0.0.0",
         port=int(os.environ.get("PORT", "8443")),
         url_path=os.getenv("TELEGRAM_TOKEN"),
         webhook_url=f"https://telereddit.herokuapp.com/{os.getenv('TELEGRAM_TOKEN')}",
     )
-    updater.idle()
+    httpd = updater.httpd
+    httpd.loop.add_callback(
+        metrics.add_metrics_route, httpd.http_server.request_callback
+    )
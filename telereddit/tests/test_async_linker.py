@@ -0,0 +1,231 @@
+import asyncio
+import unittest
+from unittest.mock import Mock, call, patch
+
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.media import Media
+from pyreddit.pyreddit.models.post import Post
+from telegram.error import BadRequest
+from telereddit import telereddit
+from telereddit.async_linker import AsyncLinker
+from telereddit.config.config import MAX_FANOUT
+from telereddit.dispatcher import AsyncDispatcher
+from telereddit.exceptions import PostSendError, TeleredditError
+from telereddit.linker import Linker
+from telereddit.rate_limiter import RateLimitedBot, RateLimiter
+
+
+class TestAsyncLinker(unittest.TestCase):
+    def setUp(self):
+        Linker.set_bot(Mock())
+        self.linker = AsyncLinker(0)
+
+    @patch("telereddit.linker.Linker.send_random_post")
+    def test_send_random_post(self, mock_send_random_post):
+        asyncio.run(self.linker.send_random_post("r/valid"))
+        mock_send_random_post.assert_called_once_with("r/valid")
+
+    @patch("telereddit.linker.Linker.edit_result")
+    def test_edit_result(self, mock_edit_result):
+        message = Mock()
+        asyncio.run(self.linker.edit_result(message))
+        mock_edit_result.assert_called_once_with(message)
+
+    @patch("telereddit.linker.Linker.send_post_from_url")
+    def test_send_rate_limited(self, mock_send_post_from_url):
+        rate_limiter = RateLimiter()
+        Linker.set_bot(RateLimitedBot(Mock(), rate_limiter))
+        mock_send_post_from_url.side_effect = (
+            lambda url: Linker.bot.sendMessage(chat_id=0, text=url)
+        )
+        with patch.object(
+            rate_limiter, "try_acquire", wraps=rate_limiter.try_acquire
+        ) as mock_try_acquire:
+            asyncio.run(self.linker.send_post_from_url("https://redd.it/a"))
+        # the tokens are taken on the loop, not again by the executor
+        mock_try_acquire.assert_called_once_with(0)
+        Linker.bot.bot.sendMessage.assert_called_once()
+
+    @patch("telereddit.linker.Linker.fetch_post")
+    @patch("telereddit.linker.Linker.send_post_from_url")
+    def test_handle_chat_message_links(
+        self, mock_send_post_from_url, mock_fetch_post
+    ):
+        msg = Mock()
+        msg.chat_id = 0
+        msg.text = "https://redd.it/a https://redd.it/b"
+        asyncio.run(telereddit.handle_chat_message(msg))
+        self.assertEqual(mock_send_post_from_url.call_count, 2)
+
+    @patch("telereddit.linker.Linker.fetch_post")
+    @patch("telereddit.linker.Linker.send_post_from_url")
+    @patch("telereddit.linker.Linker.send_album_from_urls")
+    def test_send_posts_from_urls_album(
+        self, mock_send_album, mock_send_post_from_url, mock_fetch_post
+    ):
+        photo = Post("", "", "", "", Media("https://a.jpg", ContentType.PHOTO))
+        text = Post("", "", "", "", Media("", ContentType.TEXT))
+        mock_fetch_post.side_effect = [photo, photo, text]
+        asyncio.run(self.linker.send_posts_from_urls(["a", "b", "c"]))
+        mock_send_album.assert_called_once_with([photo, photo])
+        mock_send_post_from_url.assert_called_once_with("c", text, None)
+
+        # albums rejected by Telegram are sent one post at a time
+        mock_send_album.return_value = False
+        mock_send_post_from_url.reset_mock()
+        mock_fetch_post.side_effect = [photo, photo]
+        asyncio.run(self.linker.send_posts_from_urls(["a", "b"]))
+        self.assertEqual(
+            mock_send_post_from_url.call_args_list,
+            [call("a", photo, None), call("b", photo, None)],
+        )
+
+    @patch("telereddit.linker.Linker.fetch_post")
+    @patch("telereddit.linker.Linker.send_post")
+    def test_send_posts_from_urls_fetch_error(
+        self, mock_send_post, mock_fetch_post
+    ):
+        mock_fetch_post.side_effect = TeleredditError("Not found.")
+        asyncio.run(self.linker.send_posts_from_urls(["a"]))
+        mock_fetch_post.assert_called_once_with("a")
+        mock_send_post.assert_not_called()
+        Linker.bot.sendMessage.assert_called_once()
+        self.assertEqual(
+            Linker.bot.sendMessage.call_args.kwargs["text"], "Not found."
+        )
+
+    @patch("telereddit.linker.Linker.fetch_post")
+    @patch("telereddit.linker.Linker.send_post_from_url")
+    def test_send_posts_from_urls_sent(
+        self, mock_send_post_from_url, mock_fetch_post
+    ):
+        mock_send_post_from_url.side_effect = [
+            None,
+            PostSendError(capture=False),
+            None,
+        ]
+        sent = ["a"]
+        with self.assertRaises(PostSendError):
+            asyncio.run(
+                self.linker.send_posts_from_urls(["a", "b", "c", "d"], sent)
+            )
+        self.assertEqual(
+            [c.args[0] for c in mock_send_post_from_url.call_args_list],
+            ["b", "c", "d"],
+        )
+        self.assertEqual(sent, ["a", "b", "d"])
+
+    @patch("telereddit.linker.Linker.fetch_random_post")
+    @patch("telereddit.linker.Linker.send_random_post")
+    def test_send_random_posts_order(
+        self, mock_send_random_post, mock_fetch_random_post
+    ):
+        posts = {s: Post("", s, "", "", None) for s in ["r/a", "r/c"]}
+        error = TeleredditError("")
+
+        def fetch_random_post(subreddit):
+            if subreddit not in posts:
+                raise error
+            return posts[subreddit]
+
+        mock_fetch_random_post.side_effect = fetch_random_post
+        asyncio.run(self.linker.send_random_posts(["r/a", "r/b", "r/c"]))
+        # the post failing to be retrieved is not retrieved again
+        mock_send_random_post.assert_has_calls(
+            [
+                call("r/a", posts["r/a"], None),
+                call("r/b", None, error),
+                call("r/c", posts["r/c"], None),
+            ]
+        )
+
+    @patch("telereddit.linker.Linker.fetch_post")
+    @patch("telereddit.linker.Linker.send_post_from_url")
+    def test_send_posts_from_urls_fanout(self, mock_send, mock_fetch_post):
+        urls = [str(i) for i in range(MAX_FANOUT + 1)]
+        asyncio.run(self.linker.send_posts_from_urls(urls))
+        self.assertEqual(mock_send.call_count, MAX_FANOUT)
+
+    @patch("telereddit.linker.Linker.fetch_post")
+    @patch("telereddit.linker.Linker.send_post_from_url")
+    def test_handle_queued_update_sent(
+        self, mock_send_post_from_url, mock_fetch_post
+    ):
+        mock_send_post_from_url.side_effect = [
+            None,
+            PostSendError(capture=False),
+        ]
+        payload = {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 0, "type": "private"},
+                "text": "https://redd.it/a https://redd.it/b",
+            },
+        }
+        with self.assertRaises(PostSendError):
+            telereddit.handle_queued_update(Mock(), payload, False)
+        self.assertEqual(payload[telereddit.SENT_KEY], ["https://redd.it/a"])
+
+        mock_send_post_from_url.side_effect = None
+        telereddit.handle_queued_update(Mock(), payload)
+        self.assertEqual(
+            mock_send_post_from_url.call_args.args[0], "https://redd.it/b"
+        )
+        self.assertEqual(mock_send_post_from_url.call_count, 3)
+
+    @patch("telereddit.linker.Linker.fetch_post")
+    @patch("telereddit.linker.Linker.send_fetched_post")
+    def test_handle_queued_update_notify(
+        self, mock_send_fetched_post, mock_fetch_post
+    ):
+        mock_send_fetched_post.side_effect = PostSendError(capture=False)
+        payload = {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 0, "type": "private"},
+                "text": "https://redd.it/a",
+            },
+        }
+        mock_fetch_post.return_value = Post(
+            "", "", "", "", Media("", ContentType.TEXT)
+        )
+        with self.assertRaises(PostSendError):
+            telereddit.handle_queued_update(Mock(), payload, False)
+        Linker.bot.sendMessage.assert_not_called()
+
+        # the user is notified at the last attempt only
+        with self.assertRaises(PostSendError):
+            telereddit.handle_queued_update(Mock(), payload, True)
+        Linker.bot.sendMessage.assert_called_once()
+
+    @patch("telereddit.linker.Linker.edit_result")
+    def test_callback_query_errors(self, mock_edit_result):
+        mock_edit_result.side_effect = PostSendError(capture=False)
+        update = Mock()
+        update.callback_query.data = "edit"
+        update.effective_message.text = ""
+        update.effective_message.caption = None
+        bot = Mock()
+        bot.answerCallbackQuery.side_effect = BadRequest("Query is too old")
+        AsyncDispatcher.submit(
+            telereddit.handle_callback_query(update, bot)
+        ).result(timeout=5)
+        mock_edit_result.assert_called_once()
+        bot.answerCallbackQuery.assert_called_once()
+
+    @patch("telereddit.linker.Linker.delete_message")
+    def test_dispatcher_submit(self, mock_delete_message):
+        update = Mock()
+        update.callback_query.data = "delete"
+        update.effective_message.text = ""
+        update.effective_message.caption = None
+        bot = Mock()
+        AsyncDispatcher.submit(
+            telereddit.handle_callback_query(update, bot)
+        ).result(timeout=5)
+        mock_delete_message.assert_called_once()
+        bot.answerCallbackQuery.assert_called_once()
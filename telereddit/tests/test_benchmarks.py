@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from parameterized import parameterized
+from telereddit.benchmarks import __main__ as benchmark
+from telereddit.benchmarks import matcher as matcher_benchmark
+from telereddit.benchmarks.workloads import WORKLOADS
+from telereddit.linker import Linker
+
+
+class TestBenchmarks(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ([1, 2, 3, 4], 50, 2),
+            ([1, 2, 3, 4], 99, 4),
+            ([1], 95, 1),
+            ([], 50, 0),
+        ]
+    )
+    def test_percentile(self, values, p, expected):
+        self.assertEqual(benchmark.percentile(values, p), expected)
+
+    @patch.multiple(
+        Linker,
+        bot=None,
+        post_pool=None,
+        post_cache=None,
+        file_id_store=None,
+        reddit_breaker=None,
+    )
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "benchmark.json")
+            report = benchmark.main(
+                [
+                    "--updates=10",
+                    "--reddit-latency=0",
+                    "--telegram-latency=0",
+                    "--telegram-media-latency=0",
+                    f"--output={output}",
+                ]
+            )
+            with open(output) as f:
+                self.assertEqual(json.load(f), report)
+
+        self.assertEqual(len(report["results"]), len(WORKLOADS))
+        for result in report["results"]:
+            self.assertEqual(result["updates"], 10)
+            self.assertGreater(sum(result["telegram"]["calls"].values()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+    def test_matcher(self):
+        results = matcher_benchmark.main(["--messages=100", "--repeat=1"])
+        self.assertEqual(list(results), list(matcher_benchmark.EXTRACTORS))
@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import patch
+
+from telereddit.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = TTLCache(max_entries=2, ttl=60)
+
+    def test_get_set(self):
+        self.cache.set("a", 1)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("b", 2), 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_lru_eviction(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    @patch("telereddit.cache.time.monotonic")
+    def test_expired(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        self.cache.set("a", 1)
+        mock_monotonic.return_value = 60
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_max_bytes(self):
+        cache = TTLCache(max_entries=10, ttl=60, max_bytes=10, sizeof=len)
+        cache.set("a", "12345")
+        cache.set("b", "12345")
+        self.assertEqual(len(cache), 2)
+        cache.set("c", "1")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["bytes"], 6)
+
+    def test_set_existing(self):
+        cache = TTLCache(max_entries=10, ttl=60, max_bytes=10, sizeof=len)
+        cache.set("a", "12345")
+        cache.set("a", "123")
+        self.assertEqual(cache.stats()["bytes"], 3)
+
+    def test_pop(self):
+        self.cache.set("a", 1)
+        self.cache.pop("a")
+        self.cache.pop("b")
+        self.assertEqual(len(self.cache), 0)
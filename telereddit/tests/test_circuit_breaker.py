@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+from pyreddit.pyreddit.exceptions import RedditError, SubredditError
+from telereddit.circuit_breaker import CircuitBreaker, State, is_failure
+from telereddit.exceptions import RedditUnavailableError
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(
+            failure_rate=0.5,
+            window=4,
+            min_calls=4,
+            open_timeout=30,
+            half_open_probes=2,
+        )
+        self.listener = Mock()
+        self.breaker.listeners.append(self.listener)
+
+    def _fail(self, times=1):
+        for _ in range(times):
+            with self.assertRaises(requests.ConnectionError):
+                self.breaker.call(Mock(side_effect=requests.ConnectionError()))
+
+    def test_closed(self):
+        self.assertEqual(self.breaker.call(lambda x: x, 1), 1)
+        self._fail(2)
+        self.assertEqual(self.breaker.state, State.CLOSED)
+
+    def test_subreddit_error_not_failure(self):
+        for _ in range(4):
+            with self.assertRaises(SubredditError):
+                self.breaker.call(Mock(side_effect=SubredditError("")))
+        self.assertEqual(self.breaker.state, State.CLOSED)
+
+    def test_request_errors_not_failures(self):
+        for _ in range(4):
+            with self.assertRaises(RedditError):
+                self.breaker.call(Mock(side_effect=RedditError("")))
+        self.assertEqual(self.breaker.state, State.CLOSED)
+
+    def test_is_failure(self):
+        def http_error(status_code):
+            response = requests.Response()
+            response.status_code = status_code
+            return requests.HTTPError(response=response)
+
+        def reddit_error(cause):
+            try:
+                raise cause
+            except Exception as e:
+                raise RedditError("") from e
+
+        for error, failure in [
+            (requests.Timeout(), True),
+            (http_error(503), True),
+            (http_error(404), False),
+            (RedditError(""), False),
+            (SubredditError(""), False),
+            (ValueError(), False),
+        ]:
+            self.assertEqual(is_failure(error), failure, error)
+            with self.assertRaises(RedditError) as cm:
+                reddit_error(error)
+            self.assertEqual(is_failure(cm.exception), failure, error)
+
+    def test_open(self):
+        self.breaker.call(lambda: None)
+        self.breaker.call(lambda: None)
+        self._fail(2)
+        self.assertEqual(self.breaker.state, State.OPEN)
+        func = Mock()
+        with self.assertRaises(RedditUnavailableError):
+            self.breaker.call(func)
+        func.assert_not_called()
+        self.listener.assert_called_once_with(State.CLOSED, State.OPEN)
+
+    @patch("telereddit.circuit_breaker.time.monotonic")
+    def test_half_open_close(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        self._fail(4)
+        mock_monotonic.return_value = 30
+        self.assertEqual(self.breaker.state, State.HALF_OPEN)
+        self.breaker.call(lambda: None)
+        self.breaker.call(lambda: None)
+        self.assertEqual(self.breaker.state, State.CLOSED)
+        self.assertEqual(self.breaker.stats()["half_open->closed"], 1)
+
+    @patch("telereddit.circuit_breaker.time.monotonic")
+    def test_half_open_reopen(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+        self._fail(4)
+        mock_monotonic.return_value = 30
+        self._fail()
+        self.assertEqual(self.breaker.state, State.OPEN)
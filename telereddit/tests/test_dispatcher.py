@@ -0,0 +1,60 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from telereddit.cache import TTLCache
+from telereddit.dispatcher import AsyncDispatcher
+
+
+class TestAsyncDispatcher(unittest.TestCase):
+    def test_submit(self):
+        async def coro():
+            return 1
+
+        self.assertEqual(AsyncDispatcher.submit(coro()).result(timeout=5), 1)
+
+    @patch.object(AsyncDispatcher, "seen_updates", TTLCache(10, 60))
+    def test_is_duplicate(self):
+        self.assertFalse(AsyncDispatcher.is_duplicate(1))
+        self.assertTrue(AsyncDispatcher.is_duplicate(1))
+        self.assertFalse(AsyncDispatcher.is_duplicate(2))
+
+    def test_single_flight(self):
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def run():
+            return await asyncio.gather(
+                AsyncDispatcher.single_flight("key", func),
+                AsyncDispatcher.single_flight("key", func),
+                AsyncDispatcher.single_flight("other", func),
+            )
+
+        self.assertEqual(sorted(asyncio.run(run())), [2, 2, 2])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(
+            asyncio.run(AsyncDispatcher.single_flight("key", func)), 3
+        )
+
+    def test_single_flight_exception(self):
+        async def func():
+            raise ValueError
+
+        async def run():
+            return await asyncio.gather(
+                AsyncDispatcher.single_flight("key", func),
+                AsyncDispatcher.single_flight("key", func),
+                return_exceptions=True,
+            )
+
+        for result in asyncio.run(run()):
+            self.assertIsInstance(result, ValueError)
+        self.assertNotIn("key", AsyncDispatcher._in_flight)
+
+
+if __name__ == "__main__":
+    unittest.main()
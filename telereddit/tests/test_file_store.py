@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from parameterized import parameterized
+from telereddit.file_store import (
+    FileIdStore,
+    MemoryFileIdStore,
+    SQLiteFileIdStore,
+    get_file_id,
+)
+
+
+class TestFileIdStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "file_ids.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _stores(self):
+        return [MemoryFileIdStore(), SQLiteFileIdStore(self.db_path)]
+
+    def test_get_set_pop(self):
+        for store in self._stores():
+            self.assertIsNone(store.get("url"))
+            store.set("url", "id")
+            self.assertEqual(store.get("url"), "id")
+            store.set("url", "id2")
+            self.assertEqual(store.get("url"), "id2")
+            store.pop("url")
+            self.assertIsNone(store.get("url"))
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            FileIdStore()
+
+    def test_sqlite_persistence(self):
+        SQLiteFileIdStore(self.db_path).set("url", "id")
+        self.assertEqual(SQLiteFileIdStore(self.db_path).get("url"), "id")
+
+    @patch("telereddit.file_store.FILE_ID_DB_TIMEOUT", 0)
+    def test_sqlite_locked(self):
+        store = SQLiteFileIdStore(self.db_path)
+        other = sqlite3.connect(self.db_path, isolation_level=None)
+        self.addCleanup(other.close)
+        other.execute("BEGIN EXCLUSIVE")
+        with self.assertLogs(level="WARNING"):
+            store.set("url", "id")
+        other.execute("ROLLBACK")
+        self.assertIsNone(store.get("url"))
+
+    def test_expired(self):
+        for store in [
+            MemoryFileIdStore(ttl=0),
+            SQLiteFileIdStore(self.db_path, 0),
+        ]:
+            store.set("url", "id")
+            self.assertIsNone(store.get("url"))
+
+    @parameterized.expand(
+        [
+            [[Mock(file_id="a"), Mock(file_id="b")], "b"],
+            [Mock(file_id="a"), "a"],
+            [None, None],
+            [[], None],
+        ]
+    )
+    def test_get_file_id(self, attachment, file_id):
+        message = Mock(effective_attachment=attachment)
+        self.assertEqual(get_file_id(message), file_id)
+
+    def test_get_file_id_no_message(self):
+        self.assertIsNone(get_file_id(True))
@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from pyreddit.pyreddit.exceptions import SubredditError
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.media import Media
+from pyreddit.pyreddit.models.post import Post
+from telegram import InlineQueryResultArticle, InlineQueryResultPhoto
+from telereddit.inline import InlineIndex, build_result
+from telereddit.listing import Candidate
+from telereddit.subreddits import SubredditRegistry
+
+
+def _post(post_id, content_type=ContentType.TEXT, url=""):
+    permalink = f"https://www.reddit.com/r/a/comments/{post_id}/t/"
+    return Post("r/a", permalink, "title", "", Media(url, content_type))
+
+
+class TestInline(unittest.TestCase):
+    def setUp(self):
+        self.listing = Mock()
+        self.index = InlineIndex(self.listing, size=2, ttl=60)
+
+    def test_build_result_photo(self):
+        result = build_result(
+            _post("abc", ContentType.PHOTO, "https://i.redd.it/a.jpg")
+        )
+        self.assertIsInstance(result, InlineQueryResultPhoto)
+        self.assertEqual(result.id, "abc")
+        self.assertEqual(result.photo_url, "https://i.redd.it/a.jpg")
+
+    def test_build_result_text(self):
+        result = build_result(_post("abc"))
+        self.assertIsInstance(result, InlineQueryResultArticle)
+        self.assertTrue(result.input_message_content.disable_web_page_preview)
+
+    def test_build_result_video(self):
+        result = build_result(
+            _post("abc", ContentType.VIDEO, "https://v.redd.it/a")
+        )
+        self.assertIsInstance(result, InlineQueryResultArticle)
+        self.assertTrue(
+            result.input_message_content.message_text.startswith(
+                "[Media](https://v.redd.it/a)"
+            )
+        )
+        self.assertFalse(result.input_message_content.disable_web_page_preview)
+
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_refresh(self, mock_get_post):
+        self.listing.fetch.return_value = [
+            Candidate("url", None),
+            Candidate("", _post("def")),
+            Candidate("", _post("ghi")),
+        ]
+        mock_get_post.return_value = _post("abc")
+        self.assertIsNone(self.index.get("r/A"))
+        self.assertIn("r/a", self.index._pending)
+        self.index._refresh("r/a")
+        results = self.index.get("r/a")
+        self.assertEqual([r.id for r in results], ["abc", "def"])
+        mock_get_post.assert_called_once_with("url")
+
+    def test_refresh_invalid_subreddit(self):
+        self.listing.fetch.side_effect = SubredditError("")
+        self.index._refresh("r/invalid")
+        self.assertEqual(self.index.get("r/invalid"), [])
+
+    def test_max_subreddits(self):
+        self.listing.fetch.return_value = []
+        self.index.max_subreddits = 2
+        for subreddit in ["r/a", "r/b", "r/c"]:
+            self.index._refresh(subreddit)
+        self.assertEqual(list(self.index._results), ["r/b", "r/c"])
+
+    @patch("telereddit.inline.time.monotonic")
+    def test_schedule_prefixes(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        for query in ["r/f", "r/fu", "r/fun", "r/b", "r/funny"]:
+            self.index.get(query)
+        self.assertEqual(list(self.index._pending), ["r/b", "r/funny"])
+
+    @patch("telereddit.inline.time.monotonic")
+    def test_next(self, mock_monotonic):
+        self.index.debounce = 1
+        self.index.pending_ttl = 10
+        mock_monotonic.return_value = 100
+        self.index.get("r/a")
+        mock_monotonic.return_value = 105
+        self.index.get("r/b")
+        self.index.get("r/c")
+        mock_monotonic.return_value = 110
+        # most recently queried first, stale ones dropped
+        self.assertEqual(self.index._next(), "r/c")
+        self.assertEqual(self.index._next(), "r/b")
+        self.assertEqual(list(self.index._pending), [])
+        self.assertEqual(self.index._refreshing, {"r/b", "r/c"})
+
+    def test_max_pending(self):
+        self.index.max_pending = 2
+        for subreddit in ["r/a", "r/b", "r/c"]:
+            self.index.get(subreddit)
+        self.assertEqual(list(self.index._pending), ["r/b", "r/c"])
+
+    def test_refresh_subreddits(self):
+        self.index.subreddits = SubredditRegistry()
+        self.index.subreddits.set_invalid("r/invalid", SubredditError(""))
+        self.index._refresh("r/invalid")
+        self.assertEqual(self.index.get("r/invalid"), [])
+        self.listing.fetch.assert_not_called()
+
+        self.listing.fetch.return_value = [Candidate("", _post("abc"))]
+        self.index._refresh("r/a")
+        self.assertTrue(self.index.subreddits.valid.get("r/a"))
+
+        self.listing.fetch.side_effect = SubredditError("")
+        self.index._refresh("r/b")
+        with self.assertRaises(SubredditError):
+            self.index.subreddits.check("r/b")
@@ -6,10 +6,22 @@ from pyreddit.pyreddit.exceptions import SubredditError
 from pyreddit.pyreddit.models.content_type import ContentType
 from pyreddit.pyreddit.models.media import Media
 from pyreddit.pyreddit.models.post import Post
-from telereddit import telereddit
-from telereddit.config.config import MAX_MEDIA_SIZE
-from telereddit.exceptions import PostEqualsMessageError, TeleredditError
+from telereddit import media_group, telereddit
+from telereddit.config.config import MAX_MEDIA_SIZE, SEEN_POSTS_MAX_SKIPS
+from telegram.error import BadRequest, TimedOut
+from telereddit.exceptions import (
+    MediaTooBigError,
+    PostEqualsMessageError,
+    PostSendError,
+    RedditUnavailableError,
+    TeleredditError,
+)
+from telereddit.file_store import MemoryFileIdStore
 from telereddit.linker import Linker
+from telereddit.media_probe import MediaInfo
+from telereddit.post_cache import PostCache
+from telereddit.seen_posts import SeenPosts
+from telereddit.subreddits import SubredditRegistry
 
 
 class TestLinker(unittest.TestCase):
@@ -182,3 +194,317 @@ class TestLinker(unittest.TestCase):
     def test_send_exception_message_no_kb(self, mock_send_message):
         e = Mock()
         self.linker._send_exception_message(e, False)
+
+    @patch("telereddit.linker.Linker.send_fetched_post")
+    @patch("telereddit.linker.Linker.send_post")
+    def test_send_random_post_pooled(self, mock_send_post, mock_send_pooled):
+        pool = Mock()
+        pool.get.return_value = Post("", "", "", "", Media("", None))
+        Linker.set_post_pool(pool)
+        try:
+            self.linker.send_random_post("r/valid")
+        finally:
+            Linker.set_post_pool(None)
+        mock_send_pooled.assert_called_once_with(pool.get.return_value)
+        mock_send_post.assert_not_called()
+
+    @patch("telereddit.linker.Linker.send_fetched_post")
+    @patch("telereddit.linker.Linker.send_post")
+    def test_send_random_post_prefetched(self, mock_send_post, mock_send):
+        post = Post("", "", "", "", Media("", None))
+        mock_send.side_effect = [TeleredditError(""), None]
+        self.linker.send_random_post("r/valid", post)
+        mock_send.assert_called_once_with(post)
+        mock_send_post.assert_called_once()
+
+    @patch("telereddit.linker.Linker.send_fetched_post")
+    @patch("telereddit.linker.Linker.send_post")
+    def test_send_post_from_url_prefetched(self, mock_send_post, mock_send):
+        post = Post("", "", "", "", Media("", None))
+        self.linker.send_post_from_url("", post)
+        mock_send.assert_called_once_with(post, from_url=True)
+        mock_send_post.assert_not_called()
+
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_fetch_post_cached(self, mock_get_post):
+        mock_get_post.return_value = Post(
+            "", "https://www.reddit.com/r/a/comments/abc/t/", "", "", None
+        )
+        Linker.set_post_cache(PostCache())
+        try:
+            post = self.linker.fetch_post("https://reddit.app.link/abc")
+            cached_post = self.linker.fetch_post("https://redd.it/abc")
+        finally:
+            Linker.set_post_cache(None)
+        self.assertIs(post, cached_post)
+        mock_get_post.assert_called_once()
+
+    def test_call_with_media_file_id(self):
+        store = MemoryFileIdStore()
+        Linker.set_file_id_store(store)
+        call = Mock()
+        call.return_value.effective_attachment.file_id = "file_id"
+        try:
+            self.linker._call_with_media("url", call)
+            self.linker._call_with_media("url", call)
+            call.side_effect = [BadRequest(""), None]
+            self.linker._call_with_media("url", call)
+        finally:
+            Linker.set_file_id_store(None)
+        self.assertEqual(
+            [c.args[0] for c in call.call_args_list],
+            ["url", "file_id", "file_id", "url"],
+        )
+
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_fetch_post_stale(self, mock_get_post):
+        post = Post(
+            "", "https://www.reddit.com/r/a/comments/abc/t/", "", "", None
+        )
+        cache = Mock()
+        cache.get.side_effect = [None, post]
+        breaker = Mock()
+        breaker.call.side_effect = RedditUnavailableError()
+        Linker.set_post_cache(cache)
+        Linker.set_reddit_breaker(breaker)
+        try:
+            self.assertIs(self.linker.fetch_post("https://redd.it/abc"), post)
+        finally:
+            Linker.set_post_cache(None)
+            Linker.set_reddit_breaker(None)
+        cache.get.assert_called_with("https://redd.it/abc", stale=True)
+
+    @patch("telereddit.linker.Linker.bot.sendPhoto")
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_send_post_probed_once(self, mock_get_post, mock_send_photo):
+        media = Media("https://i.redd.it/a.jpg", ContentType.PHOTO)
+        mock_get_post.return_value = Post("", "", "", "", media)
+        probe = Mock()
+        probe.probe.return_value = MediaInfo(None, None)
+        Linker.set_media_probe(probe)
+        try:
+            self.linker.send_post("")
+        finally:
+            Linker.set_media_probe(None)
+        probe.probe.assert_called_once()
+
+    @patch("telereddit.linker.Linker.bot.sendMessage")
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_send_post_probed_too_big(self, mock_get_post, mock_send_message):
+        media = Media("https://i.redd.it/a.jpg", ContentType.PHOTO)
+        mock_get_post.return_value = Post("", "", "", "", media)
+        probe = Mock()
+        probe.probe.return_value = MediaInfo(MAX_MEDIA_SIZE + 1, "image/jpeg")
+        Linker.set_media_probe(probe)
+        try:
+            with self.assertRaises(MediaTooBigError):
+                self.linker.send_post("")
+            self.linker.send_post("", from_url=True)
+        finally:
+            Linker.set_media_probe(None)
+        probe.probe.assert_called_with("https://i.redd.it/a.jpg")
+        self.assertTrue(
+            mock_send_message.call_args.kwargs["text"].startswith(
+                "[Media](https://i.redd.it/a.jpg)"
+            )
+        )
+
+    @patch("telereddit.linker.Linker.bot.sendMessage")
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    @patch("pyreddit.pyreddit.helpers.get_random_post_url")
+    def test_send_random_post_skips_seen(
+        self, mock_random_url, mock_get_post, mock_send_message
+    ):
+        seen_url = "https://www.reddit.com/r/a/comments/abc/t/"
+        new_url = "https://www.reddit.com/r/a/comments/def/t/"
+        mock_random_url.side_effect = [seen_url, new_url]
+        mock_get_post.return_value = Post(
+            "", new_url, "", "", Media("", ContentType.TEXT)
+        )
+        seen_posts = SeenPosts()
+        seen_posts.add(0, "https://redd.it/abc")
+        Linker.set_seen_posts(seen_posts)
+        try:
+            self.linker.send_random_post("r/a")
+        finally:
+            Linker.set_seen_posts(None)
+        mock_get_post.assert_called_once_with(new_url)
+        self.assertTrue(seen_posts.is_seen(0, new_url))
+
+    @patch("pyreddit.pyreddit.helpers.get_random_post_url")
+    def test_random_post_url_all_seen(self, mock_random_url):
+        urls = [
+            f"https://www.reddit.com/r/a/comments/{i}/t/"
+            for i in range(SEEN_POSTS_MAX_SKIPS + 1)
+        ]
+        mock_random_url.side_effect = urls
+        seen_posts = SeenPosts()
+        for url in urls:
+            seen_posts.add(0, url)
+        Linker.set_seen_posts(seen_posts)
+        try:
+            post_url = self.linker._get_random_post_url("r/a")
+        finally:
+            Linker.set_seen_posts(None)
+        self.assertEqual(mock_random_url.call_count, SEEN_POSTS_MAX_SKIPS)
+        self.assertEqual(post_url, urls[SEEN_POSTS_MAX_SKIPS - 1])
+
+    @patch("telereddit.linker.Linker.bot.sendMessage")
+    @patch("pyreddit.pyreddit.helpers.get_random_post_url")
+    def test_send_random_post_invalid_subreddit_cached(
+        self, mock_random_url, mock_send_message
+    ):
+        mock_random_url.side_effect = SubredditError("Invalid subreddit.")
+        Linker.set_subreddits(SubredditRegistry())
+        try:
+            self.linker.send_random_post("r/invalid")
+            self.linker.send_random_post("r/Invalid")
+        finally:
+            Linker.set_subreddits(None)
+        mock_random_url.assert_called_once()
+        self.assertEqual(
+            [c.kwargs["text"] for c in mock_send_message.call_args_list],
+            ["Invalid subreddit."] * 2,
+        )
+
+    def test_call_with_media_upload(self):
+        downloader = Mock()
+        downloader.download.return_value.__enter__ = Mock(return_value="file")
+        downloader.download.return_value.__exit__ = Mock(return_value=False)
+        Linker.set_media_downloader(downloader)
+        call = Mock()
+        call.side_effect = [BadRequest("Failed to get HTTP URL content"), None]
+        try:
+            self.linker._call_with_media("url", call)
+            call.side_effect = BadRequest("Can't parse entities")
+            with self.assertRaises(BadRequest):
+                self.linker._call_with_media("url", call)
+        finally:
+            Linker.set_media_downloader(None)
+        self.assertEqual(
+            [c.args[0] for c in call.call_args_list], ["url", "file", "url"]
+        )
+        downloader.download.assert_called_once_with("url")
+
+    @patch("telereddit.linker.Linker.bot.sendMediaGroup")
+    @patch("telereddit.linker.Linker.bot.sendMessage")
+    def test_send_album_from_urls(
+        self, mock_send_message, mock_send_media_group
+    ):
+        posts = [
+            Post("r/a", "", "a", "", Media("https://a.jpg", ContentType.PHOTO)),
+            Post("r/b", "", "b", "", Media("https://b.mp4", ContentType.VIDEO)),
+        ]
+        mock_send_media_group.return_value = [
+            Mock(message_id=10),
+            Mock(message_id=11),
+        ]
+        self.assertTrue(self.linker.send_album_from_urls(posts))
+        keyboard_args = mock_send_message.call_args.kwargs
+        self.assertEqual(keyboard_args["text"], "r/a r/b")
+        self.assertEqual(keyboard_args["reply_to_message_id"], 10)
+        self.assertEqual(
+            keyboard_args["reply_markup"].inline_keyboard[0][0].callback_data,
+            "delete:0-1",
+        )
+        media = mock_send_media_group.call_args.kwargs["media"]
+        self.assertEqual([m.type for m in media], ["photo", "video"])
+        self.assertEqual(
+            [m.media for m in media], ["https://a.jpg", "https://b.mp4"]
+        )
+        self.assertTrue(media[1].caption.startswith("*b*"))
+
+        mock_send_media_group.side_effect = BadRequest("Wrong file type")
+        self.assertFalse(self.linker.send_album_from_urls(posts))
+
+        mock_send_media_group.side_effect = TimedOut()
+        with self.assertRaises(PostSendError):
+            self.linker.send_album_from_urls(posts)
+
+    @patch("telereddit.linker.Linker.bot.sendMessage")
+    @patch("telereddit.linker.Linker.send_fetched_post")
+    def test_send_post_from_url_send_error(
+        self, mock_send_fetched_post, mock_send_message
+    ):
+        mock_send_fetched_post.side_effect = PostSendError(capture=False)
+        with self.assertRaises(PostSendError):
+            self.linker.send_post_from_url("", Mock())
+        mock_send_message.assert_called_once()
+
+    @patch("telereddit.linker.Linker.bot.sendMessage")
+    @patch("telereddit.linker.Linker.bot.sendPhoto")
+    @patch("telereddit.linker.Linker.bot.sendMediaGroup")
+    def test_send_gallery(
+        self, mock_send_media_group, mock_send_photo, mock_send_message
+    ):
+        post = Post(
+            "r/a",
+            "",
+            "a",
+            "",
+            Media("https://www.reddit.com/gallery/abc", ContentType.PHOTO),
+        )
+        media_group.set_gallery(
+            post,
+            [Media(f"https://{i}.jpg", ContentType.PHOTO) for i in range(11)],
+        )
+        mock_send_media_group.side_effect = [
+            [Mock(message_id=i) for i in range(10, 16)],
+            [Mock(message_id=i) for i in range(20, 25)],
+        ]
+        self.linker.send_fetched_post(post, from_url=True)
+        albums = [
+            c.kwargs["media"] for c in mock_send_media_group.call_args_list
+        ]
+        self.assertEqual([len(album) for album in albums], [6, 5])
+        self.assertEqual(
+            mock_send_message.call_args.kwargs["reply_markup"]
+            .inline_keyboard[0][0]
+            .callback_data,
+            "delete:0-5,10-14",
+        )
+        self.assertTrue(albums[0][0].caption.startswith("*a*"))
+        self.assertIsNone(getattr(albums[0][1], "caption", None))
+        mock_send_photo.assert_not_called()
+
+        mock_send_media_group.side_effect = BadRequest("Wrong file type")
+        self.linker.send_fetched_post(post, from_url=True)
+        mock_send_photo.assert_called_once()
+
+        mock_send_media_group.side_effect = TimedOut()
+        with self.assertRaises(PostSendError):
+            self.linker.send_fetched_post(post, from_url=True)
+        mock_send_photo.assert_called_once()
+
+    @patch("telereddit.linker.Linker.bot.deleteMessage")
+    def test_delete_album(self, mock_delete_message):
+        message = Mock(chat_id=1, message_id=20)
+        message.reply_to_message.message_id = 10
+        album_ids = media_group.get_album_message_ids(message, "delete:0-1,5-5")
+        self.assertEqual(album_ids, [10, 11, 15])
+        self.assertEqual(
+            media_group.get_album_message_ids(message, "delete"), []
+        )
+        self.linker.delete_message(message, album_ids)
+        self.assertEqual(
+            [c.args for c in mock_delete_message.call_args_list],
+            [(1, 10), (1, 11), (1, 15), (1, 20)],
+        )
+
+    @patch("telereddit.linker.Linker.bot.answerInlineQuery")
+    def test_answer_inline_query(self, mock_answer):
+        index = Mock()
+        index.get.side_effect = [None, ["a", "b"]]
+        Linker.set_inline_index(index)
+        try:
+            self.linker.answer_inline_query("id", "r/funny")
+            self.linker.answer_inline_query("id", "r/funny")
+            self.linker.answer_inline_query("id", "funny")
+        finally:
+            Linker.set_inline_index(None)
+        index.get.assert_called_with("r/funny")
+        self.assertEqual(index.get.call_count, 2)
+        results = [c.args[1] for c in mock_answer.call_args_list]
+        self.assertEqual(results[0], [])
+        self.assertCountEqual(results[1], ["a", "b"])
+        self.assertEqual(results[2], [])
@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import Mock
+
+from parameterized import parameterized
+from pyreddit.pyreddit.exceptions import RedditError, SubredditError
+from pyreddit.pyreddit.models.content_type import ContentType
+from telereddit.config.config import MAX_MEDIA_SIZE
+from telereddit.listing import ListingFetcher, parse_candidate
+
+PERMALINK = "/r/funny/comments/abc/title/"
+
+
+def _data(**data):
+    return {
+        "permalink": PERMALINK,
+        "subreddit_name_prefixed": "r/funny",
+        "title": "t",
+        **data,
+    }
+
+
+class TestListing(unittest.TestCase):
+    def setUp(self):
+        self.session = Mock()
+        self.listing = ListingFetcher(session=self.session)
+
+    def test_parse_text(self):
+        candidate = parse_candidate(_data(is_self=True, selftext="text"))
+        self.assertEqual(
+            candidate.permalink, "https://www.reddit.com" + PERMALINK
+        )
+        self.assertEqual(candidate.post.text, "text")
+        self.assertEqual(candidate.post.get_type(), ContentType.TEXT)
+
+    def test_parse_photo(self):
+        candidate = parse_candidate(_data(url="https://i.redd.it/a.jpg"))
+        self.assertEqual(candidate.post.media.url, "https://i.redd.it/a.jpg")
+        self.assertEqual(candidate.post.get_type(), ContentType.PHOTO)
+
+    def test_parse_other(self):
+        candidate = parse_candidate(_data(url="https://v.redd.it/a"))
+        self.assertIsNone(candidate.post)
+
+    @parameterized.expand(
+        [
+            [_data(stickied=True, is_self=True)],
+            [
+                _data(
+                    secure_media={
+                        "reddit_video": {
+                            "bitrate_kbps": 4800,
+                            "duration": MAX_MEDIA_SIZE,
+                        }
+                    }
+                )
+            ],
+        ]
+    )
+    def test_parse_unsuitable(self, data):
+        self.assertIsNone(parse_candidate(data))
+
+    def test_fetch(self):
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.json.return_value = {
+            "data": {
+                "children": [
+                    {"data": _data(is_self=True)},
+                    {"data": _data(stickied=True)},
+                ]
+            }
+        }
+        self.assertEqual(len(self.listing.fetch("r/funny")), 1)
+        self.assertEqual(
+            self.session.get.call_args.args[0],
+            "https://www.reddit.com/r/funny/hot.json",
+        )
+        self.assertEqual(
+            self.session.get.call_args.kwargs["params"]["limit"], 100
+        )
+
+    @parameterized.expand([[302, SubredditError], [404, SubredditError]])
+    def test_fetch_invalid_subreddit(self, status_code, error):
+        self.session.get.return_value.status_code = status_code
+        with self.assertRaises(error):
+            self.listing.fetch("r/invalid")
+
+    def test_fetch_error(self):
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.json.side_effect = ValueError
+        with self.assertRaises(RedditError):
+            self.listing.fetch("r/funny")
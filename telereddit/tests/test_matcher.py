@@ -0,0 +1,37 @@
+import unittest
+
+from parameterized import parameterized
+from telereddit.matcher import match
+
+
+class TestMatcher(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("hi there, and/or 1/2 😂", [], []),
+            (
+                "look https://www.Reddit.com/r/funny/comments/abc/x/, lol",
+                ["https://www.Reddit.com/r/funny/comments/abc/x/"],
+                [],
+            ),
+            (
+                "https://redd.it/abc. (https://reddit.app.link/xyz)",
+                ["https://redd.it/abc", "https://reddit.app.link/xyz"],
+                [],
+            ),
+            (
+                "old.reddit.com/r/a/comments/b\nhttps://redd.it/c redd.it/c",
+                ["old.reddit.com/r/a/comments/b", "https://redd.it/c"],
+                [],
+            ),
+            ("https://redd.it/c https://redd.it/c", ["https://redd.it/c"], []),
+            ("notreddit.com/r/abc user@reddit.com/abc reddit.com", [], []),
+            ("R/Aww and r/aww, /r/pics/", [], ["r/aww", "r/pics"]),
+            ("a/r/abc r/a r/èbc https://example.com/r/abc", [], []),
+            ("redd.it/abc r/pics", ["redd.it/abc"], ["r/pics"]),
+        ]
+    )
+    def test_match(self, text, urls, subreddits):
+        matches = match(text)
+        self.assertEqual(matches.urls, urls)
+        self.assertEqual(matches.subreddits, subreddits)
+        self.assertEqual(bool(matches), bool(urls or subreddits))
@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import Mock
+
+from pyreddit.pyreddit.exceptions import RedditError
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.media import Media
+from pyreddit.pyreddit.models.post import Post
+from telereddit.config.config import MAX_MEDIA_SIZE
+from telereddit.media_group import (
+    GalleryFetcher,
+    get_gallery_id,
+    group_posts,
+    is_groupable,
+    parse_gallery,
+    set_gallery,
+)
+
+GALLERY_DATA = {
+    "gallery_data": {
+        "items": [{"media_id": "a"}, {"media_id": "b"}, {"media_id": "c"}]
+    },
+    "media_metadata": {
+        "a": {"status": "valid", "e": "Image", "s": {"u": "https://a.jpg"}},
+        "b": {"status": "unprocessed"},
+        "c": {
+            "status": "valid",
+            "e": "AnimatedImage",
+            "s": {"gif": "https://c.gif", "mp4": "https://c.mp4"},
+        },
+    },
+}
+
+
+def _post(content_type, url="https://i.redd.it/a.jpg", size=None):
+    return Post("r/a", "", "", "", Media(url, content_type, size))
+
+
+class TestMediaGroup(unittest.TestCase):
+    def test_parse_gallery(self):
+        media = parse_gallery(GALLERY_DATA)
+        self.assertEqual(
+            [(m.url, m.type) for m in media],
+            [
+                ("https://a.jpg", ContentType.PHOTO),
+                ("https://c.mp4", ContentType.VIDEO),
+            ],
+        )
+        self.assertEqual(parse_gallery({}), [])
+
+    def test_get_gallery_id(self):
+        post = _post(ContentType.TEXT, "https://www.reddit.com/gallery/AbC")
+        self.assertEqual(get_gallery_id(post), "abc")
+        self.assertIsNone(get_gallery_id(_post(ContentType.PHOTO)))
+
+    def test_is_groupable(self):
+        self.assertTrue(is_groupable(_post(ContentType.PHOTO)))
+        self.assertTrue(is_groupable(_post(ContentType.VIDEO)))
+        self.assertFalse(is_groupable(_post(ContentType.GIF)))
+        self.assertFalse(is_groupable(_post(ContentType.TEXT)))
+        self.assertFalse(is_groupable(None))
+        self.assertFalse(
+            is_groupable(_post(ContentType.VIDEO, size=MAX_MEDIA_SIZE + 1))
+        )
+        gallery = _post(ContentType.PHOTO)
+        set_gallery(gallery, [])
+        self.assertFalse(is_groupable(gallery))
+
+    def test_group_posts(self):
+        photo = _post(ContentType.PHOTO)
+        text = _post(ContentType.TEXT)
+        posts = [photo, photo, text, photo, None, photo, photo, photo]
+        self.assertEqual(
+            group_posts(posts, size=2),
+            [[0, 1], [2], [3], [4], [5, 6], [7]],
+        )
+
+    def test_fetch(self):
+        session = Mock()
+        session.get.return_value.json.return_value = [
+            {"data": {"children": [{"data": GALLERY_DATA}]}}
+        ]
+        media = GalleryFetcher(session).fetch("abc")
+        self.assertEqual(len(media), 2)
+        self.assertEqual(
+            session.get.call_args.args[0],
+            "https://www.reddit.com/comments/abc.json",
+        )
+
+        session.get.return_value.json.return_value = []
+        with self.assertRaises(RedditError):
+            GalleryFetcher(session).fetch("abc")
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import MagicMock, Mock
+
+import requests
+from parameterized import parameterized
+from telereddit.media_probe import MediaInfo, MediaProbe
+
+
+def _response(status_code=200, **headers):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.headers = headers
+    response.__enter__.return_value = response
+    return response
+
+
+class TestMediaProbe(unittest.TestCase):
+    def setUp(self):
+        self.session = Mock()
+        self.probe = MediaProbe(session=self.session)
+
+    def test_head(self):
+        self.session.head.return_value = _response(
+            **{"Content-Length": "1000", "Content-Type": "image/jpeg"}
+        )
+        self.assertEqual(self.probe.probe("url"), MediaInfo(1000, "image/jpeg"))
+        self.assertEqual(self.probe.probe("url"), MediaInfo(1000, "image/jpeg"))
+        self.session.head.assert_called_once()
+        self.session.get.assert_not_called()
+
+    @parameterized.expand(
+        [
+            (_response(206, **{"Content-Range": "bytes 0-0/5000"}), 5000),
+            (_response(200, **{"Content-Length": "5000"}), 5000),
+            (_response(206), None),
+            (_response(404), None),
+        ]
+    )
+    def test_get_first_byte(self, response, size):
+        self.session.head.return_value = _response(405)
+        self.session.get.return_value = response
+        self.assertEqual(self.probe.probe("url").size, size)
+        self.assertEqual(
+            self.session.get.call_args.kwargs["headers"], {"Range": "bytes=0-0"}
+        )
+
+    def test_failed(self):
+        self.session.head.side_effect = requests.ConnectionError()
+        self.assertEqual(self.probe.probe("url"), MediaInfo(None, None))
+        self.probe.probe("url")
+        self.assertEqual(self.session.head.call_count, 1)
+
+    def test_failed_expired(self):
+        self.probe.failed_ttl = 0
+        self.session.head.side_effect = requests.ConnectionError()
+        self.probe.probe("url")
+        self.probe.probe("url")
+        self.assertEqual(self.session.head.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
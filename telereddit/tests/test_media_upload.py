@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import MagicMock, Mock
+
+import requests
+from parameterized import parameterized
+from telegram.error import BadRequest
+from telereddit.exceptions import MediaTooBigError
+from telereddit.media_upload import MediaDownloader, is_url_fetch_error
+
+
+def _response(chunks, **headers):
+    response = MagicMock()
+    response.headers = headers
+    response.iter_content.return_value = chunks
+    response.__enter__.return_value = response
+    return response
+
+
+class TestMediaUpload(unittest.TestCase):
+    def setUp(self):
+        self.session = Mock()
+        self.downloader = MediaDownloader(
+            max_size=10, spool_size=4, session=self.session
+        )
+
+    @parameterized.expand(
+        [
+            [BadRequest("Failed to get HTTP URL content"), True],
+            [BadRequest("Wrong type of the web page content"), True],
+            [BadRequest("Can't parse entities"), False],
+            [ValueError("http url"), False],
+        ]
+    )
+    def test_is_url_fetch_error(self, error, expected):
+        self.assertEqual(is_url_fetch_error(error), expected)
+
+    def test_download(self):
+        self.session.get.return_value = _response(
+            [b"abc", b"def", b"gh"], **{"Content-Type": "video/mp4"}
+        )
+        with self.downloader.download("https://v.redd.it/abc/video") as media:
+            self.assertEqual(media.read(), b"abcdefgh")
+            self.assertEqual(media.name, "video.mp4")
+        self.assertTrue(self.session.get.call_args.kwargs["stream"])
+
+    @parameterized.expand(
+        [
+            [_response([b"a" * 6, b"a" * 6])],
+            [_response([b"a"], **{"Content-Length": "11"})],
+        ]
+    )
+    def test_download_too_big(self, response):
+        self.session.get.return_value = response
+        with self.assertRaises(MediaTooBigError):
+            with self.downloader.download("https://i.redd.it/a.jpg"):
+                pass
+
+    def test_download_error(self):
+        self.session.get.return_value = _response([])
+        self.session.get.return_value.raise_for_status.side_effect = (
+            requests.HTTPError
+        )
+        with self.assertRaises(requests.HTTPError):
+            with self.downloader.download("https://i.redd.it/a.jpg"):
+                pass
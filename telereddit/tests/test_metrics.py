@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.testing import bind_unused_port
+from tornado.web import Application
+
+from telereddit import metrics
+from telereddit.metrics import Counter, Gauge, Histogram
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("telereddit.metrics._REGISTRY", [])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_counter(self):
+        counter = Counter("test_total", "Test counter.", ["kind"])
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        counter.inc(kind='b"')
+        self.assertEqual(
+            counter.expose(),
+            "# HELP test_total Test counter.\n"
+            "# TYPE test_total counter\n"
+            'test_total{kind="a"} 3\n'
+            'test_total{kind="b\\""} 1\n',
+        )
+
+    def test_gauge(self):
+        gauge = Gauge("test_gauge", "Test gauge.")
+        gauge.set(1)
+        gauge.set(0.5)
+        self.assertIn("test_gauge 0.5\n", gauge.expose())
+
+    def test_histogram(self):
+        histogram = Histogram("test_seconds", "Test.", ["op"], [0.1, 1])
+        histogram.observe(0.05, op="get")
+        histogram.observe(0.5, op="get")
+        histogram.observe(5, op="get")
+        exposed = histogram.expose()
+        self.assertIn('test_seconds_bucket{op="get",le="0.1"} 1\n', exposed)
+        self.assertIn('test_seconds_bucket{op="get",le="1"} 2\n', exposed)
+        self.assertIn('test_seconds_bucket{op="get",le="+Inf"} 3\n', exposed)
+        self.assertIn('test_seconds_sum{op="get"} 5.55\n', exposed)
+        self.assertIn('test_seconds_count{op="get"} 3\n', exposed)
+
+    @patch("telereddit.metrics.time.perf_counter")
+    def test_histogram_time(self, mock_perf_counter):
+        mock_perf_counter.side_effect = [0, 2]
+        histogram = Histogram("test_seconds", "Test.", buckets=[1, 5])
+        with self.assertRaises(ValueError):
+            with histogram.time():
+                raise ValueError
+        self.assertIn('test_seconds_bucket{le="1"} 0\n', histogram.expose())
+        self.assertIn('test_seconds_bucket{le="5"} 1\n', histogram.expose())
+
+    def test_metrics_server(self):
+        Counter("test_total", "Test counter.").inc()
+        server = metrics.start_metrics_server(0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            self.assertEqual(response.read().decode(), metrics.expose())
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other")
+
+    def test_metrics_route(self):
+        Counter("test_total", "Test counter.").inc()
+        app = Application()
+        metrics.add_metrics_route(app)
+        sock, port = bind_unused_port()
+        started = threading.Event()
+        loops = []
+
+        def serve():
+            asyncio.set_event_loop(asyncio.new_event_loop())
+            HTTPServer(app).add_sockets([sock])
+            loops.append(IOLoop.current())
+            started.set()
+            loops[0].start()
+
+        threading.Thread(target=serve, daemon=True).start()
+        started.wait(timeout=5)
+        self.addCleanup(lambda: loops[0].add_callback(loops[0].stop))
+        url = f"http://127.0.0.1:{port}"
+
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            self.assertEqual(response.read().decode(), metrics.expose())
+        with self.assertRaises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.media import Media
+from pyreddit.pyreddit.models.post import Post
+from telereddit.post_cache import PostCache, get_post_id
+
+PERMALINK = "https://www.reddit.com/r/funny/comments/abc123/title/"
+
+
+class TestPostCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = PostCache()
+        self.post = Post("", PERMALINK, "", "", Media("", ContentType.PHOTO))
+
+    def test_get_post_id(self):
+        self.assertEqual(get_post_id(PERMALINK), "abc123")
+        self.assertEqual(get_post_id("https://redd.it/ABC123"), "abc123")
+        self.assertIsNone(get_post_id("https://reddit.app.link/xyz"))
+
+    def test_get_by_id(self):
+        self.cache.set(PERMALINK, self.post)
+        self.assertIs(self.cache.get("https://redd.it/abc123"), self.post)
+        self.assertEqual(len(self.cache.aliases), 0)
+
+    def test_get_by_alias(self):
+        self.cache.set("https://reddit.app.link/xyz", self.post)
+        self.assertIs(self.cache.get("https://reddit.app.link/xyz"), self.post)
+        self.assertIs(self.cache.get(PERMALINK), self.post)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("https://reddit.app.link/xyz"))
+        self.assertIsNone(self.cache.get(PERMALINK))
+        self.assertEqual(self.cache.stats()["posts"]["misses"], 1)
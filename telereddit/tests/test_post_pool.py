@@ -0,0 +1,100 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from pyreddit.pyreddit.exceptions import RedditError, SubredditError
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.media import Media
+from pyreddit.pyreddit.models.post import Post
+from telereddit.config.config import MAX_MEDIA_SIZE
+from telereddit.listing import Candidate
+from telereddit.post_pool import PostPool
+
+
+def _post(permalink, size=None):
+    return Post("", permalink, "", "", Media("", ContentType.PHOTO, size=size))
+
+
+class TestPostPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = PostPool(size=3, low_water_mark=1, ttl=60)
+
+    def test_get_empty(self):
+        self.assertIsNone(self.pool.get("r/test"))
+        self.assertIn("r/test", self.pool._scheduled)
+
+    @patch("pyreddit.pyreddit.helpers.get_random_post_url")
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_refill(self, mock_get_post, mock_random_url):
+        mock_get_post.side_effect = [_post(str(i)) for i in range(3)]
+        self.pool.get("r/Test")
+        self.pool._refill("r/test")
+        self.assertEqual(len(self.pool._pools["r/test"]), 3)
+        self.assertEqual(self.pool.get("r/test").permalink, "0")
+
+    @patch("pyreddit.pyreddit.helpers.get_random_post_url")
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_refill_skips_invalid(self, mock_get_post, mock_random_url):
+        mock_get_post.side_effect = [
+            _post("0"),
+            _post("0"),
+            RedditError(""),
+            _post("1", size=MAX_MEDIA_SIZE + 1),
+        ] + [_post("2")] * 2
+        self.pool.get("r/test")
+        self.pool._refill("r/test")
+        permalinks = [p.permalink for _, p in self.pool._pools["r/test"]]
+        self.assertEqual(permalinks, ["0", "2"])
+
+    @patch("pyreddit.pyreddit.helpers.get_random_post_url")
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_refill_invalid_subreddit(self, mock_get_post, mock_random_url):
+        mock_get_post.side_effect = SubredditError("")
+        self.pool.get("r/invalid")
+        self.pool._refill("r/invalid")
+        self.assertNotIn("r/invalid", self.pool._pools)
+
+    def test_get_expired(self):
+        self.pool.ttl = 0
+        self.pool.get("r/test")
+        self.pool._pools["r/test"].append((0, _post("0")))
+        self.assertIsNone(self.pool.get("r/test"))
+
+    def test_max_subreddits(self):
+        self.pool.max_subreddits = 2
+        for subreddit in ["r/a", "r/b", "r/c"]:
+            self.pool.get(subreddit)
+        self.assertEqual(list(self.pool._pools), ["r/b", "r/c"])
+
+    def test_get_skip(self):
+        self.pool.get("r/test")
+        now = time.monotonic()
+        self.pool._pools["r/test"].extend(
+            (now, _post(str(i))) for i in range(3)
+        )
+        post = self.pool.get("r/test", skip=lambda p: p.permalink in "01")
+        self.assertEqual(post.permalink, "2")
+        permalinks = [p.permalink for _, p in self.pool._pools["r/test"]]
+        self.assertEqual(permalinks, ["0", "1"])
+
+    @patch("pyreddit.pyreddit.reddit.get_post")
+    def test_refill_listing(self, mock_get_post):
+        listing = Mock()
+        listing.fetch.return_value = [
+            Candidate("0", _post("0")),
+            Candidate("1", None),
+            Candidate("2", _post("2")),
+            Candidate("3", _post("3")),
+        ]
+        mock_get_post.return_value = _post("1")
+        self.pool.listing = listing
+        self.pool.get("r/test")
+        self.pool._refill("r/test")
+        permalinks = [p.permalink for _, p in self.pool._pools["r/test"]]
+        self.assertEqual(permalinks, ["0", "1", "2"])
+        mock_get_post.assert_called_once_with("1")
+
+        self.pool.get("r/test")
+        self.pool._refill("r/test")
+        self.assertEqual(self.pool._pools["r/test"][-1][1].permalink, "3")
+        listing.fetch.assert_called_once_with("r/test")
@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+from unittest.mock import Mock, patch
+
+from telegram.error import RetryAfter
+from telereddit.rate_limiter import RateLimitedBot, RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst(self):
+        bucket = TokenBucket(rate=1, burst=3)
+        for _ in range(3):
+            self.assertEqual(bucket.delay(10), 0)
+            bucket.consume(10)
+        self.assertEqual(bucket.delay(10), 1)
+
+    def test_refill(self):
+        bucket = TokenBucket(rate=2, burst=1)
+        bucket.consume(10)
+        self.assertEqual(bucket.delay(10), 0.5)
+        self.assertEqual(bucket.delay(20), 0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.rate_limiter = RateLimiter(
+            global_rate=100, private_chat_rate=1, group_chat_rate=1 / 3
+        )
+        self.clock = FakeClock()
+        for name, fake in [
+            ("time.monotonic", self.clock.monotonic),
+            ("time.sleep", self.clock.sleep),
+            ("asyncio.sleep", self.clock.async_sleep),
+        ]:
+            patcher = patch(f"telereddit.rate_limiter.{name}", fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_acquire_private_chat(self):
+        waits = [self.rate_limiter.acquire(1) for _ in range(4)]
+        self.assertEqual(waits[:3], [0, 0, 0])
+        self.assertAlmostEqual(waits[3], 1)
+
+    def test_acquire_group_chat(self):
+        waits = [self.rate_limiter.acquire(-1) for _ in range(21)]
+        self.assertEqual(waits[:20], [0] * 20)
+        self.assertAlmostEqual(waits[20], 3)
+
+    def test_pause(self):
+        self.rate_limiter.pause(5)
+        self.assertAlmostEqual(self.rate_limiter.acquire(None), 5)
+
+    def test_busy_chat_doesnt_delay_others(self):
+        rate_limiter = RateLimiter(
+            global_rate=30, private_chat_rate=1, group_chat_rate=1 / 3
+        )
+        for _ in range(20):
+            self.assertEqual(rate_limiter.try_acquire(-1), 0)
+        self.assertGreater(rate_limiter.try_acquire(-1), 2)
+        self.assertGreater(rate_limiter.try_acquire(-1), 2)
+        self.assertEqual(rate_limiter.try_acquire(1), 0)
+
+    def test_wait(self):
+        for _ in range(3):
+            self.rate_limiter.acquire(1)
+        self.assertAlmostEqual(asyncio.run(self.rate_limiter.wait(1)), 1)
+
+    def test_admitted(self):
+        for _ in range(2):
+            self.rate_limiter.acquire(1)
+        self.assertEqual(asyncio.run(self.rate_limiter.wait(1)), 0)
+        waits = self.rate_limiter.admitted(
+            1, lambda: [self.rate_limiter.acquire(1) for _ in range(2)]
+        )
+        self.assertEqual(waits[0], 0)
+        self.assertAlmostEqual(waits[1], 1)
+
+
+class TestRateLimitedBot(unittest.TestCase):
+    def setUp(self):
+        self.rate_limiter = Mock()
+        self.bot = RateLimitedBot(Mock(), self.rate_limiter)
+
+    def test_rate_limited_method(self):
+        self.bot.sendMessage(chat_id=1, text="")
+        self.bot.editMessageReplyMarkup(2, 0)
+        self.rate_limiter.acquire.assert_any_call(1)
+        self.rate_limiter.acquire.assert_any_call(2)
+
+    def test_not_rate_limited_method(self):
+        self.bot.answerCallbackQuery(0)
+        self.rate_limiter.acquire.assert_not_called()
+
+    def test_retry_after(self):
+        self.bot.bot.sendMessage.side_effect = [RetryAfter(2), None]
+        self.bot.sendMessage(chat_id=1, text="")
+        self.rate_limiter.pause.assert_called_once_with(2)
+        self.assertEqual(self.bot.bot.sendMessage.call_count, 2)
+
+    def test_retry_after_exhausted(self):
+        self.bot.bot.sendMessage.side_effect = RetryAfter(2)
+        with self.assertRaises(RetryAfter):
+            self.bot.sendMessage(chat_id=1, text="")
@@ -0,0 +1,30 @@
+import unittest
+from unittest.mock import patch
+
+from pyreddit.pyreddit.models.content_type import ContentType
+from pyreddit.pyreddit.models.media import Media
+from pyreddit.pyreddit.models.post import Post
+from telereddit import rendering
+
+
+class TestRendering(unittest.TestCase):
+    def setUp(self):
+        self.post = Post(
+            "r/funny", "", "title", "text", Media("", ContentType.TEXT)
+        )
+
+    def test_render_once(self):
+        with patch.object(Post, "get_msg", return_value="msg") as mock_get_msg:
+            self.assertEqual(rendering.render(self.post), "msg")
+            self.assertEqual(rendering.render(self.post), "msg")
+        mock_get_msg.assert_called_once()
+
+    def test_is_rendered(self):
+        msg = rendering.render(self.post)
+        self.assertTrue(rendering.is_rendered(msg, self.post))
+        self.assertFalse(rendering.is_rendered(msg + "\n", self.post))
+        self.assertFalse(rendering.is_rendered(None, self.post))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+
+from telereddit.exceptions import (
+    MediaTooBigError,
+    PostEqualsMessageError,
+    PostSendError,
+    RedditUnavailableError,
+)
+from telereddit.reporting import ErrorReporter
+
+
+class TestErrorReporter(unittest.TestCase):
+    def setUp(self):
+        self.reporter = ErrorReporter(
+            max_queued=10, dedup_window=60, sample_rates={"Sampled": 0}
+        )
+        self.reporter._sentry = True
+        patcher = patch.object(self.reporter, "_send")
+        self.mock_send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_report(self):
+        error = ValueError("test")
+        self.reporter.report(error, {"post_url": "url"}, capture=True)
+        self.reporter.flush()
+        self.mock_send.assert_called_once()
+        self.assertEqual(
+            self.mock_send.call_args[0][:3], (error, {"post_url": "url"}, True)
+        )
+
+    def test_report_cause(self):
+        try:
+            raise KeyError("cause")
+        except KeyError:
+            self.reporter.report(ValueError("test"))
+        self.reporter.flush()
+        self.assertIs(self.mock_send.call_args[0][3][0], KeyError)
+
+    def test_deduplicate(self):
+        self.reporter.report(ValueError("test"), {"post_url": "a"})
+        self.reporter.report(ValueError("test"), {"post_url": "a"})
+        self.reporter.report(ValueError("test"), {"post_url": "b"})
+        self.reporter.flush()
+        self.assertEqual(self.mock_send.call_count, 2)
+
+    def test_sample(self):
+        sampled = type("Sampled", (Exception,), {})
+        self.reporter.report(sampled())
+        self.reporter.flush()
+        self.mock_send.assert_not_called()
+
+    def test_queue_full(self):
+        with patch.object(self.reporter, "_run"):
+            for i in range(20):
+                self.reporter.report(ValueError(i))
+        self.assertEqual(self.reporter._queue.qsize(), 10)
+
+    @patch("telereddit.reporting.sentry")
+    def test_send_capture(self, mock_sentry):
+        reporter = ErrorReporter()
+        reporter._sentry = True
+        error = ValueError("test")
+        reporter._send(error, {"post_url": "url"}, True, (None, None, None))
+        mock_sentry.capture_exception.assert_called_once_with(error)
+        reporter._send(error, None, False, (None, None, None))
+        mock_sentry.capture_exception.assert_called_once()
+
+
+class TestTeleredditErrorReporting(unittest.TestCase):
+    @patch("telereddit.exceptions.reporter")
+    def test_reported(self, mock_reporter):
+        error = PostSendError({"post_url": "url"})
+        mock_reporter.report.assert_called_once_with(
+            error, {"post_url": "url"}, True
+        )
+        MediaTooBigError()
+        self.assertEqual(mock_reporter.report.call_count, 2)
+
+    @patch("telereddit.exceptions.reporter")
+    def test_not_reported(self, mock_reporter):
+        PostEqualsMessageError()
+        RedditUnavailableError()
+        mock_reporter.report.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from pyreddit.pyreddit.exceptions import RedditError, SubredditError
+from telegram.error import NetworkError
+from telereddit.exceptions import (
+    PostEqualsMessageError,
+    PostSendError,
+    TeleredditError,
+)
+from telereddit.retry import Retry, RetryPolicy, classify
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(
+            max_tries=4, base_delay=1, max_delay=2, budget=10
+        )
+
+    def test_classify(self):
+        self.assertEqual(classify(SubredditError("")), Retry.FATAL)
+        self.assertEqual(classify(RedditError("")), Retry.BACKOFF)
+        self.assertEqual(classify(PostEqualsMessageError()), Retry.NOW)
+        self.assertEqual(classify(PostSendError()), Retry.NOW)
+        try:
+            raise PostSendError() from NetworkError("")
+        except PostSendError as e:
+            self.assertEqual(classify(e), Retry.BACKOFF)
+
+    def test_run_success(self):
+        attempt = Mock(side_effect=[TeleredditError(""), 1])
+        self.assertEqual(self.policy.run(attempt), 1)
+        self.assertEqual(self.policy.stats(), {2: 1})
+
+    def test_run_max_tries(self):
+        attempt = Mock(side_effect=TeleredditError(""))
+        with self.assertRaises(TeleredditError):
+            self.policy.run(attempt)
+        self.assertEqual(attempt.call_count, 4)
+
+    def test_run_fatal(self):
+        attempt = Mock(side_effect=SubredditError(""))
+        with self.assertRaises(SubredditError):
+            self.policy.run(attempt)
+        self.assertEqual(attempt.call_count, 1)
+
+    @patch("telereddit.retry.time.sleep")
+    def test_run_backoff(self, mock_sleep):
+        attempt = Mock(side_effect=[RedditError(""), RedditError(""), 1])
+        self.policy.run(attempt)
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertTrue(0.5 <= delays[0] <= 1)
+        self.assertTrue(1 <= delays[1] <= 2)
+
+    @patch("telereddit.retry.time.sleep")
+    def test_run_budget(self, mock_sleep):
+        self.policy.budget = 0.9
+        attempt = Mock(side_effect=RedditError(""))
+        with self.assertRaises(RedditError):
+            self.policy.run(attempt)
+        self.assertLessEqual(attempt.call_count, 2)
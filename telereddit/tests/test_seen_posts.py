@@ -0,0 +1,28 @@
+import unittest
+
+from telereddit.seen_posts import SeenPosts
+
+
+class TestSeenPosts(unittest.TestCase):
+    def setUp(self):
+        self.seen_posts = SeenPosts(per_chat=2, max_chats=2)
+
+    def test_is_seen(self):
+        self.seen_posts.add(1, "https://www.reddit.com/r/a/comments/abc/t/")
+        self.assertTrue(self.seen_posts.is_seen(1, "https://redd.it/ABC"))
+        self.assertFalse(self.seen_posts.is_seen(2, "https://redd.it/abc"))
+        self.assertFalse(self.seen_posts.is_seen(1, "https://redd.it/def"))
+
+    def test_ring(self):
+        for post_id in ["a", "b", "a", "c"]:
+            self.seen_posts.add(1, f"https://redd.it/{post_id}")
+        self.assertFalse(self.seen_posts.is_seen(1, "https://redd.it/a"))
+        self.assertTrue(self.seen_posts.is_seen(1, "https://redd.it/b"))
+        self.assertTrue(self.seen_posts.is_seen(1, "https://redd.it/c"))
+
+    def test_max_chats(self):
+        for chat_id in [1, 2, 1, 3]:
+            self.seen_posts.add(chat_id, "https://redd.it/a")
+        self.assertEqual(len(self.seen_posts), 2)
+        self.assertTrue(self.seen_posts.is_seen(1, "https://redd.it/a"))
+        self.assertFalse(self.seen_posts.is_seen(2, "https://redd.it/a"))
@@ -0,0 +1,49 @@
+import signal
+import unittest
+from unittest.mock import Mock, patch
+
+from telereddit import startup, telereddit
+from telereddit.startup import StartupProfile
+
+
+class TestStartup(unittest.TestCase):
+    def test_profile_disabled(self):
+        profile = StartupProfile()
+        with profile.phase("phase"):
+            pass
+        self.assertEqual(profile.phases, [])
+
+    def test_profile(self):
+        profile = StartupProfile()
+        profile.enable()
+        with profile.phase("phase"):
+            pass
+        profile.import_modules(["json"])
+        self.assertEqual(
+            [name for name, _ in profile.phases], ["phase", "import json"]
+        )
+        self.assertEqual(len(profile.report().splitlines()), 3)
+
+    @patch("telereddit.telereddit.setup_linker")
+    @patch("telereddit.telereddit.init_sentry")
+    @patch("telereddit.telereddit.init_services")
+    def test_start_services(self, mock_services, mock_sentry, mock_setup):
+        startup.ready.clear()
+        try:
+            telereddit.start_services(Mock(), Mock(), "test")
+            self.assertTrue(startup.ready.is_set())
+        finally:
+            startup.ready.set()
+        mock_setup.assert_called_once()
+
+    @patch("telereddit.telereddit.os.kill")
+    @patch("telereddit.telereddit.init_services")
+    def test_start_services_error(self, mock_services, mock_kill):
+        mock_services.side_effect = Exception
+        startup.ready.clear()
+        try:
+            telereddit.start_services(Mock(), Mock(), "test")
+            self.assertFalse(startup.ready.is_set())
+        finally:
+            startup.ready.set()
+        self.assertEqual(mock_kill.call_args.args[1], signal.SIGTERM)
@@ -0,0 +1,35 @@
+import unittest
+
+from pyreddit.pyreddit.exceptions import SubredditError
+from telereddit.subreddits import SubredditRegistry
+
+
+class TestSubredditRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = SubredditRegistry()
+
+    def test_check_unknown(self):
+        self.registry.check("r/unknown")
+
+    def test_check_invalid(self):
+        self.registry.set_invalid("r/Invalid", SubredditError("Not found."))
+        with self.assertRaisesRegex(SubredditError, "Not found."):
+            self.registry.check("/r/invalid")
+
+    def test_set_valid(self):
+        self.registry.set_invalid("r/a", SubredditError(""))
+        self.registry.set_valid("r/A")
+        self.registry.check("r/a")
+        self.assertTrue(self.registry.valid.get("r/a"))
+        self.assertIsNone(self.registry.valid.get("r/b"))
+
+    def test_set_invalid(self):
+        self.registry.set_valid("r/a")
+        self.registry.set_invalid("r/a", SubredditError(""))
+        self.assertIsNone(self.registry.valid.get("r/a"))
+        self.assertRaises(SubredditError, self.registry.check, "r/a")
+
+    def test_invalid_expired(self):
+        registry = SubredditRegistry(invalid_ttl=0)
+        registry.set_invalid("r/a", SubredditError(""))
+        registry.check("r/a")
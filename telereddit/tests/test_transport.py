@@ -0,0 +1,69 @@
+import sys
+import types
+import unittest
+from unittest.mock import patch
+
+import requests
+from telereddit.transport import Transport
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        self.transport = Transport(
+            pool_sizes={"i.redd.it": 3},
+            default_pool_size=2,
+            connect_timeout=1,
+            read_timeout=2,
+        )
+
+    def test_adapters(self):
+        adapter = self.transport.session.get_adapter("https://i.redd.it/a.jpg")
+        self.assertEqual(adapter._pool_maxsize, 3)
+        adapter = self.transport.session.get_adapter("https://example.com/a")
+        self.assertEqual(adapter._pool_maxsize, 2)
+
+    @patch("requests.Session.send")
+    def test_default_timeout(self, mock_send):
+        self.transport.session.get("https://i.redd.it/a.jpg")
+        self.assertEqual(mock_send.call_args.kwargs["timeout"], (1, 2))
+        self.transport.session.get("https://i.redd.it/a.jpg", timeout=5)
+        self.assertEqual(mock_send.call_args.kwargs["timeout"], 5)
+
+    @patch.dict("os.environ", {"REDDIT_USER_AGENT": "bot by u/someone"})
+    def test_user_agent(self):
+        self.assertEqual(
+            Transport().session.headers["User-Agent"], "bot by u/someone"
+        )
+        self.assertEqual(
+            Transport(user_agent="other").session.headers["User-Agent"],
+            "other",
+        )
+
+    def test_install(self):
+        module = types.ModuleType("package.module")
+        module.requests = requests
+        other = types.ModuleType("other")
+        other.requests = requests
+        with patch.dict(
+            sys.modules, {"package.module": module, "other": other}
+        ):
+            self.transport.install("package")
+        self.assertIsNot(module.requests, requests)
+        self.assertIs(
+            module.requests.RequestException, requests.RequestException
+        )
+        self.assertIs(other.requests, requests)
+
+        with patch.object(self.transport.session, "request") as mock_request:
+            module.requests.get("https://i.redd.it/a.jpg")
+        mock_request.assert_called_once()
+
+    def test_telegram_request_kwargs(self):
+        self.assertEqual(
+            self.transport.get_telegram_request_kwargs(10),
+            dict(con_pool_size=10, connect_timeout=1, read_timeout=2),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
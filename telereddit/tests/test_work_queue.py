@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from telereddit.work_queue import QueueConsumers, WorkQueue
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "queue.db")
+        self.queue = WorkQueue(
+            self.path, visibility_timeout=60, max_attempts=2, retry_delay=0
+        )
+
+    def test_put_get_ack(self):
+        self.queue.put({"update_id": 1})
+        self.queue.put({"update_id": 2})
+        job = self.queue.get()
+        self.assertEqual(job.payload, {"update_id": 1})
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(self.queue.get().payload, {"update_id": 2})
+        self.assertIsNone(self.queue.get())
+        self.queue.ack(job.id)
+        self.assertEqual(len(self.queue), 1)
+
+    @patch("telereddit.work_queue.time.time")
+    def test_visibility_timeout(self, mock_time):
+        mock_time.return_value = 0
+        self.queue.put({"update_id": 1})
+        self.assertIsNotNone(self.queue.get())
+        mock_time.return_value = 59
+        self.assertIsNone(self.queue.get())
+        mock_time.return_value = 60
+        self.assertEqual(self.queue.get().attempts, 2)
+
+    def test_shared_file(self):
+        self.queue.put({"update_id": 1})
+        other = WorkQueue(self.path)
+        self.assertIsNotNone(other.get())
+        self.assertIsNone(self.queue.get())
+
+    def test_dead_letters(self):
+        self.queue.put({"update_id": 1})
+        job = self.queue.get()
+        self.queue.nack(job.id, "error")
+        job = self.queue.get()
+        self.assertEqual(job.attempts, 2)
+        self.queue.nack(job.id, "error")
+        self.assertIsNone(self.queue.get())
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.dead_letters()[0].payload, {"update_id": 1})
+
+    def test_nack_payload(self):
+        self.queue.put({"update_id": 1})
+        self.queue.nack(self.queue.get().id, "error", {"update_id": 1, "a": 1})
+        self.assertEqual(self.queue.get().payload, {"update_id": 1, "a": 1})
+
+    def test_consumers(self):
+        handled = []
+        last_attempts = []
+        done = threading.Event()
+
+        def handle(payload, last_attempt):
+            if payload["update_id"] == 2:
+                last_attempts.append(last_attempt)
+                raise ValueError
+            handled.append(payload["update_id"])
+            if len(handled) == 2:
+                done.set()
+
+        for update_id in range(1, 4):
+            self.queue.put({"update_id": update_id})
+        consumers = QueueConsumers(
+            self.queue, handle, workers=2, poll_interval=0.01
+        )
+        consumers.start()
+        self.assertTrue(done.wait(5))
+        while len(self.queue.dead_letters()) == 0:
+            done.wait(0.01)
+        consumers.stop()
+        self.assertEqual(sorted(handled), [1, 3])
+        self.assertEqual(last_attempts, [False, True])
+        self.assertEqual(len(self.queue), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
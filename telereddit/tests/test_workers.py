@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from telereddit.workers import WorkerPool
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(3)
+        self.pool._queues = [Mock() for _ in range(3)]
+
+    @patch("telereddit.workers.WorkerPool._ensure_started")
+    def test_submit_shards_by_chat(self, mock_ensure_started):
+        self.pool.submit(-4, {"update_id": 1})
+        self.pool.submit(3, {"update_id": 2})
+        self.pool.submit(-4, {"update_id": 3})
+        self.assertEqual(
+            [c.args[0] for c in self.pool._queues[2].put.call_args_list],
+            [{"update_id": 1}, {"update_id": 3}],
+        )
+        self.pool._queues[0].put.assert_called_once_with({"update_id": 2})
+        self.pool._queues[1].put.assert_not_called()
+        mock_ensure_started.assert_called_with(2)
+
+    @patch("telereddit.workers.WorkerPool._ensure_started")
+    @patch("telereddit.telereddit.is_handled")
+    def test_on_update(self, mock_is_handled, mock_ensure_started):
+        update = Mock()
+        update.effective_chat.id = 1
+        mock_is_handled.return_value = True
+        self.pool.on_update(update, Mock())
+        self.pool._queues[1].put.assert_called_once_with(update.to_dict())
+
+        mock_is_handled.return_value = False
+        self.pool.on_update(update, Mock())
+        self.pool._queues[1].put.assert_called_once()
+
+    def test_ensure_started_restarts_dead(self):
+        alive, dead = Mock(), Mock()
+        alive.is_alive.return_value = True
+        dead.is_alive.return_value = False
+        self.pool._processes = [alive, dead, None]
+        with patch.object(self.pool._context, "Process") as mock_process:
+            self.pool.start()
+        self.assertEqual(mock_process.return_value.start.call_count, 2)
+        self.assertIs(self.pool._processes[0], alive)
+        self.assertIs(self.pool._processes[1], mock_process.return_value)
+
+
+if __name__ == "__main__":
+    unittest.main()
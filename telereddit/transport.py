@@ -0,0 +1,196 @@
+"""
+Shared HTTP transport of the outbound requests.
+
+All the requests to Reddit and to the media hosts go through a single
+keep-alive session, with a connection pool for each of the main hosts, so that
+connections and TLS sessions are reused across requests.
+"""
+
+import os
+import sys
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from telereddit.config.config import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_DEFAULT_POOL_SIZE,
+    HTTP_POOL_SIZES,
+    HTTP_READ_TIMEOUT,
+    TELEGRAM_POOL_SIZE,
+)
+
+
+class TimeoutSession(requests.Session):
+    """
+    Requests session with a default timeout.
+
+    Parameters
+    ----------
+    timeout : Tuple[float, float]
+        Connect and read timeouts of the requests not setting their own.
+
+    """
+
+    def __init__(self, timeout: Tuple[float, float]) -> None:
+        super().__init__()
+        self.timeout: Tuple[float, float] = timeout
+
+    def request(
+        self, method: str, url: Union[str, bytes], *args: Any, **kwargs: Any
+    ) -> requests.Response:
+        """Make a request, with the default timeout if none is given."""
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+class _SessionRequests:
+    """
+    Stand-in of the `requests` module making the requests through a session.
+
+    Everything else, like exceptions and status codes, is taken from
+    `requests`.
+    """
+
+    def __init__(self, session: requests.Session) -> None:
+        self.session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(requests, name)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, params: Any = None, **kwargs: Any) -> Any:
+        return self.session.get(url, params=params, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> Any:
+        kwargs.setdefault("allow_redirects", False)
+        return self.session.head(url, **kwargs)
+
+    def post(
+        self, url: str, data: Any = None, json: Any = None, **kwargs: Any
+    ) -> Any:
+        return self.session.post(url, data=data, json=json, **kwargs)
+
+
+class Transport:
+    """
+    Pooled HTTP transport of the telereddit process.
+
+    Parameters
+    ----------
+    pool_sizes : dict
+        (Default value = `telereddit.config.config.HTTP_POOL_SIZES`)
+
+        Max number of kept alive connections, by host.
+    default_pool_size : int
+        (Default value = `telereddit.config.config.HTTP_DEFAULT_POOL_SIZE`)
+
+        Max number of kept alive connections to each of the other hosts.
+    connect_timeout : float
+        (Default value = `telereddit.config.config.HTTP_CONNECT_TIMEOUT`)
+
+        Seconds to wait for a connection to be established.
+    read_timeout : float
+        (Default value = `telereddit.config.config.HTTP_READ_TIMEOUT`)
+
+        Seconds to wait for the server to send data.
+    user_agent : str
+        (Default value = None)
+
+        User-Agent header of the requests not setting their own. Defaults to
+        the `REDDIT_USER_AGENT` environment variable, which Reddit requires to
+        identify the bot.
+
+    Attributes
+    ----------
+    session : requests.Session
+        Session making the requests.
+
+    Notes
+    -----
+    HTTP/2 is not available: pyreddit is built on `requests`, which only
+    speaks HTTP/1.1.
+
+    """
+
+    def __init__(
+        self,
+        pool_sizes: Dict[str, int] = HTTP_POOL_SIZES,
+        default_pool_size: int = HTTP_DEFAULT_POOL_SIZE,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        user_agent: Optional[str] = None,
+    ) -> None:
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+        self.session: requests.Session = TimeoutSession(
+            (connect_timeout, read_timeout)
+        )
+        user_agent = user_agent or os.getenv("REDDIT_USER_AGENT")
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        default_adapter = HTTPAdapter(
+            pool_connections=len(pool_sizes) + 1, pool_maxsize=default_pool_size
+        )
+        self.session.mount("https://", default_adapter)
+        self.session.mount("http://", default_adapter)
+        for host, size in pool_sizes.items():
+            self.session.mount(
+                f"https://{host}/",
+                HTTPAdapter(pool_connections=1, pool_maxsize=size),
+            )
+
+    def install(self, package: str = "pyreddit") -> None:
+        """
+        Make the already imported modules of the given package use the session.
+
+        The `requests` module of every module of the package is replaced by a
+        stand-in making the requests through `session`.
+
+        Parameters
+        ----------
+        package : str
+            (Default value = "pyreddit")
+
+            Name of the package.
+
+        """
+        session_requests = _SessionRequests(self.session)
+        for name, module in list(sys.modules.items()):
+            if (
+                (name == package or name.startswith(f"{package}."))
+                and module is not None
+                and getattr(module, "requests", None) is requests
+            ):
+                module.requests = session_requests  # type: ignore
+
+    def get_telegram_request_kwargs(
+        self, pool_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the python-telegram-bot's Request arguments matching the transport.
+
+        python-telegram-bot keeps its own connection pool to the Telegram Bot
+        API: these arguments size it and set its timeouts.
+
+        Parameters
+        ----------
+        pool_size : int
+            (Default value = `telereddit.config.config.TELEGRAM_POOL_SIZE`)
+
+            Max number of kept alive connections to the Telegram Bot API.
+
+        Returns
+        -------
+        dict
+            The `request_kwargs` to be given to the Updater.
+
+        """
+        return dict(
+            con_pool_size=pool_size or TELEGRAM_POOL_SIZE,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+        )
@@ -0,0 +1,307 @@
+"""
+Durable work queue between the webhook intake and the update handling.
+
+Updates received by the webhook are persisted to a SQLite queue and handled by
+a pool of consumers. A consumer claims an update for a visibility timeout, and
+acknowledges it once handled: updates not acknowledged, because the handling
+failed or the process died, are handed out again, and after too many failed
+attempts they are moved to a dead-letter table.
+
+Claims are atomic across connections, so several processes can consume the
+same queue file.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from telereddit.config.config import (
+    QUEUE_CONSUMERS,
+    QUEUE_MAX_ATTEMPTS,
+    QUEUE_POLL_INTERVAL,
+    QUEUE_RETRY_DELAY,
+    QUEUE_VISIBILITY_TIMEOUT,
+)
+
+
+class Job(NamedTuple):
+    """An item claimed from the queue."""
+
+    id: int
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class WorkQueue:
+    """
+    SQLite persistent queue with acknowledgements.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite database file.
+    visibility_timeout : float
+        (Default value = `telereddit.config.config.QUEUE_VISIBILITY_TIMEOUT`)
+
+        Seconds after which a claimed item not acknowledged is handed out
+        again.
+    max_attempts : int
+        (Default value = `telereddit.config.config.QUEUE_MAX_ATTEMPTS`)
+
+        Number of failed attempts after which an item is dead-lettered.
+    retry_delay : float
+        (Default value = `telereddit.config.config.QUEUE_RETRY_DELAY`)
+
+        Seconds after which a failed item is handed out again.
+
+    """
+
+    def __init__(
+        self,
+        path: str,
+        visibility_timeout: float = QUEUE_VISIBILITY_TIMEOUT,
+        max_attempts: int = QUEUE_MAX_ATTEMPTS,
+        retry_delay: float = QUEUE_RETRY_DELAY,
+    ) -> None:
+        self.visibility_timeout: float = visibility_timeout
+        self.max_attempts: int = max_attempts
+        self.retry_delay: float = retry_delay
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "visible_at REAL NOT NULL, error TEXT)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letters "
+                "(id INTEGER PRIMARY KEY, payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL, error TEXT, failed_at REAL NOT NULL)"
+            )
+
+    def __len__(self) -> int:
+        """Get the number of queued items, claimed ones included."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def put(self, payload: Dict[str, Any]) -> int:
+        """
+        Append an item to the queue.
+
+        Parameters
+        ----------
+        payload : dict
+            JSON serializable item.
+
+        Returns
+        -------
+        int
+            Id of the queued item.
+
+        """
+        with self._transaction():
+            cursor = self._db.execute(
+                "INSERT INTO jobs (payload, visible_at) VALUES (?, ?)",
+                (json.dumps(payload), time.time()),
+            )
+        assert cursor.lastrowid is not None
+        return cursor.lastrowid
+
+    def get(self) -> Optional[Job]:
+        """
+        Claim the oldest visible item, hiding it for the visibility timeout.
+
+        Returns
+        -------
+        Job or None
+            The claimed item, or None if no item is visible.
+
+        """
+        now = time.time()
+        with self._transaction():
+            row = self._db.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE visible_at <= ? "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET visible_at = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (now + self.visibility_timeout, row[0]),
+            )
+        return Job(row[0], json.loads(row[1]), row[2] + 1)
+
+    def ack(self, job_id: int) -> None:
+        """
+        Acknowledge a claimed item, removing it from the queue.
+
+        Parameters
+        ----------
+        job_id : int
+            Id of the item.
+
+        """
+        with self._transaction():
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def nack(
+        self,
+        job_id: int,
+        error: str,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Release a claimed item whose handling failed.
+
+        The item is handed out again after the retry delay, unless it reached
+        the max number of attempts, in which case it is moved to the dead
+        letters.
+
+        Parameters
+        ----------
+        job_id : int
+            Id of the item.
+        error : str
+            Description of the failure.
+        payload : dict
+            (Default value = None)
+
+            Payload replacing the queued one, e.g. recording the progress of
+            the failed handling. Defaults to the queued payload.
+
+        """
+        with self._transaction():
+            if payload is not None:
+                self._db.execute(
+                    "UPDATE jobs SET payload = ? WHERE id = ?",
+                    (json.dumps(payload), job_id),
+                )
+            self._db.execute(
+                "INSERT INTO dead_letters "
+                "SELECT id, payload, attempts, ?, ? FROM jobs "
+                "WHERE id = ? AND attempts >= ?",
+                (error, time.time(), job_id, self.max_attempts),
+            )
+            self._db.execute(
+                "DELETE FROM jobs WHERE id = ? AND attempts >= ?",
+                (job_id, self.max_attempts),
+            )
+            self._db.execute(
+                "UPDATE jobs SET visible_at = ?, error = ? WHERE id = ?",
+                (time.time() + self.retry_delay, error, job_id),
+            )
+
+    def dead_letters(self) -> List[Job]:
+        """
+        Get the dead-lettered items.
+
+        Returns
+        -------
+        List[Job]
+            The items whose handling failed too many times.
+
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, payload, attempts FROM dead_letters ORDER BY id"
+            ).fetchall()
+        return [Job(row[0], json.loads(row[1]), row[2]) for row in rows]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run the statements in a transaction holding the write lock."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+
+class QueueConsumers:
+    """
+    Pool of threads consuming a work queue.
+
+    Parameters
+    ----------
+    queue : WorkQueue
+        Queue to consume.
+    handle : Callable
+        Function handling the payload of an item, and whether this is the
+        last attempt at it. The item is acknowledged if it returns, released
+        if it raises. Changes made by the function to the payload are kept
+        when the item is released.
+    workers : int
+        (Default value = `telereddit.config.config.QUEUE_CONSUMERS`)
+
+        Number of items handled at the same time.
+    poll_interval : float
+        (Default value = `telereddit.config.config.QUEUE_POLL_INTERVAL`)
+
+        Seconds to wait before polling again an empty queue.
+
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        handle: Callable[[Dict[str, Any], bool], Any],
+        workers: int = QUEUE_CONSUMERS,
+        poll_interval: float = QUEUE_POLL_INTERVAL,
+    ) -> None:
+        self.queue: WorkQueue = queue
+        self.handle: Callable[[Dict[str, Any], bool], Any] = handle
+        self.workers: int = workers
+        self.poll_interval: float = poll_interval
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the consumer threads."""
+        for i in range(self.workers - len(self._threads)):
+            thread = threading.Thread(
+                target=self._run, name=f"queue-consumer-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop the consumer threads, once they finish the current item."""
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self) -> None:
+        """Handle items until stopped."""
+        while not self._stopped.is_set():
+            try:
+                job = self.queue.get()
+            except sqlite3.Error:
+                logging.exception("Error claiming a queued item")
+                job = None
+            if job is None:
+                self._stopped.wait(self.poll_interval)
+                continue
+            try:
+                self.handle(
+                    job.payload, job.attempts >= self.queue.max_attempts
+                )
+            except Exception as e:
+                logging.exception(f"Error handling queued item {job.id}")
+                self.queue.nack(job.id, repr(e), job.payload)
+            else:
+                self.queue.ack(job.id)
@@ -0,0 +1,181 @@
+"""
+Multi-process mode of telereddit.
+
+A front process owns the Telegram webhook and shards the received updates by
+chat id across a pool of worker processes, each handling its updates with its
+own Linker services. Updates of the same chat are always handled by the same
+worker, so that they keep their order and share the same chat lock.
+
+Caches, pools and rate limiter buckets are partitioned between the workers:
+as every chat is handled by one worker only, each worker only needs the
+entries of its chats. The global Telegram rate limit is split evenly. The
+file_id store is shared, when persisted to SQLite.
+"""
+
+import logging
+import multiprocessing
+import os
+from multiprocessing.context import SpawnProcess
+from typing import Any, Dict, List, Optional
+
+from telegram import Bot, Update  # type: ignore
+from telegram.ext import CallbackContext, TypeHandler, Updater  # type: ignore
+from telegram.utils.request import Request  # type: ignore
+
+from telereddit import metrics, startup
+from telereddit import telereddit
+from telereddit.config.config import GLOBAL_RATE
+from telereddit.rate_limiter import RateLimiter
+from telereddit.transport import Transport
+
+_LOG_FORMAT = "%(asctime)s - %(processName)s - %(levelname)s - %(message)s"
+
+
+def run_worker(index: int, updates: Any, workers: int) -> None:
+    """
+    Entrypoint of a worker process: handle the updates sent by the front.
+
+    Parameters
+    ----------
+    index : int
+        Index of the worker.
+    updates : multiprocessing.Queue
+        Queue of the updates, as dicts, sent by the front. None stops the
+        worker.
+    workers : int
+        Number of workers, among which the global rate limit is split.
+
+    """
+    logging.basicConfig(format=_LOG_FORMAT, level=logging.INFO)
+    transport = Transport()
+    env = telereddit.init(transport)
+    telereddit.init_sentry(env)
+
+    bot = Bot(
+        os.getenv("TELEGRAM_TOKEN"),
+        request=Request(**transport.get_telegram_request_kwargs()),
+    )
+    telereddit.setup_linker(
+        bot, transport, RateLimiter(global_rate=GLOBAL_RATE / workers)
+    )
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        metrics.start_metrics_server(int(metrics_port) + 1 + index)
+
+    while True:
+        payload = updates.get()
+        if payload is None:
+            return
+        try:
+            telereddit.dispatch_update(Update.de_json(payload, bot), bot)
+        except Exception:
+            logging.exception("Error dispatching an update")
+
+
+class WorkerPool:
+    """
+    Pool of worker processes, each handling the updates of a shard of chats.
+
+    Dead workers are restarted when they are sent an update.
+
+    Parameters
+    ----------
+    workers : int
+        Number of worker processes.
+
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers: int = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._queues = [self._context.Queue() for _ in range(workers)]
+        self._processes: List[Optional[SpawnProcess]] = [None] * workers
+
+    def start(self) -> None:
+        """Start the workers not running."""
+        for index in range(self.workers):
+            self._ensure_started(index)
+
+    def stop(self) -> None:
+        """Stop the workers, once they dispatched the updates already sent."""
+        for queue in self._queues:
+            queue.put(None)
+        for process in self._processes:
+            if process is not None:
+                process.join()
+
+    def submit(self, chat_id: int, payload: Dict[str, Any]) -> None:
+        """
+        Send an update to the worker of the given chat.
+
+        Parameters
+        ----------
+        chat_id : int
+            Id of the chat of the update.
+        payload : dict
+            The update, as dict.
+
+        """
+        index = chat_id % self.workers
+        self._ensure_started(index)
+        self._queues[index].put(payload)
+
+    def on_update(self, update: Update, context: CallbackContext) -> None:
+        """
+        Send the update to its worker: handler of the front process.
+
+        Parameters
+        ----------
+        update : Update
+            The Update object provided by python-telegram-bot
+        context : CallbackContext
+            The Context object provided by python-telegram-bot
+
+        """
+        if not telereddit.is_handled(update):
+            return
+        # inline queries have no chat: they are sharded by user instead
+        if update.effective_chat is not None:
+            self.submit(update.effective_chat.id, update.to_dict())
+        elif update.effective_user is not None:
+            self.submit(update.effective_user.id, update.to_dict())
+
+    def _ensure_started(self, index: int) -> None:
+        """Start the given worker, if not running."""
+        process = self._processes[index]
+        if process is not None and process.is_alive():
+            return
+        if process is not None:
+            logging.error(f"Worker {index} died, restarting it")
+        process = self._context.Process(
+            target=run_worker,
+            args=(index, self._queues[index], self.workers),
+            name=f"worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+
+
+def main(workers: int) -> None:
+    """
+    Entrypoint of the multi-process mode.
+
+    Parameters
+    ----------
+    workers : int
+        Number of worker processes.
+
+    """
+    logging.basicConfig(format=_LOG_FORMAT, level=logging.INFO)
+    pool = WorkerPool(workers)
+    pool.start()
+
+    telereddit.load_env()
+    updater = Updater(token=os.getenv("TELEGRAM_TOKEN"), use_context=True)
+    updater.dispatcher.add_handler(TypeHandler(Update, pool.on_update))
+    print(f"Listening with {workers} workers...")
+    telereddit.start_webhook(updater)
+    startup.profile.log_report()
+    updater.idle()
+    pool.stop()